@@ -20,6 +20,8 @@ import Utils
 
 if __name__ == "__main__":
     Utils.init_logging("TextClient", exception_logger="Client")
+    # the text client only needs the names of each game, which the world manifest has
+    Utils.lazy_world_loading = True
 
 from MultiServer import CommandProcessor
 from NetUtils import (Endpoint, decode, NetworkItem, encode, JSONtoTextParser, ClientStatus, Permission, NetworkSlot,
@@ -95,7 +97,7 @@ class ClientCommandProcessor(CommandProcessor):
             return False
         count = 0
         checked_count = 0
-        for location, location_id in AutoWorldRegister.world_types[self.ctx.game].location_name_to_id.items():
+        for location, location_id in network_data_package["games"][self.ctx.game]["location_name_to_id"].items():
             if filter_text and filter_text not in location:
                 continue
             if location_id < 0:
@@ -122,7 +124,7 @@ class ClientCommandProcessor(CommandProcessor):
             self.output("No game set, cannot determine existing items.")
             return False
         self.output(f"Item Names for {self.ctx.game}")
-        for item_name in AutoWorldRegister.world_types[self.ctx.game].item_name_to_id:
+        for item_name in network_data_package["games"][self.ctx.game]["item_name_to_id"]:
             self.output(item_name)
 
     def _cmd_item_groups(self):
@@ -131,7 +133,7 @@ class ClientCommandProcessor(CommandProcessor):
             self.output("No game set, cannot determine existing item groups.")
             return False
         self.output(f"Item Group Names for {self.ctx.game}")
-        for group_name in AutoWorldRegister.world_types[self.ctx.game].item_name_groups:
+        for group_name in network_data_package["games"][self.ctx.game]["item_name_groups"]:
             self.output(group_name)
 
     def _cmd_locations(self):
@@ -140,7 +142,7 @@ class ClientCommandProcessor(CommandProcessor):
             self.output("No game set, cannot determine existing locations.")
             return False
         self.output(f"Location Names for {self.ctx.game}")
-        for location_name in AutoWorldRegister.world_types[self.ctx.game].location_name_to_id:
+        for location_name in network_data_package["games"][self.ctx.game]["location_name_to_id"]:
             self.output(location_name)
 
     def _cmd_location_groups(self):
@@ -149,7 +151,7 @@ class ClientCommandProcessor(CommandProcessor):
             self.output("No game set, cannot determine existing location groups.")
             return False
         self.output(f"Location Group Names for {self.ctx.game}")
-        for group_name in AutoWorldRegister.world_types[self.ctx.game].location_name_groups:
+        for group_name in network_data_package["games"][self.ctx.game]["location_name_groups"]:
             self.output(group_name)
 
     def _cmd_ready(self):
@@ -355,7 +357,7 @@ class CommonContext:
     def suggested_address(self) -> str:
         if self.server_address:
             return self.server_address
-        return Utils.persistent_load().get("client", {}).get("last_server_address", "")
+        return Utils.persistent_get("client", "last_server_address", "")
 
     @functools.cached_property
     def raw_text_parser(self) -> RawJSONtoTextParser:
@@ -579,9 +581,6 @@ class CommonContext:
 
     def consume_network_data_package(self, data_package: dict):
         self.update_data_package(data_package)
-        current_cache = Utils.persistent_load().get("datapackage", {}).get("games", {})
-        current_cache.update(data_package["games"])
-        Utils.persistent_store("datapackage", "games", current_cache)
         logger.info(f"Got new ID/Name DataPackage for {', '.join(data_package['games'])}")
         for game, game_data in data_package["games"].items():
             Utils.store_data_package_for_checksum(game, game_data)
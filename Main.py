@@ -1,18 +1,20 @@
 import collections
 import concurrent.futures
 import logging
+import multiprocessing
 import os
-import pickle
+import sys
 import tempfile
 import time
+import traceback
 import zipfile
-import zlib
 from typing import Dict, List, Optional, Set, Tuple, Union
 
 import worlds
 from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld, Region
 from Fill import FillError, balance_multiworld_progression, distribute_items_restrictive, distribute_planned, \
     flood_items
+from NetUtils import MultiData
 from Options import StartInventoryPool
 from Utils import __version__, output_path, version_tuple, get_settings
 from settings import get_settings
@@ -231,14 +233,17 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
     with output as temp_dir:
         output_players = [player for player in multiworld.player_ids if AutoWorld.World.generate_output.__code__
                           is not multiworld.worlds[player].generate_output.__code__]
-        with concurrent.futures.ThreadPoolExecutor(len(output_players) + 2) as pool:
+        generator_settings = get_settings().generator
+        # created first, as its worker processes have to be forked before any output thread starts
+        with OutputScheduler(multiworld, output_players, generator_settings.output_memory_budget * 1024 * 1024,
+                             generator_settings.output_processes) as scheduler, \
+                concurrent.futures.ThreadPoolExecutor(len(output_players) + 2) as pool:
             check_accessibility_task = pool.submit(multiworld.fulfills_accessibility)
 
             output_file_futures = [pool.submit(AutoWorld.call_stage, multiworld, "generate_output", temp_dir)]
             for player in output_players:
                 # skip starting a thread for methods that say "pass".
-                output_file_futures.append(
-                    pool.submit(AutoWorld.call_single, multiworld, "generate_output", player, temp_dir))
+                output_file_futures.append(pool.submit(scheduler.generate_output, player, temp_dir))
 
             # collect ER hint info
             er_hint_data: Dict[int, Dict[int, str]] = {}
@@ -338,11 +343,8 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
                 }
                 AutoWorld.call_all(multiworld, "modify_multidata", multidata)
 
-                multidata = zlib.compress(pickle.dumps(multidata), 9)
-
                 with open(os.path.join(temp_dir, f'{outfilebase}.archipelago'), 'wb') as f:
-                    f.write(bytes([3]))  # version of format
-                    f.write(multidata)
+                    f.write(MultiData.encode(multidata))
 
             output_file_futures.append(pool.submit(write_multidata))
             if not check_accessibility_task.result():
@@ -356,6 +358,7 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
                 if i % 10 == 0 or i == len(output_file_futures):
                     logger.info(f'Generating output files ({i}/{len(output_file_futures)}).')
                 future.result()
+            scheduler.log_times()
 
         if args.spoiler > 1:
             logger.info('Calculating playthrough.')
@@ -373,3 +376,87 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
 
     logger.info('Done. Enjoy. Total Time: %s', time.perf_counter() - start)
     return multiworld
+
+
+_output_multiworld: Optional[MultiWorld] = None
+"""multiworld of the running generation, inherited by forked output processes instead of being pickled"""
+
+
+def _generate_output_in_process(player: int, output_directory: str) -> None:
+    assert _output_multiworld, "Output processes have to be forked from the generator."
+    try:
+        AutoWorld.call_single(_output_multiworld, "generate_output", player, output_directory)
+    except Exception:
+        # the world's exception may not survive pickling, so the traceback is sent back instead
+        raise Exception(traceback.format_exc()) from None
+
+
+class OutputScheduler:
+    """
+    Runs the generate_output of worlds while they may reserve memory from the memory budget, see
+    World.reserve_output_memory. Outputs of worlds marked as process safe run in forked worker processes, so they don't
+    have to share the GIL. Records how long each output took.
+    """
+    process_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+    def __init__(self, multiworld: MultiWorld, output_players: List[int], memory_budget: int, processes: int) -> None:
+        """
+        :param multiworld: multiworld to generate the outputs of
+        :param output_players: players whose outputs will be generated
+        :param memory_budget: bytes that running outputs may reserve together, 0 for no limit
+        :param processes: worker processes for process safe outputs, 0 for one per CPU core
+        """
+        global _output_multiworld
+        self.multiworld = multiworld
+        self.memory_budget = AutoWorld.OutputMemoryBudget(memory_budget)
+        # player -> (seconds taken, whether it ran in a worker process)
+        self.times: Dict[int, Tuple[float, bool]] = {}
+
+        processes = min(processes or os.cpu_count() or 1,
+                        sum(multiworld.worlds[player].output_process_safe for player in output_players))
+        # fork shares the multiworld with the workers without pickling it, it is not available on Windows and
+        # not safe on macOS. From 3.11 on, a forking pool starts all its workers at once, before any output thread.
+        # Daemonic processes, such as the WebHost generators, are not allowed to have children.
+        if processes > 1 and sys.version_info >= (3, 11) and sys.platform != "darwin" \
+                and "fork" in multiprocessing.get_all_start_methods() and not multiprocessing.current_process().daemon:
+            _output_multiworld = multiworld
+            self.process_pool = concurrent.futures.ProcessPoolExecutor(processes,
+                                                                       mp_context=multiprocessing.get_context("fork"))
+            self.process_pool.submit(int).result()
+
+    def __enter__(self) -> "OutputScheduler":
+        AutoWorld.output_memory_budget = self.memory_budget
+        return self
+
+    def __exit__(self, *args) -> None:
+        global _output_multiworld
+        if self.process_pool:
+            self.process_pool.shutdown(cancel_futures=True)
+            self.process_pool = None
+        _output_multiworld = None
+        AutoWorld.output_memory_budget = AutoWorld.OutputMemoryBudget()
+
+    def generate_output(self, player: int, output_directory: str) -> None:
+        """Calls generate_output of player's world, in a worker process if it is process safe and those are used."""
+        start = time.perf_counter()
+        in_process = bool(self.process_pool and self.multiworld.worlds[player].output_process_safe)
+        try:
+            if in_process:
+                self.process_pool.submit(_generate_output_in_process, player, output_directory).result()
+            else:
+                AutoWorld.call_single(self.multiworld, "generate_output", player, output_directory)
+        finally:
+            self.times[player] = (time.perf_counter() - start, in_process)
+
+    def log_times(self) -> None:
+        logger = logging.getLogger()
+        for player, (taken, in_process) in sorted(self.times.items()):
+            logger.debug(f"Output of player {player} ({self.multiworld.game[player]}) took {taken:.2f} seconds"
+                         f"{' in a worker process' if in_process else ''}.")
+        if self.times:
+            slowest = max(self.times, key=lambda player: self.times[player][0])
+            logger.info(f"Generated {len(self.times)} world outputs, "
+                        f"{sum(in_process for _, in_process in self.times.values())} in worker processes, "
+                        f"waiting {self.memory_budget.waited:.2f} seconds for memory. "
+                        f"Slowest was player {slowest} ({self.multiworld.game[slowest]}) "
+                        f"with {self.times[slowest][0]:.2f} seconds.")
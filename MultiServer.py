@@ -10,11 +10,14 @@ import functools
 import hashlib
 import inspect
 import itertools
+import json
 import logging
 import math
 import operator
+import os
 import pickle
 import random
+import re
 import threading
 import time
 import typing
@@ -40,7 +43,7 @@ import NetUtils
 import Utils
 from Utils import version_tuple, restricted_loads, Version, async_start, get_intended_text
 from NetUtils import Endpoint, ClientStatus, NetworkItem, decode, encode, NetworkPlayer, Permission, NetworkSlot, \
-    SlotType, LocationStore
+    SlotType, LocationStore, ReceivedItemsStore
 
 min_client_version = Version(0, 1, 6)
 colorama.init()
@@ -115,6 +118,10 @@ class Client(Endpoint):
         self.slot = None
         self.send_index = 0
         self.tags = []
+        self.send_queue: typing.Deque[typing.Tuple[str, int]] = collections.deque()  # (message, size in bytes)
+        self.send_queue_bytes = 0
+        self.sending = False
+        self.dropped_msgs = 0
         self.messageprocessor = client_message_processor(ctx, self)
         self.ctx = weakref.ref(ctx)
 
@@ -141,6 +148,212 @@ class Client(Endpoint):
 
 
 team_slot = typing.Tuple[int, int]
+# matches the command of each message in an encoded list of messages
+_encoded_cmd_pattern = re.compile(r'(?:^\[|\},)\{"cmd":"(\w+)"')
+
+
+def _write_buffer_size(endpoint: Endpoint) -> int:
+    """Bytes waiting in the socket buffer of endpoint, 0 if its socket has no transport (anymore)."""
+    transport = getattr(endpoint.socket, "transport", None)
+    return transport.get_write_buffer_size() if transport else 0
+
+
+class EventLoopLag:
+    """Measures how late an event loop wakes up from a sleep. Contexts sharing an event loop share its watcher."""
+    interval = 1.0
+    watchers: typing.ClassVar[weakref.WeakKeyDictionary] = weakref.WeakKeyDictionary()
+    """ event loop -> its EventLoopLag """
+
+    def __init__(self):
+        self.lag = 0.0
+        self.lag_max = 0.0
+
+    @classmethod
+    def watch(cls) -> EventLoopLag:
+        """Returns the watcher of the running event loop, starting it on first use."""
+        loop = asyncio.get_running_loop()
+        watcher = cls.watchers.get(loop)
+        if not watcher:
+            watcher = cls.watchers[loop] = cls()
+            async_start(watcher._measure(loop), name="event loop lag")
+        return watcher
+
+    async def _measure(self, loop: asyncio.AbstractEventLoop):
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, loop.time() - start - self.interval)
+            if self.lag > self.lag_max:
+                self.lag_max = self.lag
+
+    def get_samples(self, labels: typing.Optional[typing.Dict[str, str]] = None) \
+            -> typing.List[typing.Tuple[str, typing.Dict[str, str], float]]:
+        labels = labels or {}
+        return [("archipelago_event_loop_lag_seconds", labels, self.lag),
+                ("archipelago_event_loop_lag_max_seconds", labels, self.lag_max)]
+
+
+class ServerMetrics:
+    """Per room counters and timings of a Context. Context.metrics is None unless enabled,
+    so each hook costs a single attribute check otherwise."""
+    client_commands = frozenset(("Connect", "ConnectUpdate", "Sync", "LocationChecks", "LocationScouts",
+                                 "StatusUpdate", "Say", "GetDataPackage", "Bounce", "Get", "Set", "SetNotify"))
+    """ commands that get their own label, anything else a client sends is counted as "Unknown" """
+    descriptions: typing.Dict[str, typing.Tuple[str, str]] = {
+        "archipelago_messages_in_total": ("counter", "Messages received from clients."),
+        "archipelago_messages_out_total": ("counter", "Messages sent to clients, broadcasts counted per recipient."),
+        "archipelago_bytes_in_total": ("counter", "Bytes received from clients."),
+        "archipelago_bytes_out_total": ("counter", "Bytes sent to clients."),
+        "archipelago_encode_seconds_total": ("counter", "Time spent encoding messages."),
+        "archipelago_encodes_total": ("counter", "Message batches encoded."),
+        "archipelago_handler_seconds_total": ("counter", "Time spent handling client messages."),
+        "archipelago_handler_max_seconds": ("gauge", "Slowest handling of a client message."),
+        "archipelago_saves_total": ("counter", "Saves written."),
+        "archipelago_save_seconds": ("gauge", "Duration of the last save."),
+        "archipelago_save_bytes": ("gauge", "Size of the last save."),
+        "archipelago_event_loop_lag_seconds": ("gauge", "Event loop lag at the last measurement."),
+        "archipelago_event_loop_lag_max_seconds": ("gauge", "Highest event loop lag measured."),
+        "archipelago_clients": ("gauge", "Connected clients."),
+        "archipelago_authenticated_clients": ("gauge", "Connected clients that are connected to a slot."),
+        "archipelago_send_queue_bytes": ("gauge", "Bytes waiting to be sent to clients."),
+        "archipelago_dropped_messages_total": ("counter", "Low priority messages dropped for slow clients."),
+        "archipelago_slow_client_disconnects_total": ("counter", "Clients disconnected for falling too far behind."),
+    }
+
+    def __init__(self):
+        self.messages_in: typing.Counter[str] = collections.Counter()
+        self.messages_out: typing.Counter[str] = collections.Counter()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.encode_seconds = 0.0
+        self.encodes = 0
+        self.handler_seconds: typing.Dict[str, float] = collections.defaultdict(float)
+        self.handler_max_seconds: typing.Dict[str, float] = collections.defaultdict(float)
+        self.saves = 0
+        self.save_seconds = 0.0
+        self.save_bytes = 0
+        self.event_loop: typing.Optional[EventLoopLag] = None
+        """ lag of the event loop the Context runs on, shared with other Contexts on it """
+        self.dropped_msgs = 0
+        self.slow_client_disconnects = 0
+
+    def observe_in(self, data: typing.Union[str, bytes]):
+        self.bytes_in += len(data)
+
+    def observe_handler(self, args: typing.Any, seconds: float):
+        cmd = args.get("cmd") if isinstance(args, dict) else None
+        if cmd not in self.client_commands:
+            cmd = "Unknown"
+        self.messages_in[cmd] += 1
+        self.handler_seconds[cmd] += seconds
+        if seconds > self.handler_max_seconds[cmd]:
+            self.handler_max_seconds[cmd] = seconds
+
+    def observe_out(self, msg: str, recipients: int = 1):
+        if not recipients:
+            return
+        self.bytes_out += len(msg) * recipients
+        commands = _encoded_cmd_pattern.findall(msg)
+        for cmd in commands or ("Unknown",):
+            self.messages_out[cmd] += recipients
+
+    def observe_save(self, seconds: float, size: int):
+        self.saves += 1
+        self.save_seconds = seconds
+        self.save_bytes = size
+
+    def timed_encoder(self, encoder: typing.Callable[[typing.Any], str]) -> typing.Callable[[typing.Any], str]:
+        @functools.wraps(encoder)
+        def encode_timed(obj: typing.Any) -> str:
+            start = time.perf_counter()
+            try:
+                return encoder(obj)
+            finally:
+                self.encode_seconds += time.perf_counter() - start
+                self.encodes += 1
+        return encode_timed
+
+    def get_samples(self, ctx: Context, labels: typing.Optional[typing.Dict[str, str]] = None) \
+            -> typing.List[typing.Tuple[str, typing.Dict[str, str], float]]:
+        """Returns (name, labels, value) of every metric, with labels added to each sample.
+        The event loop lag is left out, as it is the same for all Contexts on the loop."""
+        labels = labels or {}
+        samples: typing.List[typing.Tuple[str, typing.Dict[str, str], float]] = []
+        for cmd, count in sorted(self.messages_in.items()):
+            samples.append(("archipelago_messages_in_total", {**labels, "cmd": cmd}, count))
+        for cmd, count in sorted(self.messages_out.items()):
+            samples.append(("archipelago_messages_out_total", {**labels, "cmd": cmd}, count))
+        for cmd, seconds in sorted(self.handler_seconds.items()):
+            samples.append(("archipelago_handler_seconds_total", {**labels, "cmd": cmd}, seconds))
+            samples.append(("archipelago_handler_max_seconds", {**labels, "cmd": cmd}, self.handler_max_seconds[cmd]))
+        send_queue_bytes = 0
+        for endpoint in ctx.endpoints:
+            send_queue_bytes += _write_buffer_size(endpoint) + endpoint.send_queue_bytes
+        samples += [
+            ("archipelago_bytes_in_total", labels, self.bytes_in),
+            ("archipelago_bytes_out_total", labels, self.bytes_out),
+            ("archipelago_encode_seconds_total", labels, self.encode_seconds),
+            ("archipelago_encodes_total", labels, self.encodes),
+            ("archipelago_saves_total", labels, self.saves),
+            ("archipelago_save_seconds", labels, self.save_seconds),
+            ("archipelago_save_bytes", labels, self.save_bytes),
+            ("archipelago_clients", labels, len(ctx.endpoints)),
+            ("archipelago_authenticated_clients", labels, sum(1 for endpoint in ctx.endpoints if endpoint.auth)),
+            ("archipelago_send_queue_bytes", labels, send_queue_bytes),
+            ("archipelago_dropped_messages_total", labels, self.dropped_msgs),
+            ("archipelago_slow_client_disconnects_total", labels, self.slow_client_disconnects),
+        ]
+        return samples
+
+    def to_dict(self, ctx: Context) -> typing.Dict[str, typing.Any]:
+        """Returns the metrics in a json friendly form, for periodic dumps."""
+        data: typing.Dict[str, typing.Any] = {}
+        samples = self.get_samples(ctx)
+        if self.event_loop:
+            samples += self.event_loop.get_samples()
+        for name, labels, value in samples:
+            if "cmd" in labels:
+                data.setdefault(name, {})[labels["cmd"]] = value
+            else:
+                data[name] = value
+        return data
+
+
+def _escape_prometheus_label(label: typing.Any) -> str:
+    return str(label).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_prometheus_metrics(samples: typing.Iterable[typing.Tuple[str, typing.Dict[str, str], float]]) -> str:
+    """Formats samples, such as from ServerMetrics.get_samples, in the Prometheus text exposition format."""
+    grouped: typing.Dict[str, typing.List[str]] = {}
+    for name, labels, value in samples:
+        label_text = ",".join(f'{key}="{_escape_prometheus_label(label)}"' for key, label in labels.items())
+        grouped.setdefault(name, []).append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+    lines: typing.List[str] = []
+    for name, sample_lines in grouped.items():
+        metric_type, description = ServerMetrics.descriptions.get(name, ("untyped", ""))
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines += sample_lines
+    return "\n".join(lines) + "\n"
+
+
+async def serve_metrics(host: str, port: int, get_text: typing.Callable[[], str]) -> asyncio.AbstractServer:
+    """Starts a minimal http server that answers every request with the text returned by get_text."""
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while (await reader.readline()).strip():
+                pass  # read request line and headers, every path returns the metrics
+            body = get_text().encode("utf-8")
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                         b"Content-Length: " + str(len(body)).encode() + b"\r\nConnection: close\r\n\r\n" + body)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
 
 
 class Context:
@@ -159,10 +372,11 @@ class Context:
     # team -> slot id -> list of clients authenticated to slot.
     clients: typing.Dict[int, typing.Dict[int, typing.List[Client]]]
     locations: LocationStore  # typing.Dict[int, typing.Dict[int, typing.Tuple[int, int, int]]]
+    received_items: ReceivedItemsStore  # typing.Dict[typing.Tuple[int, int, bool], typing.List[NetworkItem]]
     location_checks: typing.Dict[typing.Tuple[int, int], typing.Set[int]]
     hints_used: typing.Dict[typing.Tuple[int, int], int]
     groups: typing.Dict[int, typing.Set[int]]
-    save_version = 2
+    save_version = 3
     stored_data: typing.Dict[str, object]
     read_data: typing.Dict[str, object]
     stored_data_notification_clients: typing.Dict[str, typing.Set[Client]]
@@ -181,6 +395,42 @@ class Context:
     spheres: typing.List[typing.Dict[int, typing.Set[int]]]
     """ each sphere is { player: { location_id, ... } } """
     logger: logging.Logger
+    encoded_game_packages: typing.Dict[str, str]
+    """ checksum (or game name, if the package has none) -> json encoded game package """
+    data_package_msgs: typing.Dict[typing.Tuple[str, ...], str]
+    """ requested games -> complete encoded DataPackage message """
+    data_package_msgs_limit = 16
+    encoded_connected_parts: typing.Dict[typing.Any, str]
+    """ "players", "slot_info" or slot -> room-invariant parts of Connected, encoded. Reset when aliases change. """
+    connect_queue: typing.Deque[typing.Tuple[Client, dict, asyncio.Future]]
+    """ Connects waiting to be processed, one per event loop iteration, so a storm of reconnects can't starve
+    clients that are playing """
+    connecting: bool = False
+    """ whether process_connects is working through connect_queue """
+    send_queue_limit = 4 * 1024 * 1024
+    """ bytes waiting to be sent to a client, above which messages to it get queued and low priority ones dropped.
+    Above one complete DataPackage, so a client downloading it still gets everything else. """
+    send_queue_hard_limit = 16 * 1024 * 1024
+    """ bytes waiting to be sent to a client, above which it gets disconnected """
+    low_priority_print_types = frozenset(("Chat", "ItemSend", "Join", "Part"))
+    """ PrintJSON types that are only informational, so they can be dropped for clients that fall behind.
+    Replies to commands such as !hint and other PrintJSON are always sent. """
+    bounce_game_index: typing.Dict[typing.Tuple[int, str], typing.Set[Client]]
+    """ (team, game) -> authenticated clients, for routing Bounce """
+    bounce_tag_index: typing.Dict[typing.Tuple[int, str], typing.Set[Client]]
+    """ (team, tag) -> authenticated clients, for routing Bounce """
+    bounce_rate_limit = 10.0
+    """ Bounces per second a slot can send on average, so clients bouncing in a feedback loop can't flood a room """
+    bounce_burst_limit = 30.0
+    """ Bounces a slot can send at once before bounce_rate_limit applies """
+    metrics: typing.Optional[ServerMetrics] = None
+    name_indexes: typing.Dict[typing.Tuple[str, str, str], Utils.FuzzyNameIndex]
+    """ (kind, game, checksum) -> index for fuzzy name lookups. WebHost shares this between rooms. """
+    local_name_indexes: typing.Dict[typing.Tuple[str, str], Utils.FuzzyNameIndex]
+    """ (kind, game) -> index for fuzzy name lookups, for data packages without checksum """
+    item_locations: typing.Optional[typing.Dict[int, typing.List[typing.Tuple[int, int, int, int]]]]
+    """ item id -> (finding player, location id, receiving player, flags) of all locations holding it, in the order
+    of self.locations. Built on first use. """
 
 
     def __init__(self, host: str, port: int, server_password: str, password: str, location_check_points: int,
@@ -208,7 +458,7 @@ class Context:
         self.password = password
         self.server = None
         self.countdown_timer = 0
-        self.received_items = {}
+        self.received_items = ReceivedItemsStore()
         self.start_inventory = {}
         self.name_aliases: typing.Dict[team_slot, str] = {}
         self.location_checks = collections.defaultdict(set)
@@ -254,9 +504,27 @@ class Context:
         self.all_item_and_group_names = {}
         self.all_location_and_group_names = {}
         self.non_hintable_names = collections.defaultdict(frozenset)
+        self.encoded_game_packages = {}
+        self.data_package_msgs = {}
+        self.encoded_connected_parts = {}
+        self.connect_queue = collections.deque()
+        self.bounce_game_index = {}
+        self.bounce_tag_index = {}
+        self.bounce_allowance: typing.Dict[team_slot, typing.Tuple[float, float]] = {}
+        self.name_indexes = {}
+        self.local_name_indexes = {}
+        self.item_locations = None
 
         self._load_game_data()
 
+    def enable_metrics(self) -> ServerMetrics:
+        """Starts collecting ServerMetrics. Has to be called from within the running event loop."""
+        if not self.metrics:
+            self.metrics = ServerMetrics()
+            self.dumper = self.metrics.timed_encoder(self.dumper)
+            self.metrics.event_loop = EventLoopLag.watch()
+        return self.metrics
+
     # Data package retrieval
     def _load_game_data(self):
         import worlds
@@ -270,11 +538,14 @@ class Context:
             self.non_hintable_names[world_name] = world.hint_blacklist
 
         for game_package in self.gamespackage.values():
-            # remove groups from data sent to clients
-            del game_package["item_name_groups"]
-            del game_package["location_name_groups"]
+            # remove groups from data sent to clients, an earlier Context in this process may have done so already
+            game_package.pop("item_name_groups", None)
+            game_package.pop("location_name_groups", None)
 
     def _init_game_data(self):
+        self.encoded_game_packages.clear()
+        self.data_package_msgs.clear()
+        self.local_name_indexes.clear()
         for game_name, game_package in self.gamespackage.items():
             if "checksum" in game_package:
                 self.checksums[game_name] = game_package["checksum"]
@@ -300,41 +571,150 @@ class Context:
     def location_names_for_game(self, game: str) -> typing.Optional[typing.Dict[str, int]]:
         return self.gamespackage[game]["location_name_to_id"] if game in self.gamespackage else None
 
+    def get_name_index(self, kind: str, game: str) -> Utils.FuzzyNameIndex:
+        """Returns the index to look up names with, built once per data package.
+        kind is one of "items", "locations", "items_and_groups" or "locations_and_groups"."""
+        checksum = self.gamespackage[game].get("checksum")
+        index = self.name_indexes.get((kind, game, checksum)) if checksum else self.local_name_indexes.get((kind, game))
+        if index is None:
+            if kind == "items":
+                names = self.item_names_for_game(game)
+            elif kind == "locations":
+                names = self.location_names_for_game(game)
+            elif kind == "items_and_groups":
+                names = self.all_item_and_group_names[game]
+            elif kind == "locations_and_groups":
+                names = self.all_location_and_group_names[game]
+            else:
+                raise ValueError(f"Unknown kind of names {kind}")
+            index = Utils.FuzzyNameIndex(names)
+            if checksum:
+                self.name_indexes[kind, game, checksum] = index
+            else:
+                self.local_name_indexes[kind, game] = index
+        return index
+
+    def find_item(self, slots: typing.Set[int], seeked_item_id: int) \
+            -> typing.Iterator[typing.Tuple[int, int, int, int, int]]:
+        """Same as self.locations.find_item, but from a map of items to their locations instead of a full scan."""
+        if self.item_locations is None:
+            self.item_locations = {}
+            for finding_player, check_data in self.locations.items():
+                for location_id, (item_id, receiving_player, item_flags) in check_data.items():
+                    self.item_locations.setdefault(item_id, []).append(
+                        (finding_player, location_id, receiving_player, item_flags))
+        for finding_player, location_id, receiving_player, item_flags in self.item_locations.get(seeked_item_id, ()):
+            if receiving_player in slots:
+                yield finding_player, location_id, seeked_item_id, receiving_player, item_flags
+
+    def get_data_package_msg(self, games: typing.Iterable[str]) -> str:
+        """Returns the encoded DataPackage message for games, spliced together from once encoded game packages."""
+        games = tuple(games)
+        msg = self.data_package_msgs.get(games, None)
+        if msg is None:
+            fragments = []
+            for game in games:
+                key = self.checksums.get(game, game)
+                fragment = self.encoded_game_packages.get(key, None)
+                if fragment is None:
+                    fragment = self.encoded_game_packages[key] = self.dumper(self.gamespackage[game])
+                fragments.append(f"{self.dumper(game)}:{fragment}")
+            msg = f'[{{"cmd":"DataPackage","data":{{"games":{{{",".join(fragments)}}}}}}}]'
+            if len(self.data_package_msgs) >= self.data_package_msgs_limit:
+                # drop the oldest request, typical clients all ask for the same few sets of games
+                del self.data_package_msgs[next(iter(self.data_package_msgs))]
+            self.data_package_msgs[games] = msg
+        return msg
+
     # General networking
-    async def send_msgs(self, endpoint: Endpoint, msgs: typing.Iterable[dict]) -> bool:
-        if not endpoint.socket or not endpoint.socket.open:
+    def _can_send_now(self, endpoint: Client) -> bool:
+        """Whether nothing is queued for endpoint and its socket buffer has room, so a message can be written
+        right away instead of being queued."""
+        return not endpoint.send_queue and _write_buffer_size(endpoint) < self.send_queue_limit
+
+    def _is_low_priority(self, msg: str) -> bool:
+        """Whether the encoded msg only consists of PrintJSON of a low priority type."""
+        if {"PrintJSON"} != set(_encoded_cmd_pattern.findall(msg)):
+            return False
+        return all(cmd.get("cmd") == "PrintJSON" and cmd.get("type") in self.low_priority_print_types
+                   for cmd in self.loader(msg))
+
+    def _queue_msg(self, endpoint: Client, msg: str) -> bool:
+        """Queues msg for a client that is falling behind. Low priority messages are dropped once send_queue_limit
+        bytes are waiting, and at send_queue_hard_limit the client is disconnected, to resync when it reconnects."""
+        size = len(msg.encode("utf-8"))
+        waiting = _write_buffer_size(endpoint) + endpoint.send_queue_bytes + size
+        if waiting > self.send_queue_limit and self._is_low_priority(msg):
+            endpoint.dropped_msgs += 1
+            if self.metrics:
+                self.metrics.dropped_msgs += 1
             return False
-        msg = self.dumper(msgs)
+        if waiting > self.send_queue_hard_limit:
+            self.logger.warning(f"Disconnecting client at {endpoint.socket.remote_address}, "
+                                f"as it has more than {self.send_queue_hard_limit} bytes waiting.")
+            endpoint.send_queue.clear()
+            endpoint.send_queue_bytes = 0
+            if self.metrics:
+                self.metrics.slow_client_disconnects += 1
+            async_start(endpoint.socket.close(1013, "Could not keep up with messages"))
+            return False
+        endpoint.send_queue.append((msg, size))
+        endpoint.send_queue_bytes += size
+        if not endpoint.sending:
+            endpoint.sending = True
+            async_start(self._send_queued_msgs(endpoint), name="send queued messages")
+        return True
+
+    async def _send_queued_msgs(self, endpoint: Client):
         try:
-            await endpoint.socket.send(msg)
+            while endpoint.send_queue:
+                msg, size = endpoint.send_queue.popleft()
+                endpoint.send_queue_bytes -= size
+                await endpoint.socket.send(msg)  # waits for the socket buffer to drain
+            if endpoint.dropped_msgs:
+                text = f"{endpoint.dropped_msgs} messages were not sent, as the connection could not keep up."
+                endpoint.dropped_msgs = 0
+                await endpoint.socket.send(self.dumper([{"cmd": "PrintJSON", "data": [{"text": text}]}]))
         except websockets.ConnectionClosed:
-            self.logger.exception(f"Exception during send_msgs, could not send {msg}")
+            # the client went away, it is disconnected without logging a traceback
+            endpoint.send_queue.clear()
+            endpoint.send_queue_bytes = 0
+            await self.disconnect(endpoint)
+        except Exception:
+            endpoint.send_queue.clear()
+            endpoint.send_queue_bytes = 0
+            self.logger.exception("Exception during sending of queued messages")
             await self.disconnect(endpoint)
+        finally:
+            endpoint.sending = False
+
+    async def send_msgs(self, endpoint: Endpoint, msgs: typing.Iterable[dict]) -> bool:
+        if not endpoint.socket or not endpoint.socket.open:
             return False
-        else:
-            if self.log_network:
-                self.logger.info(f"Outgoing message: {msg}")
-            return True
+        return await self.send_encoded_msgs(endpoint, self.dumper(msgs))
 
     async def send_encoded_msgs(self, endpoint: Endpoint, msg: str) -> bool:
         if not endpoint.socket or not endpoint.socket.open:
             return False
-        try:
-            await endpoint.socket.send(msg)
-        except websockets.ConnectionClosed:
-            self.logger.exception("Exception during send_encoded_msgs")
-            await self.disconnect(endpoint)
+        if self._can_send_now(endpoint):
+            websockets.broadcast((endpoint.socket,), msg)
+        elif not self._queue_msg(endpoint, msg):
             return False
-        else:
-            if self.log_network:
-                self.logger.info(f"Outgoing message: {msg}")
-            return True
+        if self.log_network:
+            self.logger.info(f"Outgoing message: {msg}")
+        if self.metrics:
+            self.metrics.observe_out(msg)
+        return True
 
     async def broadcast_send_encoded_msgs(self, endpoints: typing.Iterable[Endpoint], msg: str) -> bool:
         sockets = []
+        queued = 0
         for endpoint in endpoints:
             if endpoint.socket and endpoint.socket.open:
-                sockets.append(endpoint.socket)
+                if self._can_send_now(endpoint):
+                    sockets.append(endpoint.socket)
+                elif self._queue_msg(endpoint, msg):
+                    queued += 1
         try:
             websockets.broadcast(sockets, msg)
         except RuntimeError:
@@ -343,6 +723,8 @@ class Context:
         else:
             if self.log_network:
                 self.logger.info(f"Outgoing broadcast: {msg}")
+            if self.metrics:
+                self.metrics.observe_out(msg, len(sockets) + queued)
             return True
 
     def broadcast_all(self, msgs: typing.List[dict]):
@@ -368,8 +750,49 @@ class Context:
             self.endpoints.remove(endpoint)
         if endpoint.slot and endpoint in self.clients[endpoint.team][endpoint.slot]:
             self.clients[endpoint.team][endpoint.slot].remove(endpoint)
+        self.update_bounce_index(endpoint, False)
         await on_client_disconnected(self, endpoint)
 
+    # Bounce routing
+    def update_bounce_index(self, client: Client, add: bool):
+        """Adds or removes client from the Bounce indexes, using its current team, slot and tags."""
+        if client.team is None or client.slot not in self.games:
+            return
+        keys = [(self.bounce_game_index, self.games[client.slot])]
+        keys += [(self.bounce_tag_index, tag) for tag in client.tags if isinstance(tag, str)]
+        for index, key in keys:
+            if add:
+                index.setdefault((client.team, key), set()).add(client)
+            else:
+                clients = index.get((client.team, key))
+                if clients is not None:
+                    clients.discard(client)
+                    if not clients:
+                        del index[client.team, key]
+
+    def get_bounce_recipients(self, team: int, games: typing.Iterable[str], tags: typing.Iterable[str],
+                              slots: typing.Iterable[int]) -> typing.Set[Client]:
+        recipients: typing.Set[Client] = set()
+        for game in games:
+            recipients.update(self.bounce_game_index.get((team, game), ()))
+        for tag in tags:
+            recipients.update(self.bounce_tag_index.get((team, tag), ()))
+        team_clients = self.clients.get(team, {})
+        for slot in slots:
+            recipients.update(team_clients.get(slot, ()))
+        return recipients
+
+    def allow_bounce(self, team: int, slot: int) -> bool:
+        """Takes one bounce from the slot's allowance, which refills at bounce_rate_limit per second."""
+        now = time.monotonic()
+        allowance, last_bounce = self.bounce_allowance.get((team, slot), (self.bounce_burst_limit, now))
+        allowance = min(self.bounce_burst_limit, allowance + (now - last_bounce) * self.bounce_rate_limit)
+        if allowance < 1:
+            self.bounce_allowance[team, slot] = allowance, now
+            return False
+        self.bounce_allowance[team, slot] = allowance - 1, now
+        return True
+
     def notify_client(self, client: Client, text: str, additional_arguments: dict = {}):
         if not client.auth:
             return
@@ -402,14 +825,16 @@ class Context:
         self.data_filename = multidatapath
 
     @staticmethod
-    def decompress(data: bytes) -> dict:
+    def decompress(data: bytes) -> typing.Union[dict, NetUtils.MultiData]:
         format_version = data[0]
-        if format_version > 3:
+        if format_version > NetUtils.MultiData.format_version:
             raise Utils.VersionException("Incompatible multidata.")
+        if format_version == NetUtils.MultiData.format_version:
+            return NetUtils.MultiData(data)
         return restricted_loads(zlib.decompress(data[1:]))
 
-    def _load(self, decoded_obj: dict, game_data_packages: typing.Dict[str, typing.Any],
-              use_embedded_server_options: bool):
+    def _load(self, decoded_obj: typing.Union[dict, NetUtils.MultiData],
+              game_data_packages: typing.Dict[str, typing.Any], use_embedded_server_options: bool):
 
         self.read_data = {}
         mdata_ver = decoded_obj["minimum_versions"]["server"]
@@ -423,6 +848,7 @@ class Context:
             self.minimum_client_versions[player] = max(Version(*version), min_client_version)
 
         self.slot_info = decoded_obj["slot_info"]
+        self.encoded_connected_parts.clear()
         self.games = {slot: slot_info.game for slot, slot_info in self.slot_info.items()}
         self.groups = {slot: slot_info.group_members for slot, slot_info in self.slot_info.items()
                        if slot_info.type == SlotType.group}
@@ -444,7 +870,11 @@ class Context:
         self.seed_name = decoded_obj["seed_name"]
         self.random.seed(self.seed_name)
         self.connect_names = decoded_obj['connect_names']
-        self.locations = LocationStore(decoded_obj.pop("locations"))  # pre-emptively free memory
+        if isinstance(decoded_obj, NetUtils.MultiData):
+            self.locations = decoded_obj.get_location_store()
+        else:
+            self.locations = LocationStore(decoded_obj.pop("locations"))  # pre-emptively free memory
+        self.item_locations = None
         self.slot_data = decoded_obj['slot_data']
         for slot, data in self.slot_data.items():
             self.read_data[f"slot_data_{slot}"] = lambda data=data: data
@@ -503,13 +933,16 @@ class Context:
 
     def _save(self, exit_save: bool = False) -> bool:
         try:
-            encoded_save = pickle.dumps(self.get_save())
+            start = time.perf_counter()
+            encoded_save = zlib.compress(pickle.dumps(self.get_save()))
             with open(self.save_filename, "wb") as f:
-                f.write(zlib.compress(encoded_save))
+                f.write(encoded_save)
         except Exception as e:
             self.logger.exception(e)
             return False
         else:
+            if self.metrics:
+                self.metrics.observe_save(time.perf_counter() - start, len(encoded_save))
             return True
 
     def init_save(self, enabled: bool = True):
@@ -563,7 +996,7 @@ class Context:
         d = {
             "version": self.save_version,
             "connect_names": self.connect_names,
-            "received_items": self.received_items,
+            "received_items": self.received_items.get_state(),
             "hints_used": dict(self.hints_used),
             "hints": dict(self.hints),
             "location_checks": dict(self.location_checks),
@@ -591,11 +1024,12 @@ class Context:
             raise Exception("This savegame does not appear to match the loaded multiworld.")
         if savedata["version"] > self.save_version:
             raise Exception("This savegame is newer than the server.")
-        self.received_items = savedata["received_items"]
+        self.received_items = ReceivedItemsStore(savedata["received_items"])
         self.hints_used.update(savedata["hints_used"])
         self.hints.update(savedata["hints"])
 
         self.name_aliases.update(savedata["name_aliases"])
+        self.encoded_connected_parts.pop("players", None)
         self.client_game_state.update(savedata["client_game_state"])
         self.client_connection_timers.update(
             {tuple(key): datetime.datetime.fromtimestamp(value, datetime.timezone.utc) for key, value
@@ -659,6 +1093,19 @@ class Context:
     def get_players_package(self):
         return [NetworkPlayer(t, p, self.get_aliased_name(t, p), n) for (t, p), n in self.player_names.items()]
 
+    def get_encoded_connected_part(self, key: typing.Union[str, int]) -> str:
+        """Returns "players", "slot_info" or the slot_data of a slot as encoded for Connected."""
+        part = self.encoded_connected_parts.get(key, None)
+        if part is None:
+            if key == "players":
+                data = self.get_players_package()
+            elif key == "slot_info":
+                data = self.slot_info
+            else:
+                data = self.slot_data[key]
+            part = self.encoded_connected_parts[key] = self.dumper(data)
+        return part
+
     def slot_set(self, slot) -> typing.Set[int]:
         """Returns the slot IDs that concern that slot,
         as in expands groups out and returns back the input for solo."""
@@ -760,8 +1207,8 @@ class Context:
 
 
 def update_aliases(ctx: Context, team: int):
-    cmd = ctx.dumper([{"cmd": "RoomUpdate",
-                       "players": ctx.get_players_package()}])
+    ctx.encoded_connected_parts.pop("players", None)
+    cmd = f'[{{"cmd":"RoomUpdate","players":{ctx.get_encoded_connected_part("players")}}}]'
 
     for clients in ctx.clients[team].values():
         for client in clients:
@@ -781,8 +1228,17 @@ async def server(websocket, path: str = "/", ctx: Context = None):
         async for data in websocket:
             if ctx.log_network:
                 ctx.logger.info(f"Incoming message: {data}")
-            for msg in decode(data):
-                await process_client_cmd(ctx, client, msg)
+            if ctx.metrics:
+                ctx.metrics.observe_in(data)
+                for msg in decode(data):
+                    start = time.perf_counter()
+                    try:
+                        await process_client_cmd(ctx, client, msg)
+                    finally:
+                        ctx.metrics.observe_handler(msg, time.perf_counter() - start)
+            else:
+                for msg in decode(data):
+                    await process_client_cmd(ctx, client, msg)
     except Exception as e:
         if not isinstance(e, websockets.WebSocketException):
             ctx.logger.exception(e)
@@ -931,8 +1387,8 @@ def get_status_string(ctx: Context, team: int, tag: str):
     return text
 
 
-def get_received_items(ctx: Context, team: int, player: int, remote_items: bool) -> typing.List[NetworkItem]:
-    return ctx.received_items.setdefault((team, player, remote_items), [])
+def get_received_items(ctx: Context, team: int, player: int, remote_items: bool) -> typing.Sequence[NetworkItem]:
+    return ctx.received_items[team, player, remote_items]
 
 
 def get_start_inventory(ctx: Context, player: int, remote_start_inventory: bool) -> typing.List[NetworkItem]:
@@ -998,9 +1454,7 @@ def get_remaining(ctx: Context, team: int, slot: int) -> typing.List[int]:
 def send_items_to(ctx: Context, team: int, target_slot: int, *items: NetworkItem):
     for target in ctx.slot_set(target_slot):
         for item in items:
-            if item.player != target_slot:
-                get_received_items(ctx, team, target, False).append(item)
-            get_received_items(ctx, team, target, True).append(item)
+            ctx.received_items.add(team, target, item, item.player == target_slot)
 
 
 def register_location_checks(ctx: Context, team: int, slot: int, locations: typing.Iterable[int],
@@ -1044,7 +1498,7 @@ def collect_hints(ctx: Context, team: int, slot: int, item: typing.Union[int, st
 
     seeked_item_id = item if isinstance(item, int) else ctx.item_names_for_game(ctx.games[slot])[item]
     for finding_player, location_id, item_id, receiving_player, item_flags \
-            in ctx.locations.find_item(slots, seeked_item_id):
+            in ctx.find_item(slots, seeked_item_id):
         found = location_id in ctx.location_checks[team, finding_player]
         entrance = ctx.er_hint_data.get(finding_player, {}).get(location_id, "")
         hints.append(NetUtils.Hint(receiving_player, finding_player, location_id, item_id, found, entrance,
@@ -1449,15 +1903,12 @@ class ClientMessageProcessor(CommonCommandProcessor):
     def _cmd_getitem(self, item_name: str) -> bool:
         """Cheat in an item, if it is enabled on this server"""
         if self.ctx.item_cheat:
-            names = self.ctx.item_names_for_game(self.ctx.games[self.client.slot])
-            item_name, usable, response = get_intended_text(
-                item_name,
-                names
-            )
+            game = self.ctx.games[self.client.slot]
+            names = self.ctx.item_names_for_game(game)
+            item_name, usable, response = self.ctx.get_name_index("items", game).get_intended_text(item_name)
             if usable:
                 new_item = NetworkItem(names[item_name], -1, self.client.slot)
-                get_received_items(self.ctx, self.client.team, self.client.slot, False).append(new_item)
-                get_received_items(self.ctx, self.client.team, self.client.slot, True).append(new_item)
+                self.ctx.received_items.add(self.client.team, self.client.slot, new_item, False)
                 self.ctx.broadcast_text_all(
                     'Cheat console: sending "' + item_name + '" to ' + self.ctx.get_aliased_name(self.client.team,
                                                                                                  self.client.slot),
@@ -1509,10 +1960,8 @@ class ClientMessageProcessor(CommonCommandProcessor):
             if game not in self.ctx.all_item_and_group_names:
                 self.output("Can't look up item/location for unknown game. Hint for ID instead.")
                 return False
-            names = self.ctx.all_location_and_group_names[game] \
-                if for_location else \
-                self.ctx.all_item_and_group_names[game]
-            hint_name, usable, response = get_intended_text(input_text, names)
+            names = self.ctx.get_name_index("locations_and_groups" if for_location else "items_and_groups", game)
+            hint_name, usable, response = names.get_intended_text(input_text)
 
             if usable:
                 if hint_name in self.ctx.non_hintable_names[game]:
@@ -1634,6 +2083,102 @@ def get_slot_points(ctx: Context, team: int, slot: int) -> int:
             ctx.get_hint_cost(slot) * ctx.hints_used[team, slot])
 
 
+async def on_client_connect(ctx: Context, client: Client, args: dict):
+    if not args or 'password' not in args or type(args['password']) not in [str, type(None)] or \
+            'game' not in args:
+        await ctx.send_msgs(client, [{'cmd': 'InvalidPacket', "type": "arguments", 'text': 'Connect',
+                                      "original_cmd": "Connect"}])
+        return
+
+    errors = set()
+    if ctx.password and args['password'] != ctx.password:
+        errors.add('InvalidPassword')
+
+    if args['name'] not in ctx.connect_names:
+        errors.add('InvalidSlot')
+    else:
+        team, slot = ctx.connect_names[args['name']]
+        game = ctx.games[slot]
+
+        ignore_game = not args.get("game") and any(tag in _non_game_messages for tag in args["tags"])
+
+        if not ignore_game and args['game'] != game:
+            errors.add('InvalidGame')
+        minver = min_client_version if ignore_game else ctx.minimum_client_versions[slot]
+        if minver > args['version']:
+            errors.add('IncompatibleVersion')
+        try:
+            client.items_handling = args['items_handling']
+        except (ValueError, TypeError):
+            errors.add('InvalidItemsHandling')
+
+    # only exact version match allowed
+    if ctx.compatibility == 0 and args['version'] != version_tuple:
+        errors.add('IncompatibleVersion')
+    if errors:
+        ctx.logger.info(f"A client connection was refused due to: {errors}, the sent connect information was {args}.")
+        await ctx.send_msgs(client, [{"cmd": "ConnectionRefused", "errors": list(errors)}])
+    else:
+        team, slot = ctx.connect_names[args['name']]
+        if client.auth and client.team is not None and client.slot in ctx.clients[client.team]:
+            ctx.clients[team][slot].remove(client)  # re-auth, remove old entry
+            if client.team != team or client.slot != slot:
+                client.auth = False  # swapping Team/Slot
+        ctx.update_bounce_index(client, False)
+        client.team = team
+        client.slot = slot
+
+        ctx.client_ids[client.team, client.slot] = args["uuid"]
+        ctx.clients[team][slot].append(client)
+        client.version = args['version']
+        client.tags = args['tags']
+        ctx.update_bounce_index(client, True)
+        client.no_locations = 'TextOnly' in client.tags or 'Tracker' in client.tags
+        # players, slot_info and slot_data are the same for every client, so they are spliced in pre-encoded
+        connected_packet = (
+            f'{{"cmd":"Connected","team":{client.team},"slot":{client.slot},'
+            f'"players":{ctx.get_encoded_connected_part("players")},'
+            f'"missing_locations":{ctx.dumper(get_missing_checks(ctx, team, slot))},'
+            f'"checked_locations":{ctx.dumper(get_checked_checks(ctx, team, slot))},'
+            f'"slot_info":{ctx.get_encoded_connected_part("slot_info")},'
+            f'"hint_points":{get_slot_points(ctx, team, slot)}'
+        )
+        reply = []
+        start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
+        items = get_received_items(ctx, client.team, client.slot, client.remote_items)
+        if (start_inventory or items) and not client.no_items:
+            reply.append({"cmd": 'ReceivedItems', "index": 0, "items": start_inventory + items[:]})
+            client.send_index = len(start_inventory) + len(items)
+        if not client.auth:  # if this was a Re-Connect, don't print to console
+            client.auth = True
+            await on_client_joined(ctx, client)
+        if args.get("slot_data", True):
+            connected_packet += f',"slot_data":{ctx.get_encoded_connected_part(client.slot)}'
+        reply = ",".join([connected_packet + "}"] + [ctx.dumper(msg) for msg in reply])
+        await ctx.send_encoded_msgs(client, f"[{reply}]")
+
+
+async def process_connects(ctx: Context):
+    """Processes queued Connects in the order they arrived, one per event loop iteration, so messages of clients
+    that are already playing get handled between connects."""
+    try:
+        while ctx.connect_queue:
+            client, args, done = ctx.connect_queue.popleft()
+            if done.cancelled():  # client went away while waiting
+                continue
+            try:
+                await on_client_connect(ctx, client, args)
+            except Exception as e:
+                if not done.cancelled():
+                    done.set_exception(e)
+            else:
+                if not done.cancelled():
+                    done.set_result(None)
+            await asyncio.sleep(0)
+    finally:
+        ctx.connecting = False
+
+
 async def process_client_cmd(ctx: Context, client: Client, args: dict):
     try:
         cmd: str = args["cmd"]
@@ -1649,96 +2194,26 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
         return
 
     if cmd == 'Connect':
-        if not args or 'password' not in args or type(args['password']) not in [str, type(None)] or \
-                'game' not in args:
-            await ctx.send_msgs(client, [{'cmd': 'InvalidPacket', "type": "arguments", 'text': 'Connect',
-                                          "original_cmd": cmd}])
-            return
-
-        errors = set()
-        if ctx.password and args['password'] != ctx.password:
-            errors.add('InvalidPassword')
-
-        if args['name'] not in ctx.connect_names:
-            errors.add('InvalidSlot')
-        else:
-            team, slot = ctx.connect_names[args['name']]
-            game = ctx.games[slot]
-
-            ignore_game = not args.get("game") and any(tag in _non_game_messages for tag in args["tags"])
-
-            if not ignore_game and args['game'] != game:
-                errors.add('InvalidGame')
-            minver = min_client_version if ignore_game else ctx.minimum_client_versions[slot]
-            if minver > args['version']:
-                errors.add('IncompatibleVersion')
-            try:
-                client.items_handling = args['items_handling']
-            except (ValueError, TypeError):
-                errors.add('InvalidItemsHandling')
-
-        # only exact version match allowed
-        if ctx.compatibility == 0 and args['version'] != version_tuple:
-            errors.add('IncompatibleVersion')
-        if errors:
-            ctx.logger.info(f"A client connection was refused due to: {errors}, the sent connect information was {args}.")
-            await ctx.send_msgs(client, [{"cmd": "ConnectionRefused", "errors": list(errors)}])
-        else:
-            team, slot = ctx.connect_names[args['name']]
-            if client.auth and client.team is not None and client.slot in ctx.clients[client.team]:
-                ctx.clients[team][slot].remove(client)  # re-auth, remove old entry
-                if client.team != team or client.slot != slot:
-                    client.auth = False  # swapping Team/Slot
-            client.team = team
-            client.slot = slot
-
-            ctx.client_ids[client.team, client.slot] = args["uuid"]
-            ctx.clients[team][slot].append(client)
-            client.version = args['version']
-            client.tags = args['tags']
-            client.no_locations = 'TextOnly' in client.tags or 'Tracker' in client.tags
-            connected_packet = {
-                "cmd": "Connected",
-                "team": client.team, "slot": client.slot,
-                "players": ctx.get_players_package(),
-                "missing_locations": get_missing_checks(ctx, team, slot),
-                "checked_locations": get_checked_checks(ctx, team, slot),
-                "slot_info": ctx.slot_info,
-                "hint_points": get_slot_points(ctx, team, slot),
-            }
-            reply = [connected_packet]
-            start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
-            items = get_received_items(ctx, client.team, client.slot, client.remote_items)
-            if (start_inventory or items) and not client.no_items:
-                reply.append({"cmd": 'ReceivedItems', "index": 0, "items": start_inventory + items})
-                client.send_index = len(start_inventory) + len(items)
-            if not client.auth:  # if this was a Re-Connect, don't print to console
-                client.auth = True
-                await on_client_joined(ctx, client)
-            if args.get("slot_data", True):
-                connected_packet["slot_data"] = ctx.slot_data[client.slot]
-            await ctx.send_msgs(client, reply)
+        # the client's further messages wait for its Connect, so they are handled after it, as before
+        done = asyncio.get_running_loop().create_future()
+        ctx.connect_queue.append((client, args, done))
+        if not ctx.connecting:
+            ctx.connecting = True
+            async_start(process_connects(ctx), name="process connects")
+        await done
 
     elif cmd == "GetDataPackage":
         exclusions = args.get("exclusions", [])
         if "games" in args:
-            games = {name: game_data for name, game_data in ctx.gamespackage.items()
-                     if name in set(args.get("games", []))}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": games}}])
+            requested_games = set(args.get("games", []))
+            games = [name for name in ctx.gamespackage if name in requested_games]
         # TODO: remove exclusions behaviour around 0.5.0
         elif exclusions:
             exclusions = set(exclusions)
-            games = {name: game_data for name, game_data in ctx.gamespackage.items()
-                     if name not in exclusions}
-
-            package = {"games": games}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": package}])
-
+            games = [name for name in ctx.gamespackage if name not in exclusions]
         else:
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": ctx.gamespackage}}])
+            games = ctx.gamespackage
+        await ctx.send_encoded_msgs(client, ctx.get_data_package_msg(games))
 
     elif client.auth:
         if cmd == "ConnectUpdate":
@@ -1755,7 +2230,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                     if (items or start_inventory) and not client.no_items:
                         client.send_index = len(start_inventory) + len(items)
                         await ctx.send_msgs(client, [{"cmd": "ReceivedItems", "index": 0,
-                                                      "items": start_inventory + items}])
+                                                      "items": start_inventory + items[:]}])
                     else:
                         client.send_index = 0
                 except (ValueError, TypeError) as err:
@@ -1766,7 +2241,9 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
 
             if "tags" in args:
                 old_tags = client.tags
+                ctx.update_bounce_index(client, False)
                 client.tags = args["tags"]
+                ctx.update_bounce_index(client, True)
                 if set(old_tags) != set(client.tags):
                     client.no_locations = 'TextOnly' in client.tags or 'Tracker' in client.tags
                     ctx.broadcast_text_all(
@@ -1780,7 +2257,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             if (start_inventory or items) and not client.no_items:
                 client.send_index = len(start_inventory) + len(items)
                 await ctx.send_msgs(client, [{"cmd": "ReceivedItems", "index": 0,
-                                              "items": start_inventory + items}])
+                                              "items": start_inventory + items[:]}])
 
         elif cmd == 'LocationChecks':
             if client.no_locations:
@@ -1822,17 +2299,14 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             client.messageprocessor(args["text"])
 
         elif cmd == "Bounce":
-            games = set(args.get("games", []))
-            tags = set(args.get("tags", []))
-            slots = set(args.get("slots", []))
+            if not ctx.allow_bounce(client.team, client.slot):
+                ctx.logger.debug(f"Dropped Bounce from {ctx.get_aliased_name(client.team, client.slot)} "
+                                 f"(Team #{client.team + 1}), as it is over the bounce rate limit.")
+                return
+            recipients = ctx.get_bounce_recipients(client.team, args.get("games", ()), args.get("tags", ()),
+                                                   args.get("slots", ()))
             args["cmd"] = "Bounced"
-            msg = ctx.dumper([args])
-
-            for bounceclient in ctx.endpoints:
-                if client.team == bounceclient.team and (ctx.games[bounceclient.slot] in games or
-                                                         set(bounceclient.tags) & tags or
-                                                         bounceclient.slot in slots):
-                    await ctx.send_encoded_msgs(bounceclient, msg)
+            await ctx.broadcast_send_encoded_msgs(recipients, ctx.dumper([args]))
 
         elif cmd == "Get":
             if "keys" not in args or type(args["keys"]) != list:
@@ -2035,8 +2509,9 @@ class ServerCommandProcessor(CommonCommandProcessor):
         if usable:
             team, slot = self.ctx.player_name_lookup[seeked_player]
             item_name = " ".join(item_name)
-            names = self.ctx.item_names_for_game(self.ctx.games[slot])
-            item_name, usable, response = get_intended_text(item_name, names)
+            game = self.ctx.games[slot]
+            names = self.ctx.item_names_for_game(game)
+            item_name, usable, response = self.ctx.get_name_index("items", game).get_intended_text(item_name)
             if usable:
                 amount: int = int(amount)
                 new_items = [NetworkItem(names[item_name], -1, 0) for _ in range(int(amount))]
@@ -2069,7 +2544,7 @@ class ServerCommandProcessor(CommonCommandProcessor):
             if full_name.isnumeric():
                 location, usable, response = int(full_name), True, None
             elif self.ctx.location_names_for_game(game) is not None:
-                location, usable, response = get_intended_text(full_name, self.ctx.location_names_for_game(game))
+                location, usable, response = self.ctx.get_name_index("locations", game).get_intended_text(full_name)
             else:
                 self.output("Can't look up location for unknown game. Send by ID instead.")
                 return False
@@ -2100,7 +2575,8 @@ class ServerCommandProcessor(CommonCommandProcessor):
             if full_name.isnumeric():
                 item, usable, response = int(full_name), True, None
             elif game in self.ctx.all_item_and_group_names:
-                item, usable, response = get_intended_text(full_name, self.ctx.all_item_and_group_names[game])
+                item, usable, response = self.ctx.get_name_index("items_and_groups", game).get_intended_text(
+                    full_name)
             else:
                 self.output("Can't look up item for unknown game. Hint for ID instead.")
                 return False
@@ -2139,7 +2615,8 @@ class ServerCommandProcessor(CommonCommandProcessor):
             if full_name.isnumeric():
                 location, usable, response = int(full_name), True, None
             elif game in self.ctx.all_location_and_group_names:
-                location, usable, response = get_intended_text(full_name, self.ctx.all_location_and_group_names[game])
+                location, usable, response = self.ctx.get_name_index("locations_and_groups", game).get_intended_text(
+                    full_name)
             else:
                 self.output("Can't look up location for unknown game. Hint for ID instead.")
                 return False
@@ -2284,6 +2761,9 @@ def parse_args() -> argparse.Namespace:
     #0 -> recommended for tournaments to force a level playing field, only allow an exact version match
     """)
     parser.add_argument('--log_network', default=defaults["log_network"], action="store_true")
+    parser.add_argument('--metrics_port', type=int,
+                        help="Serve server metrics in the Prometheus text format on this port of localhost.")
+    parser.add_argument('--metrics_file', help="Write server metrics as json to this file every minute.")
     args = parser.parse_args()
     return args
 
@@ -2322,6 +2802,19 @@ def load_server_cert(path: str, cert_key: typing.Optional[str]) -> "ssl.SSLConte
     return ssl_context
 
 
+async def dump_metrics_regularly(ctx: Context, path: str, interval: float = 60):
+    while not ctx.exit_event.is_set():
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(ctx.exit_event.wait(), interval)
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"time": time.time(), **ctx.metrics.to_dict(ctx)}, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            ctx.logger.warning(f"Could not write metrics to {path}: {e}")
+
+
 async def main(args: argparse.Namespace):
     Utils.init_logging("Server", loglevel=args.loglevel.lower())
 
@@ -2368,6 +2861,15 @@ async def main(args: argparse.Namespace):
                                                  'No password' if not ctx.password else 'Password: %s' % ctx.password))
 
     await ctx.server
+    if args.metrics_port or args.metrics_file:
+        ctx.enable_metrics()
+    if args.metrics_port:
+        await serve_metrics("127.0.0.1", args.metrics_port,
+                            lambda: format_prometheus_metrics(ctx.metrics.get_samples(ctx) +
+                                                              ctx.metrics.event_loop.get_samples()))
+        logging.info(f"Serving metrics at http://127.0.0.1:{args.metrics_port}/metrics")
+    if args.metrics_file:
+        async_start(dump_metrics_regularly(ctx, args.metrics_file), name="metrics dump")
     console_task = asyncio.create_task(console(ctx))
     if ctx.auto_shutdown:
         ctx.shutdown_task = asyncio.create_task(auto_shutdown(ctx, [console_task]))
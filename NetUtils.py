@@ -2,13 +2,17 @@ from __future__ import annotations
 
 import typing
 import enum
+import sys
 import warnings
+from array import array
 from json import JSONEncoder, JSONDecoder
 
 import websockets
 
 from Utils import ByValue, Version
 
+_little_endian = sys.byteorder == "little"
+
 
 class JSONMessagePart(typing.TypedDict, total=False):
     text: str
@@ -404,12 +408,152 @@ class _LocationStore(dict, typing.MutableMapping[int, typing.Dict[int, typing.Tu
                        location_id in player_locations if
                        location_id not in checked])
 
+    @classmethod
+    def from_array(cls, entries: array, players: int) -> _LocationStore:
+        """Builds the store from a flat array("q") of sender, location, item, receiver and flags for each location,
+        sorted by sender and location, as created by locations_to_array. Senders are 1 to players."""
+        locations: typing.Dict[int, typing.Dict[int, typing.Tuple[int, int, int]]] = \
+            {player: {} for player in range(1, players + 1)}
+        for i in range(0, len(entries), 5):
+            sender, location, item, receiver, flags = entries[i:i + 5]
+            if sender not in locations:
+                raise ValueError(f"Invalid player id {sender} for location")
+            locations[sender][location] = item, receiver, flags
+        return cls(locations)
+
+
+class _ReceivedItems(typing.Sequence[NetworkItem]):
+    """Items received by one slot of a team, as seen by a client with or without remote_items."""
+    __slots__ = ("_records", "_indices")
+
+    def __init__(self, records: array, indices: typing.Optional[array]) -> None:
+        self._records = records  # item, location, player, flags; shared by both views of a slot
+        self._indices = indices  # records that are not the slot's own items, None for remote_items
+
+    def __len__(self) -> int:
+        if self._indices is None:
+            return len(self._records) // 4
+        return len(self._indices)
+
+    def _get(self, index: int) -> NetworkItem:
+        if self._indices is not None:
+            index = self._indices[index]
+        return NetworkItem(*self._records[index * 4:index * 4 + 4])
+
+    @typing.overload
+    def __getitem__(self, index: int) -> NetworkItem: ...
+
+    @typing.overload
+    def __getitem__(self, index: slice) -> typing.List[NetworkItem]: ...
+
+    def __getitem__(self, index: typing.Union[int, slice]) -> typing.Union[NetworkItem, typing.List[NetworkItem]]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if self._indices is None and step == 1:
+                # read straight out of the record buffer
+                records = iter(self._records[start * 4:stop * 4])
+                return list(map(NetworkItem, records, records, records, records))
+            return [self._get(i) for i in range(start, stop, step)]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("received items index out of range")
+        return self._get(index)
+
+
+class _ReceivedItemsStore:
+    """
+    Compact store of the items received by every slot in a MultiServer. Views are looked up like the dict it
+    replaces, with (team, slot, remote_items) keys. Each item is one fixed size record in a growable buffer per slot,
+    the view without the slot's own items is an index into the same records.
+    """
+    # saved state: (team, slot) -> (records as little endian int64, non-own indices as little endian uint32)
+    State = typing.Dict[typing.Tuple[int, int], typing.Tuple[bytes, bytes]]
+
+    def __init__(self, saved: typing.Optional[typing.Mapping[typing.Tuple[int, ...], typing.Any]] = None) -> None:
+        self._records: typing.Dict[typing.Tuple[int, int], array] = {}
+        self._indices: typing.Dict[typing.Tuple[int, int], array] = {}
+        self._views: typing.Dict[typing.Tuple[int, int, bool], _ReceivedItems] = {}
+        if not saved:
+            return
+        if len(next(iter(saved))) == 3:
+            # saves from before the store have a list of NetworkItems per (team, slot, remote_items)
+            for (team, slot, remote_items), items in saved.items():
+                if remote_items:
+                    self._load_lists(team, slot, items, saved.get((team, slot, False), []))
+            return
+        for (team, slot), (records, indices) in saved.items():
+            self._records[team, slot] = array("q", records)
+            self._indices[team, slot] = array("I", indices)
+            if not _little_endian:
+                self._records[team, slot].byteswap()
+                self._indices[team, slot].byteswap()
+
+    def _load_lists(self, team: int, slot: int, items: typing.Sequence[NetworkItem],
+                    non_own_items: typing.Sequence[NetworkItem]) -> None:
+        # non_own_items is a subsequence of items, match them up in order
+        position = 0
+        for item in items:
+            own = position >= len(non_own_items) or non_own_items[position] != item
+            if not own:
+                position += 1
+            self.add(team, slot, item, own)
+
+    def _get_slot(self, team: int, slot: int) -> typing.Tuple[array, array]:
+        try:
+            return self._records[team, slot], self._indices[team, slot]
+        except KeyError:
+            records = self._records[team, slot] = array("q")
+            indices = self._indices[team, slot] = array("I")
+            return records, indices
+
+    def __getitem__(self, key: typing.Tuple[int, int, bool]) -> _ReceivedItems:
+        view = self._views.get(key, None)
+        if view is None:
+            team, slot, remote_items = key
+            records, indices = self._get_slot(team, slot)
+            view = self._views[key] = _ReceivedItems(records, None if remote_items else indices)
+        return view
+
+    def __iter__(self) -> typing.Iterator[typing.Tuple[int, int, bool]]:
+        for team, slot in self._records:
+            yield team, slot, False
+            yield team, slot, True
+
+    def __len__(self) -> int:
+        return len(self._records) * 2
+
+    def items(self) -> typing.Iterator[typing.Tuple[typing.Tuple[int, int, bool], _ReceivedItems]]:
+        for key in self:
+            yield key, self[key]
+
+    def add(self, team: int, slot: int, item: NetworkItem, own: bool) -> None:
+        """Adds item to a slot's received items. Own items are only sent to clients with remote_items."""
+        records, indices = self._get_slot(team, slot)
+        if not own:
+            indices.append(len(records) // 4)
+        records.extend(item)
+
+    def get_state(self) -> State:
+        """Returns the store as builtins for saving, independent of the implementation and platform."""
+        state: _ReceivedItemsStore.State = {}
+        for key, records in self._records.items():
+            indices = self._indices[key]
+            if not _little_endian:
+                records = records[:]
+                records.byteswap()
+                indices = indices[:]
+                indices.byteswap()
+            state[key] = records.tobytes(), indices.tobytes()
+        return state
+
 
 if typing.TYPE_CHECKING:  # type-check with pure python implementation until we have a typing stub
     LocationStore = _LocationStore
+    ReceivedItemsStore = _ReceivedItemsStore
 else:
     try:
-        from _speedups import LocationStore
+        from _speedups import LocationStore, ReceivedItemsStore
         import _speedups
         import os.path
         if os.path.isfile("_speedups.pyx") and os.path.getctime(_speedups.__file__) < os.path.getctime("_speedups.pyx"):
@@ -422,8 +566,135 @@ else:
         except ImportError:
             pyximport = None
         try:
-            from _speedups import LocationStore
+            from _speedups import LocationStore, ReceivedItemsStore
         except ImportError:
             warnings.warn("_speedups not available. Falling back to pure python LocationStore. "
                           "Install a matching C++ compiler for your platform to compile _speedups.")
             LocationStore = _LocationStore
+            ReceivedItemsStore = _ReceivedItemsStore
+
+
+def locations_to_array(locations: typing.Mapping[int, typing.Mapping[int, typing.Sequence[int]]]) -> array:
+    """Flattens multidata locations to sender, location, item, receiver and flags for each location,
+    sorted by sender and location, for LocationStore.from_array."""
+    entries = array("q")
+    for sender, sender_locations in sorted(locations.items()):
+        for location, data in sorted(sender_locations.items()):
+            entries.extend((sender, location, data[0], data[1], data[2] if len(data) > 2 else 0))
+    return entries
+
+
+class MultiData(typing.Mapping[str, typing.Any]):
+    """
+    Multidata of format version 4, where the large parts are compressed separately and only decoded when accessed.
+    Layout: format version byte, 4 byte little endian length of the json index, the index of section offsets and
+    lengths, then the zlib compressed sections. Locations are stored as the array of locations_to_array,
+    everything that doesn't have a section of its own is pickled together in the "main" section.
+    """
+    format_version = 4
+    sections = ("locations", "slot_data", "spheres", "precollected_hints", "er_hint_data", "checks_in_area",
+                "datapackage")
+
+    _raw: typing.Dict[str, typing.Union[bytes, memoryview]]
+    _decoded: typing.Dict[str, typing.Any]
+    _main: typing.Dict[str, typing.Any]
+    players: int
+    """ number of slots, senders of locations are 1 to players """
+
+    def __init__(self, data: typing.Union[bytes, memoryview]) -> None:
+        import json
+
+        view = memoryview(data)
+        if view[0] != self.format_version:
+            raise ValueError(f"Multidata is not format version {self.format_version}")
+        index_end = 5 + int.from_bytes(view[1:5], "little")
+        index = json.loads(bytes(view[5:index_end]))
+        self.players = index["players"]
+        self._raw = {name: view[index_end + offset:index_end + offset + length]
+                     for name, (offset, length) in index["sections"].items()}
+        self._decoded = {}
+        self._main = self._decode("main")
+
+    @classmethod
+    def encode(cls, multidata: typing.Mapping[str, typing.Any]) -> bytes:
+        """Encodes a complete multidata dict, or a MultiData that may have had sections modified."""
+        if isinstance(multidata, MultiData):
+            sections = {name: multidata._encode_section(name, multidata._decoded[name])
+                        if name in multidata._decoded else multidata._raw[name]
+                        for name in multidata._raw if name != "main"}
+            main = multidata._main
+            players = multidata.players
+        else:
+            sections = {name: cls._encode_section(name, multidata[name]) for name in cls.sections if name in multidata}
+            main = {key: value for key, value in multidata.items() if key not in cls.sections}
+            players = len(multidata["locations"])
+        sections["main"] = cls._encode_section("main", main)
+        return cls._pack(sections, players)
+
+    @staticmethod
+    def _encode_section(name: str, value: typing.Any) -> bytes:
+        import pickle
+        import zlib
+
+        if name == "locations":
+            entries = locations_to_array(value)
+            if sys.byteorder == "big":
+                entries.byteswap()
+            return zlib.compress(entries.tobytes(), 9)
+        return zlib.compress(pickle.dumps(value), 9)
+
+    @classmethod
+    def _pack(cls, sections: typing.Dict[str, typing.Union[bytes, memoryview]], players: int) -> bytes:
+        import json
+
+        index_sections: typing.Dict[str, typing.Tuple[int, int]] = {}
+        offset = 0
+        for name, section in sections.items():
+            index_sections[name] = offset, len(section)
+            offset += len(section)
+        index = json.dumps({"players": players, "sections": index_sections}).encode()
+        return b"".join((bytes((cls.format_version,)), len(index).to_bytes(4, "little"), index, *sections.values()))
+
+    def _decode(self, name: str) -> typing.Any:
+        import zlib
+        from Utils import restricted_loads
+
+        return restricted_loads(zlib.decompress(self._raw[name]))
+
+    def _get_location_array(self) -> array:
+        import zlib
+
+        entries = array("q")
+        entries.frombytes(zlib.decompress(self._raw["locations"]))
+        if sys.byteorder == "big":
+            entries.byteswap()
+        return entries
+
+    def get_location_store(self) -> LocationStore:
+        """Builds a LocationStore straight from the locations section."""
+        if "locations" in self._decoded:
+            return LocationStore(self._decoded["locations"])
+        return LocationStore.from_array(self._get_location_array(), self.players)
+
+    def __getitem__(self, key: str) -> typing.Any:
+        if key in self._decoded:
+            return self._decoded[key]
+        if key in self._raw and key != "main":
+            if key == "locations":
+                # plain dict of dicts, like the other multidata formats
+                value = dict(_LocationStore.from_array(self._get_location_array(), self.players))
+            else:
+                value = self._decode(key)
+            self._decoded[key] = value
+            return value
+        return self._main[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._main or (key in self._raw and key != "main")
+
+    def __iter__(self) -> typing.Iterator[str]:
+        yield from self._main
+        yield from (name for name in self._raw if name != "main")
+
+    def __len__(self) -> int:
+        return len(self._main) + len(self._raw) - 1
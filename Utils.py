@@ -12,8 +12,10 @@ import pickle
 import functools
 import io
 import collections
+import contextlib
 import importlib
 import logging
+import threading
 import warnings
 
 from argparse import Namespace
@@ -28,6 +30,8 @@ except ImportError:
     from yaml import Loader as UnsafeLoader, SafeLoader, Dumper
 
 if typing.TYPE_CHECKING:
+    import mmap
+    import sqlite3
     import tkinter
     import pathlib
     from BaseClasses import Region
@@ -53,6 +57,9 @@ is_linux = sys.platform.startswith("linux")
 is_macos = sys.platform == "darwin"
 is_windows = sys.platform in ("win32", "cygwin", "msys")
 
+# set before worlds is first imported, to only import worlds on demand through worlds.load_world
+lazy_world_loading = False
+
 
 def int16_as_bytes(value: int) -> typing.List[int]:
     value = value & 0xFFFF
@@ -300,30 +307,78 @@ def get_options() -> Settings:
     return get_settings()
 
 
-def persistent_store(category: str, key: str, value: typing.Any):
+_persistent_storage: Optional["sqlite3.Connection"] = None
+_persistent_storage_lock = threading.Lock()
+
+
+def _open_persistent_storage() -> "sqlite3.Connection":
+    """Opens the persistent storage database, migrating the old yaml store into it on first use.
+    Has to be called while holding _persistent_storage_lock."""
+    global _persistent_storage
+    if _persistent_storage is None:
+        import sqlite3
+        connection = sqlite3.connect(user_path("_persistent_storage.sqlite3"), timeout=10, check_same_thread=False)
+        with connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS storage (category TEXT NOT NULL, key TEXT NOT NULL, "
+                               "value TEXT NOT NULL, PRIMARY KEY (category, key))")
+        _migrate_persistent_yaml(connection)
+        _persistent_storage = connection
+    return _persistent_storage
+
+
+def _migrate_persistent_yaml(connection: "sqlite3.Connection") -> None:
     path = user_path("_persistent_storage.yaml")
-    storage = persistent_load()
-    category_dict = storage.setdefault(category, {})
-    category_dict[key] = value
-    with open(path, "wt") as f:
-        f.write(dump(storage, Dumper=Dumper))
+    if not os.path.exists(path):
+        return
+    storage: Optional[Dict[str, Dict[str, Any]]] = None
+    try:
+        with open(path, "r") as f:
+            storage = unsafe_parse_yaml(f.read())
+    except Exception as e:
+        logging.debug(f"Could not read store: {e}")
+    storage = storage or {}
+    # data packages have their own per-checksum cache
+    for game, data in storage.pop("datapackage", {}).get("games", {}).items():
+        store_data_package_for_checksum(game, data)
+    with connection:
+        connection.executemany("INSERT OR IGNORE INTO storage VALUES (?, ?, ?)",
+                               ((category, key, dump(value, Dumper=Dumper))
+                                for category, category_dict in storage.items() for key, value in category_dict.items()))
+    # another process may have migrated the file in the meantime
+    with contextlib.suppress(FileNotFoundError):
+        os.replace(path, f"{path}.bak")
+
+
+def persistent_store(category: str, key: str, value: typing.Any):
+    with _persistent_storage_lock:
+        connection = _open_persistent_storage()
+        with connection:
+            connection.execute("INSERT OR REPLACE INTO storage VALUES (?, ?, ?)",
+                               (category, key, dump(value, Dumper=Dumper)))
+
+
+def persistent_get(category: str, key: str, default: typing.Any = None) -> typing.Any:
+    try:
+        with _persistent_storage_lock:
+            row = _open_persistent_storage().execute("SELECT value FROM storage WHERE category = ? AND key = ?",
+                                                     (category, key)).fetchone()
+    except Exception as e:
+        logging.debug(f"Could not read store: {e}")
+        return default
+    return default if row is None else unsafe_parse_yaml(row[0])
 
 
 def persistent_load() -> Dict[str, Dict[str, Any]]:
-    storage: Union[Dict[str, Dict[str, Any]], None] = getattr(persistent_load, "storage", None)
-    if storage:
+    """Returns a copy of the entire persistent storage. Use persistent_get to read single keys."""
+    storage: Dict[str, Dict[str, Any]] = {}
+    try:
+        with _persistent_storage_lock:
+            rows = _open_persistent_storage().execute("SELECT category, key, value FROM storage").fetchall()
+    except Exception as e:
+        logging.debug(f"Could not read store: {e}")
         return storage
-    path = user_path("_persistent_storage.yaml")
-    storage = {}
-    if os.path.exists(path):
-        try:
-            with open(path, "r") as f:
-                storage = unsafe_parse_yaml(f.read())
-        except Exception as e:
-            logging.debug(f"Could not read store: {e}")
-    if storage is None:
-        storage = {}
-    setattr(persistent_load, "storage", storage)
+    for category, key, value in rows:
+        storage.setdefault(category, {})[key] = unsafe_parse_yaml(value)
     return storage
 
 
@@ -343,11 +398,6 @@ def load_data_package_for_checksum(game: str, checksum: typing.Optional[str]) ->
             except Exception as e:
                 logging.debug(f"Could not load data package: {e}")
 
-    # fall back to old cache
-    cache = persistent_load().get("datapackage", {}).get("games", {}).get(game, {})
-    if cache.get("checksum") == checksum:
-        return cache
-
     # cache does not match
     return {}
 
@@ -366,6 +416,58 @@ def store_data_package_for_checksum(game: str, data: typing.Dict[str, Any]) -> N
             logging.debug(f"Could not store data package: {e}")
 
 
+_cached_roms: Dict[str, "mmap.mmap"] = {}
+_cached_rom_source_hashes: Dict[typing.Tuple[str, int, int], str] = {}
+_cached_roms_lock = threading.Lock()
+
+
+def load_cached_rom(game: str, source_path: str, version: str,
+                    create: typing.Callable[[], typing.Union[bytes, bytearray]]) -> "mmap.mmap":
+    """
+    Returns a read-only memory map of a rom image derived from the file at source_path,
+    such as a decompressed or base-patched rom, calling create to build it if it isn't cached yet.
+    Images are cached by source file hash and version, so they are shared by all players and generations,
+    and all callers within a process share a single mapping.
+    """
+    import hashlib
+    import mmap
+
+    with _cached_roms_lock:
+        stat = os.stat(source_path)
+        hash_key = (os.path.abspath(source_path), stat.st_size, stat.st_mtime_ns)
+        source_hash = _cached_rom_source_hashes.get(hash_key)
+        if not source_hash:
+            source = hashlib.sha1()
+            with open(source_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    source.update(chunk)
+            source_hash = _cached_rom_source_hashes[hash_key] = source.hexdigest()
+
+        path = cache_path("rom", get_file_safe_name(game), f"{source_hash}_{get_file_safe_name(version)}.bin")
+        rom = _cached_roms.get(path)
+        if rom:
+            return rom
+        if os.path.exists(path):
+            logging.info(f"Rom cache hit for {game} ({version}).")
+        else:
+            logging.info(f"Rom cache miss for {game} ({version}), creating it.")
+            data = create()
+            if not data:
+                raise ValueError(f"Cannot cache empty rom image for {game}.")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            try:
+                os.replace(temp_path, path)
+            except OSError:
+                # another process created it first and has it mapped
+                os.remove(temp_path)
+        with open(path, "rb") as f:
+            rom = _cached_roms[path] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return rom
+
+
 def get_default_adjuster_settings(game_name: str) -> Namespace:
     import LttPAdjuster
     adjuster_settings = Namespace()
@@ -376,7 +478,7 @@ def get_default_adjuster_settings(game_name: str) -> Namespace:
 
 
 def get_adjuster_settings_no_defaults(game_name: str) -> Namespace:
-    return persistent_load().get("adjuster", {}).get(game_name, Namespace())
+    return persistent_get("adjuster", game_name, Namespace())
 
 
 def get_adjuster_settings(game_name: str) -> Namespace:
@@ -391,7 +493,7 @@ def get_adjuster_settings(game_name: str) -> Namespace:
 
 @cache_argsless
 def get_unique_identifier():
-    uuid = persistent_load().get("client", {}).get("uuid", None)
+    uuid = persistent_get("client", "uuid")
     if uuid:
         return uuid
 
@@ -631,6 +733,11 @@ def get_fuzzy_results(input_word: str, word_list: typing.Collection[str], limit:
 
 def get_intended_text(input_text: str, possible_answers) -> typing.Tuple[str, bool, str]:
     picks = get_fuzzy_results(input_text, possible_answers, limit=2)
+    return _get_intended_text_from_picks(input_text, picks)
+
+
+def _get_intended_text_from_picks(input_text: str, picks: typing.List[typing.Tuple[str, int]]) \
+        -> typing.Tuple[str, bool, str]:
     if len(picks) > 1:
         dif = picks[0][1] - picks[1][1]
         if picks[0][1] == 100:
@@ -651,6 +758,75 @@ def get_intended_text(input_text: str, possible_answers) -> typing.Tuple[str, bo
                                        f"did you mean '{picks[0][0]}'? ({picks[0][1]}% sure)"
 
 
+class FuzzyNameIndex:
+    """Names prepared for repeated get_intended_text lookups, giving the same results as get_intended_text.
+    Exact (case-insensitive) matches are found through a dict. Otherwise, names are grouped by length and only
+    compared when their length and characters still allow a better ratio than the current second best match."""
+    names: typing.Tuple[str, ...]
+    _exact: typing.Dict[str, int]
+    _by_length: typing.Dict[typing.Tuple[int, int], typing.List[typing.Tuple[int, str, int]]]
+
+    __slots__ = ("names", "_exact", "_by_length")
+
+    def __init__(self, names: typing.Iterable[str]) -> None:
+        self.names = tuple(names)
+        self._exact = {}
+        self._by_length = {}
+        for index, name in enumerate(self.names):
+            lowered = name.lower()
+            self._exact.setdefault(lowered, index)
+            # lower() can change the length, ratios are calculated with the original one
+            self._by_length.setdefault((len(lowered), len(name)), []).append(
+                (index, lowered, self._get_character_mask(lowered)))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @staticmethod
+    def _get_character_mask(text: str) -> int:
+        mask = 0
+        for character in text:
+            mask |= 1 << (ord(character) & 127)
+        return mask
+
+    def get_fuzzy_results(self, input_word: str, limit: int = 2) -> typing.List[typing.Tuple[str, int]]:
+        """Same as get_fuzzy_results(input_word, self.names, limit), meant for small limits."""
+        from jellyfish import damerau_levenshtein_distance
+
+        lowered_input = input_word.lower()
+        input_length = len(input_word)
+        input_mask = self._get_character_mask(lowered_input)
+        # The distance is at least the difference in length and the number of characters missing from either side,
+        # giving the best ratio each name can reach. Names are compared from the best reachable ratio down.
+        candidates = []
+        for (lowered_length, length), entries in self._by_length.items():
+            length_difference = abs(lowered_length - len(lowered_input))
+            denominator = max(length, input_length)
+            for index, lowered, mask in entries:
+                missing = max(length_difference, bin(input_mask & ~mask).count("1"), bin(mask & ~input_mask).count("1"))
+                candidates.append((1 - missing / denominator, index, lowered, denominator))
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+
+        best: typing.List[typing.Tuple[float, int]] = []  # (ratio, index), ties go to the earlier name like sorted()
+        for best_possible, index, lowered, denominator in candidates:
+            if len(best) == limit and best_possible < best[-1][0]:
+                break
+            ratio = 1 - damerau_levenshtein_distance(lowered_input, lowered) / denominator
+            if len(best) < limit or ratio > best[-1][0] or (ratio == best[-1][0] and index < best[-1][1]):
+                best.append((ratio, index))
+                best.sort(key=lambda pick: (-pick[0], pick[1]))
+                del best[limit:]
+        return [(self.names[index], int(ratio * 100)) for ratio, index in best]
+
+    def get_intended_text(self, input_text: str) -> typing.Tuple[str, bool, str]:
+        """Same as get_intended_text(input_text, self.names)."""
+        index = self._exact.get(input_text.lower())
+        if index is not None:
+            # a perfect match can only be beaten by an earlier perfect match, which would be the same lowered name
+            return self.names[index], True, "Perfect Match" if len(self.names) > 1 else "Only Option Match"
+        return _get_intended_text_from_picks(input_text, self.get_fuzzy_results(input_text))
+
+
 def get_input_text_from_response(text: str, command: str) -> typing.Optional[str]:
     if "did you mean " in text:
         for question in ("Didn't find something that closely matches",
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import base64
 import collections
 import datetime
 import functools
@@ -19,7 +20,8 @@ from pony.orm import commit, db_session, select
 
 import Utils
 
-from MultiServer import Context, server, auto_shutdown, ServerCommandProcessor, ClientMessageProcessor, load_server_cert
+from MultiServer import Context, server, auto_shutdown, ServerCommandProcessor, ClientMessageProcessor, \
+    load_server_cert, format_prometheus_metrics, serve_metrics, EventLoopLag
 from Utils import restricted_loads, cache_argsless
 from .locker import Locker
 from .models import Command, GameDataPackage, Room, db
@@ -188,6 +190,8 @@ def get_static_server_data() -> dict:
             world_name: world.location_name_groups
             for world_name, world in worlds.AutoWorldRegister.world_types.items()
         },
+        # filled by rooms as hints are looked up, shared so each data package's names are only indexed once
+        "name_indexes": {},
     }
 
     return data
@@ -215,7 +219,8 @@ def set_up_logging(room_id) -> logging.Logger:
 
 def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                        cert_file: typing.Optional[str], cert_key_file: typing.Optional[str],
-                       host: str, rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue):
+                       host: str, rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue,
+                       metrics_port: typing.Optional[int] = None):
     Utils.init_logging(name)
     try:
         import resource
@@ -241,6 +246,20 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
     gc.collect()  # free intermediate objects used during setup
 
     loop = asyncio.get_event_loop()
+    running_rooms: typing.Dict[typing.Any, WebHostContext] = {}  # room id -> context, if metrics are enabled
+
+    def get_metrics_text() -> str:
+        samples = [("archipelago_rooms", {"hoster": name}, len(running_rooms))]
+        # all rooms of this hoster run on one event loop, so its lag is only reported once
+        samples += EventLoopLag.watch().get_samples({"hoster": name})
+        for room_id, ctx in tuple(running_rooms.items()):
+            room = base64.urlsafe_b64encode(room_id.bytes).rstrip(b"=").decode("ascii")
+            samples += ctx.metrics.get_samples(ctx, {"hoster": name, "room": room})
+        return format_prometheus_metrics(samples)
+
+    if metrics_port:
+        loop.run_until_complete(serve_metrics("127.0.0.1", metrics_port, get_metrics_text))
+        logging.info(f"Serving metrics of {name} at http://127.0.0.1:{metrics_port}/metrics")
 
     async def start_room(room_id):
         with Locker(f"RoomLocker {room_id}"):
@@ -249,6 +268,9 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                 ctx = WebHostContext(static_server_data, logger)
                 ctx.load(room_id)
                 ctx.init_save()
+                if metrics_port:
+                    ctx.enable_metrics()
+                    running_rooms[room_id] = ctx
                 try:
                     ctx.server = websockets.serve(
                         functools.partial(server, ctx=ctx), ctx.host, ctx.port, ssl=ssl_context)
@@ -297,6 +319,7 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                     ctx._save()
                     setattr(asyncio.current_task(), "save", None)
             finally:
+                running_rooms.pop(room_id, None)
                 try:
                     ctx.save_dirty = False  # make sure the saving thread does not write to DB after final wakeup
                     ctx.exit_event.set()  # make sure the saving thread stops at some point
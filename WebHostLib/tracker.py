@@ -9,7 +9,7 @@ from flask import render_template, make_response, Response, request
 from werkzeug.exceptions import abort
 
 from MultiServer import Context, get_saving_second
-from NetUtils import ClientStatus, Hint, NetworkItem, NetworkSlot, SlotType
+from NetUtils import ClientStatus, Hint, NetworkItem, NetworkSlot, ReceivedItemsStore, SlotType
 from Utils import restricted_loads, KeyedDefaultDict
 from . import app, cache
 from .models import GameDataPackage, Room
@@ -58,6 +58,7 @@ class TrackerData:
         self.room = room
         self._multidata = Context.decompress(room.seed.multidata)
         self._multisave = restricted_loads(room.multisave) if room.multisave else {}
+        self._received_items = ReceivedItemsStore(self._multisave.get("received_items", {}))
         self._tracker_cache = {}
 
         self.item_name_to_id: Dict[str, Dict[str, int]] = {}
@@ -118,9 +119,10 @@ class TrackerData:
         """Retrieves the set of all locations not marked complete by this player."""
         return set(self.get_player_locations(team, player)) - self.get_player_checked_locations(team, player)
 
+    @_cache_results
     def get_player_received_items(self, team: int, player: int) -> List[NetworkItem]:
         """Returns all items received to this player in order of received."""
-        return self._multisave.get("received_items", {}).get((team, player, True), [])
+        return self._received_items[team, player, True][:]
 
     @_cache_results
     def get_player_inventory_counts(self, team: int, player: int) -> collections.Counter:
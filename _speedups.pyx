@@ -13,8 +13,11 @@ import warnings
 from cpython cimport PyObject
 from typing import Any, Dict, Iterable, Iterator, Generator, Sequence, Tuple, TypeVar, Union, Set, List, TYPE_CHECKING
 from cymem.cymem cimport Pool
+from cpython.mem cimport PyMem_Free, PyMem_Realloc
 from libc.stdint cimport int64_t, uint32_t
+from array import array
 from collections import defaultdict
+from sys import byteorder
 
 cdef extern from *:
     """
@@ -101,12 +104,6 @@ cdef class LocationStore:
         return size
 
     def __init__(self, locations_dict: Dict[int, Dict[int, Sequence[int]]]) -> None:
-        self._mem = Pool()
-        cdef object key
-        self._keys = []
-        self._items = []
-        self._proxies = []
-
         # iterate over everything to get all maxima and validate everything
         cdef size_t max_sender = INVALID_SIZE  # keep track of highest used player id for indexing
         cdef size_t sender_count = 0
@@ -136,10 +133,7 @@ cdef class LocationStore:
         if not count:
             warnings.warn("Game has no locations")
 
-        # allocate the arrays and invalidate index (0xff...)
-        self.entries = <LocationEntry*>self._mem.alloc(count, sizeof(LocationEntry))
-        self.sender_index = <IndexEntry*>self._mem.alloc(max_sender + 1, sizeof(IndexEntry))
-        self._raw_proxies = <PyObject**>self._mem.alloc(max_sender + 1, sizeof(PyObject*))
+        self._allocate(count, max_sender)
 
         # build entries and index
         cdef size_t i = 0
@@ -158,6 +152,65 @@ cdef class LocationStore:
                 self.sender_index[sender].count += 1
                 i += 1
 
+        self._build_caches(count, max_sender)
+
+    @classmethod
+    def from_array(cls, entries: array, players: int) -> LocationStore:
+        """Builds the store from a flat array("q") of sender, location, item, receiver and flags for each location,
+        sorted by sender and location, without going through a dict of dicts. Senders are 1 to players."""
+        cdef LocationStore store = cls.__new__(cls)
+        store._init_from_array(entries, players)
+        return store
+
+    cdef _init_from_array(self, const int64_t[:] entries, int64_t players):
+        if players < 1 or players > MAX_PLAYER_ID:
+            raise ValueError(f"Invalid player count {players}")
+        if entries.shape[0] % 5:
+            raise ValueError("Location array does not consist of whole entries")
+        cdef size_t count = entries.shape[0] // 5
+        if not count:
+            warnings.warn("Game has no locations")
+        self._allocate(count, players)
+
+        cdef size_t i
+        cdef int64_t sender, receiver
+        cdef int64_t last_sender = 0
+        cdef int64_t last_location = 0
+        for i in range(count):
+            sender = entries[i * 5]
+            receiver = entries[i * 5 + 3]
+            if sender < 1 or sender > players:
+                raise ValueError(f"Invalid player id {sender} for location")
+            if receiver < 1 or receiver > MAX_PLAYER_ID:
+                raise ValueError(f"Invalid player id {receiver} for item")
+            if sender < last_sender or (sender == last_sender and entries[i * 5 + 1] <= last_location):
+                # lookups are a binary search over each sender's locations
+                raise ValueError("Location array is not sorted")
+            if sender != last_sender:
+                self.sender_index[sender].start = i
+            self.entries[i].sender = sender
+            self.entries[i].location = entries[i * 5 + 1]
+            self.entries[i].item = entries[i * 5 + 2]
+            self.entries[i].receiver = receiver
+            self.entries[i].flags = entries[i * 5 + 4]
+            self.sender_index[sender].count += 1
+            last_sender = sender
+            last_location = entries[i * 5 + 1]
+
+        self._build_caches(count, players)
+
+    cdef _allocate(self, size_t count, size_t max_sender):
+        # allocate the arrays and invalidate index (0xff...)
+        self._mem = Pool()
+        self._keys = []
+        self._items = []
+        self._proxies = []
+        self.entries = <LocationEntry*>self._mem.alloc(count, sizeof(LocationEntry))
+        self.sender_index = <IndexEntry*>self._mem.alloc(max_sender + 1, sizeof(IndexEntry))
+        self._raw_proxies = <PyObject**>self._mem.alloc(max_sender + 1, sizeof(PyObject*))
+
+    cdef _build_caches(self, size_t count, size_t max_sender):
+        cdef object key
         # build pyobject caches
         self._proxies.append(None)  # player 0
         assert self.sender_index[0].count == 0
@@ -174,7 +227,7 @@ cdef class LocationStore:
 
         self.sender_index_size = max_sender + 1
         self.entry_count = count
-        self._len = sender_count
+        self._len = max_sender  # senders are continuous
 
     # fake dict access
     def __len__(self) -> int:
@@ -363,3 +416,206 @@ cdef class PlayerLocationProxy:
         count = self._store.sender_index[self._player].count
         for entry in self._store.entries[start:start+count]:
             yield entry.location, (entry.item, entry.receiver, entry.flags)
+
+
+cdef struct ReceivedItemEntry:
+    ap_id_t item
+    ap_id_t location
+    ap_player_t player
+    ap_flags_t flags
+
+
+cdef object _NetworkItem = None  # NetUtils imports this module, so this is resolved on first use
+cdef bint _little_endian = byteorder == "little"
+
+
+@cython.auto_pickle(False)
+@cython.internal  # unsafe. disable direct import
+cdef class ReceivedItemsLog:
+    """Items received by one slot of a team. Records are stored once, non-own items are indices into them."""
+    cdef ReceivedItemEntry* entries
+    cdef size_t entry_count
+    cdef size_t entry_capacity
+    cdef uint32_t* indices  # entries that are not the slot's own items
+    cdef size_t index_count
+    cdef size_t index_capacity
+
+    def __dealloc__(self) -> None:
+        PyMem_Free(self.entries)
+        PyMem_Free(self.indices)
+
+    cdef void append(self, ap_id_t item, ap_id_t location, ap_player_t player, ap_flags_t flags, bint own) except *:
+        cdef size_t capacity
+        cdef void* mem
+        if self.entry_count == self.entry_capacity:
+            capacity = max(16, self.entry_capacity * 2)
+            mem = PyMem_Realloc(self.entries, capacity * sizeof(ReceivedItemEntry))
+            if not mem:
+                raise MemoryError()
+            self.entries = <ReceivedItemEntry*>mem
+            self.entry_capacity = capacity
+        if not own:
+            if self.index_count == self.index_capacity:
+                capacity = max(16, self.index_capacity * 2)
+                mem = PyMem_Realloc(self.indices, capacity * sizeof(uint32_t))
+                if not mem:
+                    raise MemoryError()
+                self.indices = <uint32_t*>mem
+                self.index_capacity = capacity
+            self.indices[self.index_count] = <uint32_t>self.entry_count
+            self.index_count += 1
+        self.entries[self.entry_count] = ReceivedItemEntry(item, location, player, flags)
+        self.entry_count += 1
+
+
+@cython.auto_pickle(False)
+@cython.internal  # unsafe. disable direct import
+cdef class ReceivedItems:
+    """Items received by one slot of a team, as seen by a client with or without remote_items."""
+    cdef ReceivedItemsLog _log
+    cdef bint _remote_items
+
+    def __init__(self, log: ReceivedItemsLog, remote_items: bool) -> None:
+        self._log = log
+        self._remote_items = remote_items
+
+    def __len__(self) -> int:
+        return self._log.entry_count if self._remote_items else self._log.index_count
+
+    cdef object _get(self, size_t index):
+        cdef ReceivedItemEntry* entry
+        if self._remote_items:
+            entry = self._log.entries + index
+        else:
+            entry = self._log.entries + self._log.indices[index]
+        return _NetworkItem(entry.item, entry.location, entry.player, entry.flags)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Any, List[Any]]:
+        cdef Py_ssize_t i
+        cdef Py_ssize_t length = len(self)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(length)
+            return [self._get(i) for i in range(start, stop, step)]
+        i = index
+        if i < 0:
+            i += length
+        if i < 0 or i >= length:
+            raise IndexError("received items index out of range")
+        return self._get(i)
+
+    def __iter__(self) -> Generator[Any, None, None]:
+        cdef size_t i
+        for i in range(len(self)):
+            yield self._get(i)
+
+
+@cython.auto_pickle(False)
+cdef class ReceivedItemsStore:
+    """Compact store of the items received by every slot in a MultiServer"""
+    # Looked up like the dict it replaces, Dict[Tuple[int, int, bool], List[NetworkItem]] with
+    # (team, slot, remote_items) keys, but every received item is a single native record.
+    cdef dict _logs
+    cdef dict _views
+
+    def __init__(self, saved: Any = None) -> None:
+        global _NetworkItem
+        if _NetworkItem is None:
+            from NetUtils import NetworkItem
+            _NetworkItem = NetworkItem
+        self._logs = {}
+        self._views = {}
+        if not saved:
+            return
+        cdef ReceivedItemsLog log
+        cdef size_t i
+        cdef size_t position
+        cdef bint own
+        if len(next(iter(saved))) == 3:
+            # saves from before the store have a list of NetworkItems per (team, slot, remote_items)
+            for (team, slot, remote_items), items in saved.items():
+                if remote_items:
+                    non_own_items = saved.get((team, slot, False), [])
+                    log = self._get_log(team, slot)
+                    position = 0
+                    for item in items:
+                        own = position >= len(non_own_items) or non_own_items[position] != item
+                        if not own:
+                            position += 1
+                        log.append(item[0], item[1], item[2], item[3], own)
+            return
+        cdef const int64_t[:] records_view
+        cdef const uint32_t[:] indices_view
+        for (team, slot), (records, indices) in saved.items():
+            records = array("q", records)
+            indices = array("I", indices)
+            if not _little_endian:
+                records.byteswap()
+                indices.byteswap()
+            log = self._get_log(team, slot)
+            records_view = records
+            indices_view = indices
+            position = 0
+            # indices are ascending, so they are merged in while walking the records
+            for i in range(len(records) // 4):
+                if position < <size_t>len(indices_view) and indices_view[position] == i:
+                    position += 1
+                    own = False
+                else:
+                    own = True
+                log.append(records_view[i * 4], records_view[i * 4 + 1], records_view[i * 4 + 2],
+                           records_view[i * 4 + 3], own)
+
+    cdef ReceivedItemsLog _get_log(self, int team, int slot):
+        key = team, slot
+        log = self._logs.get(key, None)
+        if log is None:
+            log = self._logs[key] = ReceivedItemsLog()
+        return log
+
+    def __getitem__(self, key: Tuple[int, int, bool]) -> ReceivedItems:
+        view = self._views.get(key, None)
+        if view is None:
+            team, slot, remote_items = key
+            view = self._views[key] = ReceivedItems(self._get_log(team, slot), remote_items)
+        return view
+
+    def __iter__(self) -> Generator[Tuple[int, int, bool], None, None]:
+        for team, slot in self._logs:
+            yield team, slot, False
+            yield team, slot, True
+
+    def __len__(self) -> int:
+        return len(self._logs) * 2
+
+    def items(self) -> Generator[Tuple[Tuple[int, int, bool], ReceivedItems], None, None]:
+        for key in self:
+            yield key, self[key]
+
+    def add(self, team: int, slot: int, item: Sequence[int], own: bool) -> None:
+        self._get_log(team, slot).append(item[0], item[1], item[2], item[3], own)
+
+    def get_state(self) -> Dict[Tuple[int, int], Tuple[bytes, bytes]]:
+        cdef ReceivedItemsLog log
+        cdef ReceivedItemEntry entry
+        cdef size_t i
+        cdef int64_t[:] records_view
+        cdef uint32_t[:] indices_view
+        state = {}
+        for key, log in self._logs.items():
+            records = array("q", bytes(log.entry_count * 4 * sizeof(int64_t)))
+            indices = array("I", bytes(log.index_count * sizeof(uint32_t)))
+            records_view = records
+            indices_view = indices
+            for i in range(log.entry_count):
+                entry = log.entries[i]
+                records_view[i * 4] = entry.item
+                records_view[i * 4 + 1] = entry.location
+                records_view[i * 4 + 2] = entry.player
+                records_view[i * 4 + 3] = entry.flags
+            for i in range(log.index_count):
+                indices_view[i] = log.indices[i]
+            if not _little_endian:
+                records.byteswap()
+                indices.byteswap()
+            state[key] = records.tobytes(), indices.tobytes()
+        return state
@@ -34,7 +34,8 @@ def _update_cache() -> None:
         return
 
     try:
-        from worlds.AutoWorld import AutoWorldRegister
+        from worlds import AutoWorldRegister, load_all_worlds
+        load_all_worlds()
         for world in AutoWorldRegister.world_types.values():
             annotation = world.__annotations__.get("settings", None)
             if annotation is None or annotation == "ClassVar[Optional['Group']]":
@@ -662,6 +663,18 @@ class GeneratorOptions(Group):
         start_inventory -> Move remaining items to start_inventory, generate additional filler items to fill locations.
         """
 
+    class OutputMemoryBudget(int):
+        """
+        Memory in MiB that worlds may use at once while generating their output files, such as decompressed roms.
+        Outputs wait for others to release memory when their reservation would exceed this. 0 to not limit them.
+        """
+
+    class OutputProcesses(int):
+        """
+        Worker processes for outputs that worlds mark as CPU heavy and process safe.
+        0 for one per CPU core, 1 to generate all outputs in the generator process.
+        """
+
     enemizer_path: EnemizerPath = EnemizerPath("EnemizerCLI/EnemizerCLI.Core")  # + ".exe" is implied on Windows
     player_files_path: PlayerFilesPath = PlayerFilesPath("Players")
     players: Players = Players(0)
@@ -671,6 +684,8 @@ class GeneratorOptions(Group):
     race: Race = Race(0)
     plando_options: PlandoOptions = PlandoOptions("bosses, connections, texts")
     panic_method: PanicMethod = PanicMethod("swap")
+    output_memory_budget: OutputMemoryBudget = OutputMemoryBudget(1024)
+    output_processes: OutputProcesses = OutputProcesses(0)
 
 
 class SNIOptions(Group):
@@ -5,3 +5,19 @@ if __name__ == "__main__":
     load_worlds.run_load_worlds_benchmark()
     import locations
     locations.run_locations_benchmark()
+    import patching
+    patching.run_patching_benchmark()
+    import delta_patching
+    delta_patching.run_delta_patching_benchmark()
+    import sm_state_copy
+    sm_state_copy.run_sm_state_copy_benchmark()
+    import sm_rules
+    sm_rules.run_sm_rules_benchmark()
+    import smz3_fill
+    smz3_fill.run_smz3_fill_benchmark()
+    import oot_reachability
+    oot_reachability.run_oot_reachability_benchmark()
+    import item_rules
+    item_rules.run_item_rules_benchmark()
+    import alttp_entrance_shuffle
+    alttp_entrance_shuffle.run_alttp_entrance_shuffle_benchmark()
@@ -0,0 +1,48 @@
+def run_alttp_entrance_shuffle_benchmark():
+    """Time linking the entrances of several A Link to the Past players for each entrance shuffle mode,
+    in open and inverted mode."""
+    import logging
+    import time
+
+    from Utils import init_logging
+    from test.general import setup_multiworld
+    from worlds import alttp
+    from worlds.alttp import ALTTPWorld, EntranceShuffle
+    from worlds.alttp.Options import EntranceShuffle as EntranceShuffleOption, Mode
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    times = []
+
+    def timed(link):
+        def timed_link(multiworld, player):
+            start = time.perf_counter()
+            link(multiworld, player)
+            times.append(time.perf_counter() - start)
+        return timed_link
+
+    alttp.link_entrances = timed(EntranceShuffle.link_entrances)
+    alttp.link_inverted_entrances = timed(EntranceShuffle.link_inverted_entrances)
+    default_shuffle, default_mode = EntranceShuffleOption.default, Mode.default
+    players = 8
+    try:
+        for shuffle in ("dungeons_crossed", "full", "crossed", "insanity"):
+            for mode in ("open", "inverted"):
+                EntranceShuffleOption.default = EntranceShuffleOption.options[shuffle]
+                Mode.default = Mode.options[mode]
+                times.clear()
+                for seed in range(1, 4):
+                    setup_multiworld([ALTTPWorld] * players, ("generate_early", "create_regions"), seed)
+                logger.info(f"Linking entrances with {shuffle} shuffle in {mode} mode took "
+                            f"{sum(times) / len(times) * 1000:.2f} ms per player.")
+    finally:
+        alttp.link_entrances = EntranceShuffle.link_entrances
+        alttp.link_inverted_entrances = EntranceShuffle.link_inverted_entrances
+        EntranceShuffleOption.default, Mode.default = default_shuffle, default_mode
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_alttp_entrance_shuffle_benchmark()
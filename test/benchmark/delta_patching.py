@@ -0,0 +1,55 @@
+def run_delta_patching_benchmark():
+    """Time creating delta patches against one base rom from output threads, in worker processes including their
+    startup, and in the generator process."""
+    import concurrent.futures
+    import logging
+    import os
+    import random
+    import tempfile
+    import time
+
+    import bsdiff4
+
+    from Utils import init_logging
+    from worlds import Files
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    rom_size = 4 * 1024 * 1024
+    random.seed(0)
+    source = random.getrandbits(rom_size * 8).to_bytes(rom_size, "little")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        def write_patched(index: int) -> str:
+            patched = bytearray(source)
+            for _ in range(1000):
+                offset = random.randrange(rom_size - 16)
+                patched[offset:offset + 16] = random.getrandbits(128).to_bytes(16, "little")
+            path = os.path.join(temp_dir, f"{index}.bin")
+            with open(path, "wb") as f:
+                f.write(patched)
+            return path
+
+        for patches in (1, 4, 8):
+            paths = [write_patched(index) for index in range(patches)]
+
+            def in_process(path: str) -> bytes:
+                with open(path, "rb") as f:
+                    return bsdiff4.diff(source, f.read())
+
+            for name, create in (("worker processes", lambda path: Files.create_delta(source, path)),
+                                 ("the generator process", in_process)):
+                Files._remove_delta_dir()
+                start = time.perf_counter()
+                with concurrent.futures.ThreadPoolExecutor(patches) as pool:
+                    deltas = list(pool.map(create, paths))
+                taken = time.perf_counter() - start
+                logger.info(f"Creating {patches} deltas against a {rom_size // 1024 // 1024} MiB rom in {name} "
+                            f"took {taken:.2f} seconds ({sum(map(len, deltas))} bytes).")
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_delta_patching_benchmark()
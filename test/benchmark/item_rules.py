@@ -0,0 +1,40 @@
+def run_item_rules_benchmark():
+    """Time evaluating the item rules of all locations against the whole item pool of a multiworld using
+    local and non-local items, then time filling it."""
+    import logging
+    import time
+
+    from Fill import distribute_items_restrictive
+    from Utils import init_logging
+    from test.general import gen_steps, setup_multiworld
+    from worlds.alttp import ALTTPWorld
+    from worlds.generic.Rules import locality_rules
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    players = 4
+    for seed in range(1, 4):
+        multiworld = setup_multiworld([ALTTPWorld] * players, gen_steps, seed)
+        for player in multiworld.player_ids:
+            multiworld.worlds[player].options.local_items.value = {"Progressive Sword", "Hookshot", "Bombos"}
+            multiworld.worlds[player].options.non_local_items.value = {"Hammer", "Boss Heart Container"}
+        locality_rules(multiworld)
+        locations = multiworld.get_unfilled_locations()
+        items = multiworld.itempool
+
+        start = time.perf_counter()
+        allowed = sum(location.item_rule(item) for location in locations for item in items)
+        rules_time = time.perf_counter() - start
+        start = time.perf_counter()
+        distribute_items_restrictive(multiworld)
+        fill_time = time.perf_counter() - start
+        logger.info(f"Seed {seed} with {players} ALttP players: evaluating item rules of {len(locations)} locations "
+                    f"for {len(items)} items took {rules_time:.4f} seconds ({allowed} allowed), "
+                    f"fill took {fill_time:.4f} seconds.")
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_item_rules_benchmark()
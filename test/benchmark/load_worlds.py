@@ -1,10 +1,12 @@
 def run_load_worlds_benchmark():
-    """List worlds and their load time.
+    """List worlds and their load time, then compare startup importing all worlds against startup from the manifest.
     Note that any first-time imports will be attributed to that world, as it is cached afterwards.
     Likely best used with isolated worlds to measure their time alone."""
     import logging
+    import subprocess
+    import sys
 
-    from Utils import init_logging
+    from Utils import init_logging, local_path
 
     # get some general imports cached, to prevent it from being attributed to one world.
     import orjson
@@ -20,6 +22,20 @@ def run_load_worlds_benchmark():
     for module in world_sources:
         logger.info(f"{module} took {module.time_taken:.4f} seconds.")
 
+    # importing worlds above wrote the world manifest, if it was outdated
+    def time_startup(lazy: bool) -> float:
+        # requirements were already checked by this process
+        code = ("import time, ModuleUpdate, Utils; ModuleUpdate.update_ran = True; start = time.perf_counter(); "
+                f"Utils.lazy_world_loading = {lazy}; import worlds; print(time.perf_counter() - start)")
+        process = subprocess.run([sys.executable, "-c", code], cwd=local_path(), capture_output=True, text=True,
+                                 check=True)
+        return float(process.stdout.splitlines()[-1])
+
+    cold = time_startup(False)
+    manifest = time_startup(True)
+    logger.info(f"Importing worlds took {cold:.4f} seconds importing all worlds and {manifest:.4f} seconds "
+                f"from the world manifest, {cold / manifest:.1f}x faster.")
+
 
 if __name__ == "__main__":
     from path_change import change_home
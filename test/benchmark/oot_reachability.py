@@ -0,0 +1,55 @@
+def run_oot_reachability_benchmark():
+    """Time copying Ocarina of Time states and updating their per-age reachability,
+    and measure the memory taken by the per-age reachability of a state with the item pool collected."""
+    import logging
+    import sys
+    import time
+    import timeit
+    import tracemalloc
+
+    from BaseClasses import CollectionState
+    from Utils import init_logging
+    from test.general import gen_steps, setup_multiworld
+    from worlds.oot import OOTWorld
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    players = 2
+    multiworld = setup_multiworld([OOTWorld] * players, gen_steps)
+    state = CollectionState(multiworld)
+    for item in multiworld.itempool:
+        state.collect(item, True)
+    state.sweep_for_events()
+    number = 1000
+
+    copy_time = timeit.timeit(state.copy, number=number)
+    logger.info(f"{number} CollectionState copies with {players} OoT players took {copy_time:.4f} seconds.")
+
+    size = sum(sys.getsizeof(getattr(state, name)[player])
+               for name in ("child_reachable_regions", "adult_reachable_regions",
+                            "child_blocked_connections", "adult_blocked_connections")
+               for player in multiworld.player_ids)
+    tracemalloc.start()
+    copies = [state.copy() for _ in range(100)]
+    copies_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    logger.info(f"Per-age reachability takes {size / 1024:.2f} KiB per state, "
+                f"{len(copies)} copies of the whole state take {copies_size / 1024 / 1024:.2f} MiB.")
+
+    state = CollectionState(multiworld)
+    start = time.perf_counter()
+    for item in multiworld.itempool:
+        state = state.copy()
+        state.collect(item, True)
+        for player in multiworld.player_ids:
+            state._oot_update_age_reachable_regions(player)
+    update_time = time.perf_counter() - start
+    logger.info(f"Copying and updating reachability while collecting {len(multiworld.itempool)} items "
+                f"took {update_time:.4f} seconds.")
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_oot_reachability_benchmark()
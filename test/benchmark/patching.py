@@ -0,0 +1,61 @@
+def run_patching_benchmark():
+    """Apply synthetic token files to synthetic rom buffers, to measure the token engine on its own."""
+    import logging
+    import random
+
+    from time_it import TimeIt
+
+    from Utils import init_logging
+    from worlds.Files import APPatchExtension, APProcedurePatch, APTokenMixin, APTokenTypes
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    class BenchmarkPatch(APProcedurePatch, APTokenMixin):
+        pass
+
+    token_counts = (10_000, 100_000)
+    rom_sizes = (4 * 1024 * 1024, 32 * 1024 * 1024)
+    steps = 2  # apply_tokens steps applied in sequence to the same buffer, as a procedure would
+
+    def build_patch(rom_size: int, token_count: int) -> BenchmarkPatch:
+        random.seed(0)
+        patch = BenchmarkPatch()
+        offset = 0
+        for _ in range(token_count):
+            token_type = random.choice((APTokenTypes.WRITE, APTokenTypes.WRITE, APTokenTypes.WRITE,
+                                        APTokenTypes.RLE, APTokenTypes.COPY, APTokenTypes.OR_8))
+            # mostly sequential writes, with the occasional jump, like typical world patches
+            offset = random.randrange(rom_size - 0x1000) if random.random() < 0.2 else offset
+            if token_type == APTokenTypes.WRITE:
+                size = random.randrange(1, 16)
+                data = random.getrandbits(size * 8).to_bytes(size, "little")
+                patch.write_token(APTokenTypes.WRITE, offset, data)
+                offset += len(data)
+            elif token_type == APTokenTypes.RLE:
+                patch.write_token(APTokenTypes.RLE, offset, (random.randrange(1, 0x100), 0xFF))
+            elif token_type == APTokenTypes.COPY:
+                patch.write_token(APTokenTypes.COPY, offset,
+                                  (random.randrange(1, 0x100), random.randrange(rom_size - 0x100)))
+            else:
+                patch.write_token(APTokenTypes.OR_8, offset, 0x80)
+        return patch
+
+    for token_count in token_counts:
+        for rom_size in rom_sizes:
+            patch = build_patch(rom_size, token_count)
+            with TimeIt(f"encoding {token_count} tokens", logger):
+                token_binary = patch.get_token_binary()
+            patch.write_file("token_data.bin", token_binary)
+            logger.info(f"{token_count} tokens encoded into {int.from_bytes(token_binary[:4], 'little')} tokens "
+                        f"({len(token_binary)} bytes).")
+            rom = bytearray(rom_size)
+            with TimeIt(f"{steps} steps of {token_count} tokens on {rom_size // (1024 * 1024)}MB", logger):
+                for _ in range(steps):
+                    rom = APPatchExtension.apply_tokens(patch, rom, "token_data.bin")
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_patching_benchmark()
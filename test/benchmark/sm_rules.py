@@ -0,0 +1,45 @@
+def run_sm_rules_benchmark():
+    """Time evaluating the access rules of all Super Metroid locations on states collecting the item pool,
+    first with an empty helpers cache and then again with the results cached per items combination."""
+    import logging
+    import time
+
+    from BaseClasses import CollectionState
+    from Utils import init_logging
+    from test.general import gen_steps, setup_solo_multiworld
+    from worlds.sm import SMWorld
+    from worlds.sm.variaRandomizer.logic.cache import Cache
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    multiworld = setup_solo_multiworld(SMWorld, gen_steps)
+    locations = multiworld.get_locations(1)
+    states = []
+    state = CollectionState(multiworld)
+    for item in multiworld.itempool:
+        state.collect(item, True)
+        states.append(state.copy())
+    # reachability is cached per state, sweep it beforehand so only the rules themselves are timed
+    for state in states:
+        state.update_reachable_regions(1)
+
+    def evaluate_rules() -> float:
+        start = time.perf_counter()
+        for state in states:
+            for location in locations:
+                location.access_rule(state)
+        return time.perf_counter() - start
+
+    Cache.reset()
+    cold_time = evaluate_rules()
+    warm_time = evaluate_rules()
+    logger.info(f"Evaluating {len(locations)} location rules on {len(states)} states took {cold_time:.4f} seconds "
+                f"with an empty helpers cache and {warm_time:.4f} seconds with a filled one, "
+                f"{cold_time / warm_time:.1f}x faster.")
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_sm_rules_benchmark()
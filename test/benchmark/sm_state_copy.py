@@ -0,0 +1,34 @@
+def run_sm_state_copy_benchmark():
+    """Compare copying Super Metroid's SMBoolManager with deepcopy, as CollectionState.copy used to,
+    against SMBoolManager.copy, on the state of a generated Super Metroid multiworld."""
+    import copy
+    import logging
+    import timeit
+
+    from BaseClasses import CollectionState
+    from Utils import init_logging
+    from test.general import gen_steps, setup_solo_multiworld
+    from worlds.sm import SMWorld
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    multiworld = setup_solo_multiworld(SMWorld, gen_steps)
+    state = CollectionState(multiworld)
+    for item in multiworld.itempool[::2]:
+        state.collect(item, True)
+    smbm = state.smbm[1]
+    number = 1000
+
+    deepcopy_time = timeit.timeit(lambda: copy.deepcopy(smbm), number=number)
+    copy_time = timeit.timeit(smbm.copy, number=number)
+    state_copy_time = timeit.timeit(state.copy, number=number)
+    logger.info(f"{number} SMBoolManager copies took {deepcopy_time:.4f} seconds with deepcopy and "
+                f"{copy_time:.4f} seconds with SMBoolManager.copy, {deepcopy_time / copy_time:.1f}x faster.")
+    logger.info(f"{number} CollectionState copies took {state_copy_time:.4f} seconds.")
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_sm_state_copy_benchmark()
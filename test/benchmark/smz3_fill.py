@@ -0,0 +1,48 @@
+def run_smz3_fill_benchmark():
+    """Compare copying SMZ3's Progression with deepcopy, as CollectionState.copy used to, against Progression.copy,
+    then time fill and playthrough of multiworlds made of several SMZ3 players."""
+    import copy
+    import logging
+    import time
+    import timeit
+
+    from BaseClasses import CollectionState
+    from Fill import distribute_items_restrictive
+    from Utils import init_logging
+    from test.general import gen_steps, setup_multiworld
+    from worlds.AutoWorld import call_all
+    from worlds.smz3 import SMZ3World
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    multiworld = setup_multiworld(SMZ3World, gen_steps)
+    state = CollectionState(multiworld)
+    for item in multiworld.itempool[::2]:
+        state.collect(item, True)
+    progression = state.smz3state[1]
+    number = 10000
+
+    deepcopy_time = timeit.timeit(lambda: copy.deepcopy(progression), number=number)
+    copy_time = timeit.timeit(progression.copy, number=number)
+    logger.info(f"{number} Progression copies took {deepcopy_time:.4f} seconds with deepcopy and "
+                f"{copy_time:.4f} seconds with Progression.copy, {deepcopy_time / copy_time:.1f}x faster.")
+
+    players = 4
+    for seed in range(1, 4):
+        multiworld = setup_multiworld([SMZ3World] * players, gen_steps, seed)
+        start = time.perf_counter()
+        distribute_items_restrictive(multiworld)
+        call_all(multiworld, "post_fill")
+        fill_time = time.perf_counter() - start
+        start = time.perf_counter()
+        multiworld.spoiler.create_playthrough()
+        playthrough_time = time.perf_counter() - start
+        logger.info(f"Seed {seed} with {players} SMZ3 players: fill took {fill_time:.4f} seconds "
+                    f"and playthrough {playthrough_time:.4f} seconds.")
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_smz3_fill_benchmark()
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from Main import OutputScheduler
+from . import generate_test_multiworld
+
+
+class TestOutputScheduler(unittest.TestCase):
+    def test_memory_budget(self) -> None:
+        """Test that outputs only hold memory together while their reserved memory fits into the budget."""
+        multiworld = generate_test_multiworld(6)
+        running = []
+        most_running = []
+        lock = threading.Lock()
+
+        def generate_output(output_directory: str, player: int) -> None:
+            with multiworld.worlds[player].reserve_output_memory():
+                with lock:
+                    running.append(None)
+                    most_running.append(len(running))
+                time.sleep(0.02)
+                with lock:
+                    running.pop()
+
+        for player in multiworld.player_ids:
+            multiworld.worlds[player].output_memory = 40
+            multiworld.worlds[player].generate_output = \
+                lambda output_directory, player=player: generate_output(output_directory, player)
+        # an output reserving more than the budget still runs, alone
+        multiworld.worlds[6].output_memory = 500
+
+        with OutputScheduler(multiworld, list(multiworld.player_ids), 100, 1) as scheduler:
+            threads = [threading.Thread(target=scheduler.generate_output, args=(player, ""))
+                       for player in multiworld.player_ids]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(max(most_running), 2)
+        self.assertEqual(scheduler.memory_budget.used, 0)
+        self.assertEqual(sorted(scheduler.times), list(multiworld.player_ids))
+
+    def test_waiting_outputs(self) -> None:
+        """Test that an output waiting on another one before reserving its memory doesn't block the other one."""
+        multiworld = generate_test_multiworld(2)
+        event = threading.Event()
+
+        def generate_output_waiting(output_directory: str) -> None:
+            self.assertTrue(event.wait(5))
+            with multiworld.worlds[1].reserve_output_memory():
+                pass
+
+        def generate_output_setting(output_directory: str) -> None:
+            with multiworld.worlds[2].reserve_output_memory():
+                event.set()
+
+        multiworld.worlds[1].generate_output = generate_output_waiting
+        multiworld.worlds[2].generate_output = generate_output_setting
+        for player in multiworld.player_ids:
+            multiworld.worlds[player].output_memory = 80
+
+        with OutputScheduler(multiworld, list(multiworld.player_ids), 100, 1) as scheduler:
+            waiting = threading.Thread(target=scheduler.generate_output, args=(1, ""))
+            waiting.start()
+            scheduler.generate_output(2, "")
+            waiting.join()
+        self.assertEqual(sorted(scheduler.times), list(multiworld.player_ids))
+
+    def test_process_safe_outputs(self) -> None:
+        """Test that process safe outputs write their files from worker processes, where those are available."""
+        multiworld = generate_test_multiworld(3)
+
+        def generate_output(output_directory: str, player: int) -> None:
+            with open(os.path.join(output_directory, f"{player}.txt"), "w") as f:
+                f.write(str(os.getpid()))
+
+        for player in multiworld.player_ids:
+            multiworld.worlds[player].output_process_safe = player != 3
+            multiworld.worlds[player].generate_output = \
+                lambda output_directory, player=player: generate_output(output_directory, player)
+
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                OutputScheduler(multiworld, list(multiworld.player_ids), 0, 2) as scheduler:
+            for player in multiworld.player_ids:
+                scheduler.generate_output(player, temp_dir)
+            pids = {}
+            for player in multiworld.player_ids:
+                with open(os.path.join(temp_dir, f"{player}.txt")) as f:
+                    pids[player] = int(f.read())
+        self.assertEqual(pids[3], os.getpid())
+        if not any(in_process for _, in_process in scheduler.times.values()):
+            raise unittest.SkipTest("Worker processes are not available on this platform.")
+        self.assertNotEqual(pids[1], os.getpid())
+        self.assertNotEqual(pids[2], os.getpid())
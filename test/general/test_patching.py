@@ -0,0 +1,136 @@
+import os
+import tempfile
+import unittest
+from typing import List
+
+import bsdiff4
+
+from worlds import Files
+from worlds.Files import APPatchExtension, APProcedurePatch, APTokenMixin, APTokenTypes, create_delta, in_place
+
+
+class PatchTestExtension(APPatchExtension):
+    game = "Patch Test Game"
+    received: List[type] = []
+
+    @staticmethod
+    def record(caller: APProcedurePatch, rom: bytes) -> bytes:
+        PatchTestExtension.received.append(type(rom))
+        return rom
+
+    @staticmethod
+    @in_place
+    def record_in_place(caller: APProcedurePatch, rom: bytes) -> bytes:
+        PatchTestExtension.received.append(type(rom))
+        return rom
+
+
+class PatchTestPatch(APProcedurePatch, APTokenMixin):
+    hash = None
+
+    @classmethod
+    def get_source_data(cls) -> bytes:
+        return bytes(range(16))
+
+
+# set afterwards, so the patch type doesn't get registered for a file ending
+PatchTestPatch.game = "Patch Test Game"
+
+
+class TestTokens(unittest.TestCase):
+    def test_coalescing(self) -> None:
+        """Test that adjacent WRITE tokens are merged into one, without changing the patched result."""
+        patch = PatchTestPatch()
+        patch.write_token(APTokenTypes.WRITE, 2, b"\x10\x11")
+        patch.write_token(APTokenTypes.WRITE, 4, b"\x12")
+        patch.write_token(APTokenTypes.WRITE, 5, b"\x13")
+        patch.write_token(APTokenTypes.OR_8, 6, 0x80)
+        patch.write_token(APTokenTypes.WRITE, 7, b"\x14")
+        patch.write_token(APTokenTypes.WRITE, 10, b"\x15")
+        patch.write_token(APTokenTypes.WRITE, 3, b"\x16")
+        self.assertEqual(patch._coalesce_tokens(), [
+            (APTokenTypes.WRITE, 2, b"\x10\x11\x12\x13"),
+            (APTokenTypes.OR_8, 6, 0x80),
+            (APTokenTypes.WRITE, 7, b"\x14"),
+            (APTokenTypes.WRITE, 10, b"\x15"),
+            (APTokenTypes.WRITE, 3, b"\x16"),
+        ])
+        patch.write_file("tokens.bin", patch.get_token_binary())
+        expected = bytearray(range(16))
+        expected[2:6] = b"\x10\x16\x12\x13"
+        expected[6] |= 0x80
+        expected[7] = 0x14
+        expected[10] = 0x15
+        self.assertEqual(PatchTestExtension.apply_tokens(patch, bytes(range(16)), "tokens.bin"), expected)
+
+    def test_in_place(self) -> None:
+        """Test that tokens are applied in place to a bytearray, while bytes are copied."""
+        patch = PatchTestPatch()
+        patch.write_token(APTokenTypes.RLE, 0, (4, 0xFF))
+        patch.write_token(APTokenTypes.COPY, 8, (2, 0))
+        patch.write_token(APTokenTypes.XOR_8, 12, 0x0F)
+        patch.write_file("tokens.bin", patch.get_token_binary())
+        expected = b"\xFF" * 4 + bytes(range(4, 8)) + b"\xFF\xFF" + bytes((10, 11, 12 ^ 0x0F, 13, 14, 15))
+
+        rom = bytearray(range(16))
+        self.assertIs(PatchTestExtension.apply_tokens(patch, rom, "tokens.bin"), rom)
+        self.assertEqual(rom, expected)
+        rom = bytes(range(16))
+        self.assertEqual(PatchTestExtension.apply_tokens(patch, rom, "tokens.bin"), expected)
+        self.assertEqual(rom, bytes(range(16)))
+
+    def test_procedure(self) -> None:
+        """Test that only in place steps get a bytearray, and that the source data is left untouched."""
+        patch = PatchTestPatch(player=1, player_name="Player")
+        patch.write_token(APTokenTypes.WRITE, 0, b"\x20\x21")
+        patch.write_file("tokens.bin", patch.get_token_binary())
+        patch.procedure = [("record", []), ("apply_tokens", ["tokens.bin"]), ("record_in_place", []),
+                           ("record", [])]
+        PatchTestExtension.received.clear()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            patch.path = os.path.join(temp_dir, "test.aptest")
+            patch.write()
+            target = os.path.join(temp_dir, "test.bin")
+            patch.patch(target)
+            with open(target, "rb") as f:
+                self.assertEqual(f.read(), b"\x20\x21" + bytes(range(2, 16)))
+        self.assertEqual(PatchTestExtension.received, [bytes, bytearray, bytes])
+        self.assertEqual(PatchTestPatch.source_data, bytes(range(16)))
+
+
+class TestDelta(unittest.TestCase):
+    source = bytes(range(256)) * 64
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.patched = bytearray(self.source)
+        self.patched[100:110] = b"\xFF" * 10
+        self.patched_path = os.path.join(self.temp_dir.name, "patched.bin")
+        with open(self.patched_path, "wb") as f:
+            f.write(self.patched)
+
+    def tearDown(self) -> None:
+        Files._remove_delta_dir()
+        Files._delta_workers_disabled = False
+        self.temp_dir.cleanup()
+
+    def test_worker_process(self) -> None:
+        """Test that deltas created in a worker process apply onto the source."""
+        if not Files._delta_workers_available():
+            raise unittest.SkipTest("Worker processes are not available here.")
+        delta = create_delta(self.source, self.patched_path)
+        self.assertFalse(Files._delta_workers_disabled)
+        self.assertEqual(bsdiff4.patch(self.source, delta), self.patched)
+
+    def test_failed_worker(self) -> None:
+        """Test that a failed worker process disables workers, and that the delta is created in this process."""
+        worker_code = Files._delta_worker_code
+        Files._delta_worker_code = "raise SystemExit(1)"
+        try:
+            with self.assertLogs(level="WARNING"):
+                delta = create_delta(self.source, self.patched_path)
+        finally:
+            Files._delta_worker_code = worker_code
+        self.assertTrue(Files._delta_workers_disabled)
+        self.assertFalse(Files._delta_workers_available())
+        self.assertEqual(bsdiff4.patch(self.source, delta), self.patched)
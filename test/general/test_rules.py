@@ -0,0 +1,148 @@
+import pickle
+import unittest
+
+from BaseClasses import CollectionState, Location, Region
+from worlds.generic.Rules import (And, CanReach, Count, Has, HasAll, HasAny, ItemFilter, Or, add_item_rule, add_rule,
+                                  false_rule, forbid_item, forbid_items_for_player, get_item_filter, get_rule,
+                                  set_rule, true_rule)
+from . import generate_items, generate_test_multiworld
+
+
+class TestRuleObjects(unittest.TestCase):
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld(2)
+        self.menu = self.multiworld.get_region("Menu", 1)
+        self.state = CollectionState(self.multiworld)
+
+    def collect(self, name: str, player: int = 1) -> None:
+        item = generate_items(1, player, True)[0]
+        item.name = name
+        self.state.collect(item, True)
+
+    def test_simplification(self) -> None:
+        """Test that And/Or flatten, fold constants and merge item checks."""
+        self.assertIs(And(Has("A", 1), false_rule), false_rule)
+        self.assertIs(Or(Has("A", 1), true_rule), true_rule)
+        self.assertEqual(And(Has("A", 1), true_rule), Has("A", 1))
+        self.assertIs(And(), true_rule)
+        self.assertIs(Or(), false_rule)
+        self.assertEqual(Has("A", 1) & (Has("B", 1) & Has("A", 1)), HasAll(("A", "B"), 1))
+        self.assertEqual(Has("A", 1) | HasAny(("B", "C"), 1) | Has("D", 2), Or(HasAny(("A", "B", "C"), 1), Has("D", 2)))
+        self.assertEqual(And(Has("A", 1, 2), HasAll(("A", "B"), 1)), And(Has("A", 1, 2), Has("B", 1)))
+        self.assertEqual(pickle.loads(pickle.dumps(Has("A", 1) & Or(Count(("B", "C"), 1, 2), CanReach("Menu", 1)))),
+                         Has("A", 1) & Or(Count(("B", "C"), 1, 2), CanReach("Menu", 1)))
+
+    def test_item_dependencies(self) -> None:
+        """Test that rules report the items they read, and that opaque parts make that unknown."""
+        rule = Has("A", 1) & (HasAny(("B", "C"), 2) | Count(("D", "E"), 1, 3))
+        self.assertEqual(rule.item_dependencies, {("A", 1), ("B", 2), ("C", 2), ("D", 1), ("E", 1)})
+        self.assertIsNone((rule | CanReach("Menu", 1)).item_dependencies)
+        self.assertIsNone((rule & (lambda state: True)).item_dependencies)
+
+    def test_evaluation(self) -> None:
+        """Test that the generated functions match the CollectionState helpers."""
+        many = [f"Item {i}" for i in range(20)]
+        rules = {
+            "has": (Has("A", 1, 2), lambda state: state.has("A", 1, 2)),
+            "has_all": (HasAll(("A", "B"), 1), lambda state: state.has_all(("A", "B"), 1)),
+            "has_any": (HasAny(("B", "C"), 1), lambda state: state.has_any(("B", "C"), 1)),
+            "count": (Count(many, 1, 3), lambda state: state.has_from_list(many, 1, 3)),
+            "all_many": (HasAll(many, 1), lambda state: state.has_all(many, 1)),
+            "can_reach": (CanReach("Menu", 2), lambda state: state.can_reach_region("Menu", 2)),
+            "mixed": (Has("A", 1) & (Has("B", 2) | (lambda state: state.has("C", 1))),
+                      lambda state: state.has("A", 1) and (state.has("B", 2) or state.has("C", 1))),
+        }
+        for name in ("A", "B", "A", "C", "Item 0", "Item 19", "Item 19"):
+            self.collect(name)
+            self.collect(name, 2)
+            for rule_name, (rule, expected) in rules.items():
+                with self.subTest(rule=rule_name, collected=name):
+                    self.assertEqual(rule(self.state), expected(self.state))
+
+    def test_set_and_add_rule(self) -> None:
+        """Test that set_rule and add_rule keep rule objects composable, and still accept plain functions."""
+        location = Location(1, "Test Location", None, self.menu)
+        self.menu.locations.append(location)
+        set_rule(location, Has("A", 1))
+        add_rule(location, Has("B", 1))
+        self.assertEqual(get_rule(location), HasAll(("B", "A"), 1))
+        add_rule(location, lambda state: state.has("C", 1), "or")
+        self.assertIsInstance(get_rule(location), Or)
+        self.assertFalse(location.can_reach(self.state))
+        self.collect("C")
+        self.assertTrue(location.can_reach(self.state))
+
+        region = Region("Test Region", 1, self.multiworld)
+        self.multiworld.regions.append(region)
+        entrance = self.menu.connect(region)
+        add_rule(entrance, lambda state: state.has("A", 1))
+        self.assertIsNone(get_rule(entrance))
+        add_rule(entrance, Has("B", 1))
+        self.assertIsNone(get_rule(entrance).item_dependencies)
+        self.collect("A")
+        self.assertFalse(entrance.can_reach(self.state))
+        self.collect("B")
+        self.assertTrue(entrance.can_reach(self.state))
+
+
+class TestItemFilters(unittest.TestCase):
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld(2)
+        self.menu = self.multiworld.get_region("Menu", 1)
+
+    def item(self, name: str, player: int = 1):
+        item = generate_items(1, player, True)[0]
+        item.name = name
+        return item
+
+    def test_forbid_items(self) -> None:
+        """Test that forbidding items builds one filter of denied names per player, on top of other item rules."""
+        location = Location(1, "Test Location", None, self.menu)
+        forbid_item(location, "A", 1)
+        forbid_items_for_player(location, {"B", "C"}, 2)
+        self.assertEqual(get_item_filter(location), ItemFilter({1: {"A"}, 2: {"B", "C"}}))
+        self.assertFalse(location.item_rule(self.item("A")))
+        self.assertTrue(location.item_rule(self.item("A", 2)))
+        self.assertFalse(location.item_rule(self.item("C", 2)))
+
+        add_item_rule(location, lambda item: item.name != "D")
+        forbid_item(location, "E", 2)
+        self.assertEqual(get_item_filter(location).denied, {1: {"A"}, 2: {"B", "C", "E"}})
+        self.assertEqual(len(get_item_filter(location).rules), 1)
+        for name, player, allowed in (("A", 1, False), ("D", 1, False), ("D", 2, False), ("E", 2, False),
+                                      ("E", 1, True), ("F", 1, True)):
+            with self.subTest(item=name, player=player):
+                self.assertEqual(location.item_rule(self.item(name, player)), allowed)
+
+    def test_filters_are_not_shared_on_write(self) -> None:
+        """Test that adding to a filter shared by locations only changes the location it is added to."""
+        first = Location(1, "First Location", None, self.menu)
+        second = Location(1, "Second Location", None, self.menu)
+        forbid_item(first, "A", 1)
+        second.item_rule = first.item_rule
+        forbid_item(second, "B", 1)
+        self.assertTrue(first.item_rule(self.item("B")))
+        self.assertFalse(second.item_rule(self.item("B")))
+        self.assertFalse(second.item_rule(self.item("A")))
+
+    def test_plain_item_rule_is_kept(self) -> None:
+        """Test that a plain item rule set by a world keeps being checked once items are forbidden."""
+        location = Location(1, "Test Location", None, self.menu)
+        location.item_rule = lambda item: item.player == 2
+        self.assertIsNone(get_item_filter(location))
+        forbid_item(location, "A", 2)
+        self.assertFalse(location.item_rule(self.item("B")))
+        self.assertFalse(location.item_rule(self.item("A", 2)))
+        self.assertTrue(location.item_rule(self.item("B", 2)))
+
+    def test_equal_filters_are_shared(self) -> None:
+        """Test that locations forbidding the same items end up with the same filter and item rule function."""
+        first = Location(1, "First Location", None, self.menu)
+        second = Location(1, "Second Location", None, self.menu)
+        forbid_item(first, "A", 1)
+        forbid_item(first, "B", 2)
+        forbid_items_for_player(second, {"B"}, 2)
+        forbid_item(second, "A", 1)
+        self.assertIs(get_item_filter(first), get_item_filter(second))
+        self.assertIs(first.item_rule, second.item_rule)
+        self.assertIs(pickle.loads(pickle.dumps(get_item_filter(first))), get_item_filter(first))
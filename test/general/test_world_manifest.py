@@ -0,0 +1,41 @@
+import json
+import subprocess
+import sys
+import unittest
+
+from Utils import local_path
+from worlds import _read_manifest, network_data_package, world_sources
+from worlds.AutoWorld import AutoWorldRegister
+import test.general
+
+
+class TestWorldManifest(unittest.TestCase):
+    def test_manifest_matches_worlds(self) -> None:
+        """Test that the manifest written by importing worlds knows the names of every loaded game."""
+        manifest = _read_manifest()
+        self.assertEqual(set(manifest), {world_source.path for world_source in world_sources})
+        games = {}
+        for entry in manifest.values():
+            for game, package in entry["games"].items():
+                games.setdefault(game, package)
+        for game, package in network_data_package["games"].items():
+            if game == test.general.TestWorld.game:
+                continue
+            with self.subTest(game=game):
+                self.assertIn(game, games)
+                for key in ("item_name_to_id", "location_name_to_id", "item_name_groups", "location_name_groups"):
+                    self.assertEqual(games[game][key], json.loads(json.dumps(package[key])), key)
+
+    def test_lazy_loading(self) -> None:
+        """Test that lazy loading has the same data package names and imports a world when it is requested."""
+        code = ("import json, ModuleUpdate, Utils; ModuleUpdate.update_ran = True; Utils.lazy_world_loading = True; "
+                "import worlds; loaded = len(worlds.AutoWorldRegister.world_types); "
+                "world = worlds.load_world('A Link to the Past'); "
+                "print(json.dumps([loaded, world.game, sorted(worlds.network_data_package['games'])]))")
+        process = subprocess.run([sys.executable, "-c", code], cwd=local_path(), capture_output=True, text=True,
+                                 stdin=subprocess.DEVNULL, check=True)
+        loaded, game, games = json.loads(process.stdout.splitlines()[-1])
+        self.assertLess(loaded, len(AutoWorldRegister.world_types))
+        self.assertEqual(game, "A Link to the Past")
+        self.assertEqual(games, sorted(game for game in network_data_package["games"]
+                                       if game != test.general.TestWorld.game))
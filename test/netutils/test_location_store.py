@@ -3,7 +3,7 @@ import os
 import typing
 import unittest
 import warnings
-from NetUtils import LocationStore, _LocationStore
+from NetUtils import LocationStore, _LocationStore, locations_to_array
 
 State = typing.Dict[typing.Tuple[int, int], typing.Set[int]]
 RawLocations = typing.Dict[int, typing.Dict[int, typing.Tuple[int, int, int]]]
@@ -208,6 +208,13 @@ class TestPurePythonLocationStore(Base.TestLocationStore):
         super().setUp()
 
 
+class TestPurePythonLocationStoreFromArray(Base.TestLocationStore):
+    """Run base method tests for pure python implementation, built from a location array."""
+    def setUp(self) -> None:
+        self.store = _LocationStore.from_array(locations_to_array(sample_data), len(sample_data))
+        super().setUp()
+
+
 class TestPurePythonLocationStoreConstructor(Base.TestLocationStoreConstructor):
     """Run base constructor tests for the pure python implementation."""
     def setUp(self) -> None:
@@ -224,6 +231,24 @@ class TestSpeedupsLocationStore(Base.TestLocationStore):
         super().setUp()
 
 
+@unittest.skipIf(LocationStore is _LocationStore and not ci, "_speedups not available")
+class TestSpeedupsLocationStoreFromArray(Base.TestLocationStore):
+    """Run base method tests for cython implementation, built from a location array."""
+    def setUp(self) -> None:
+        self.assertFalse(LocationStore is _LocationStore, "Failed to load _speedups")
+        self.store = LocationStore.from_array(locations_to_array(sample_data), len(sample_data))
+        super().setUp()
+
+    def test_invalid_array(self) -> None:
+        entries = locations_to_array(sample_data)
+        with self.assertRaises(ValueError):
+            LocationStore.from_array(entries, 4)  # sender 5 out of range
+        with self.assertRaises(ValueError):
+            LocationStore.from_array(entries[:-1], 5)  # incomplete entry
+        with self.assertRaises(ValueError):
+            LocationStore.from_array(entries[5:10] + entries[:5], 5)  # not sorted
+
+
 @unittest.skipIf(LocationStore is _LocationStore and not ci, "_speedups not available")
 class TestSpeedupsLocationStoreConstructor(Base.TestLocationStoreConstructor):
     """Run base constructor tests and tests the additional constraints for cython implementation."""
@@ -0,0 +1,45 @@
+import unittest
+
+from NetUtils import LocationStore, MultiData, NetworkSlot, SlotType
+
+sample_multidata = {
+    "slot_data": {1: {"goal": 1}, 2: {}},
+    "slot_info": {1: NetworkSlot("Player1", "Game A", SlotType.player), 2: NetworkSlot("Player2", "Game B",
+                                                                                         SlotType.player)},
+    "locations": {2: {20: (7, 1, 0), 21: (8, 2, 1)}, 1: {11: (9, 2, 0), 10: (8, 1, 4)}},
+    "spheres": [{1: {10}}, {1: {11}, 2: {20, 21}}],
+    "seed_name": "12345",
+    "datapackage": {"Game A": {"checksum": "abc"}},
+}
+
+
+class TestMultiData(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        """Test that all keys decode to what was encoded, with locations as a plain dict of dicts."""
+        multidata = MultiData(MultiData.encode(sample_multidata))
+        self.assertEqual(set(multidata), set(sample_multidata))
+        self.assertEqual(len(multidata), len(sample_multidata))
+        self.assertEqual(dict(multidata), sample_multidata)
+        self.assertEqual(type(multidata["locations"]), dict)
+        self.assertIn("spheres", multidata)
+        self.assertNotIn("main", multidata)
+        self.assertIsNone(multidata.get("server_options"))
+
+    def test_lazy(self) -> None:
+        """Test that sections are only decoded when accessed and untouched sections are copied when encoding."""
+        data = MultiData.encode(sample_multidata)
+        multidata = MultiData(data)
+        self.assertEqual(multidata["seed_name"], "12345")
+        self.assertEqual(set(multidata._decoded), set())
+        del multidata["datapackage"]["Game A"]
+        self.assertEqual(set(multidata._decoded), {"datapackage"})
+        modified = MultiData(MultiData.encode(multidata))
+        self.assertEqual(modified["datapackage"], {})
+        self.assertEqual(modified._raw["slot_data"], MultiData(data)._raw["slot_data"])
+
+    def test_location_store(self) -> None:
+        store = MultiData(MultiData.encode(sample_multidata)).get_location_store()
+        self.assertIsInstance(store, LocationStore)
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store[1][10], (8, 1, 4))
+        self.assertEqual(list(store[2]), [20, 21])
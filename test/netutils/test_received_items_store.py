@@ -0,0 +1,107 @@
+# Tests for _speedups.ReceivedItemsStore and NetUtils._ReceivedItemsStore
+import os
+import pickle
+import typing
+import unittest
+from NetUtils import NetworkItem, ReceivedItemsStore, _ReceivedItemsStore
+from Utils import restricted_loads
+
+ci = bool(os.environ.get("CI"))  # always set in GitHub actions
+
+# (team, slot, item, own)
+sample_items: typing.List[typing.Tuple[int, int, NetworkItem, bool]] = [
+    (0, 1, NetworkItem(10, 100, 2, 1), False),
+    (0, 1, NetworkItem(11, 101, 1, 0), True),
+    (0, 2, NetworkItem(12, 102, 1, 4), False),
+    (0, 1, NetworkItem(13, -1, 1, 0), False),  # cheated items are sent to both views
+    (0, 1, NetworkItem(2 ** 40, 2 ** 40, 3, 7), False),
+    (1, 1, NetworkItem(14, 103, 1, 0), True),
+]
+
+
+def fill(store: typing.Union[ReceivedItemsStore, _ReceivedItemsStore]) -> None:
+    for team, slot, item, own in sample_items:
+        store.add(team, slot, item, own)
+
+
+def expected(team: int, slot: int, remote_items: bool) -> typing.List[NetworkItem]:
+    return [item for item_team, item_slot, item, own in sample_items
+            if (item_team, item_slot) == (team, slot) and (remote_items or not own)]
+
+
+class Base:
+    class TestReceivedItemsStore(unittest.TestCase):
+        """Test method calls on a filled store."""
+        type: typing.Type[typing.Union[ReceivedItemsStore, _ReceivedItemsStore]]
+        store: typing.Union[ReceivedItemsStore, _ReceivedItemsStore]
+
+        def setUp(self) -> None:
+            self.store = self.type()
+            fill(self.store)
+
+        def test_views(self) -> None:
+            for key in ((0, 1, True), (0, 1, False), (0, 2, True), (0, 2, False), (1, 1, True), (1, 1, False)):
+                with self.subTest(key=key):
+                    items = expected(*key)
+                    view = self.store[key]
+                    self.assertEqual(len(view), len(items))
+                    self.assertEqual(list(view), items)
+                    self.assertEqual(view[:], items)
+                    self.assertEqual(view[1:], items[1:])
+                    self.assertEqual(view[::2], items[::2])
+                    if items:
+                        self.assertEqual(view[-1], items[-1])
+                        self.assertIsInstance(view[0], NetworkItem)
+                    with self.assertRaises(IndexError):
+                        _ = view[len(items)]
+
+        def test_growing(self) -> None:
+            view = self.store[0, 3, False]
+            self.assertEqual(len(view), 0)
+            for i in range(100):
+                self.store.add(0, 3, NetworkItem(i, i, 1, 0), i % 3 == 0)
+            self.assertEqual(len(view), 66)
+            self.assertEqual(len(self.store[0, 3, True]), 100)
+            self.assertEqual(view[-1], NetworkItem(98, 98, 1, 0))
+
+        def test_keys(self) -> None:
+            self.assertEqual(set(self.store), {(0, 1, True), (0, 1, False), (0, 2, True), (0, 2, False),
+                                               (1, 1, True), (1, 1, False)})
+            self.assertEqual(len(self.store), 6)
+            self.assertEqual({key: list(view) for key, view in self.store.items()},
+                             {key: expected(*key) for key in self.store})
+
+        def test_state(self) -> None:
+            """Saved state has to survive restricted_loads and load into either implementation."""
+            state = restricted_loads(pickle.dumps(self.store.get_state()))
+            for implementation in (ReceivedItemsStore, _ReceivedItemsStore):
+                with self.subTest(implementation=implementation):
+                    store = implementation(state)
+                    self.assertEqual({key: list(view) for key, view in store.items()},
+                                     {key: list(view) for key, view in self.store.items()})
+
+        def test_legacy_save(self) -> None:
+            """Saves from before the store have lists of NetworkItems."""
+            legacy = {key: expected(*key) for key in self.store}
+            store = self.type(legacy)
+            self.assertEqual({key: list(view) for key, view in store.items()}, legacy)
+
+        def test_empty(self) -> None:
+            self.assertEqual(len(self.type({})), 0)
+            self.assertEqual(len(self.type(None)), 0)
+
+
+class TestPurePythonReceivedItemsStore(Base.TestReceivedItemsStore):
+    """Run base method tests for pure python implementation."""
+    def setUp(self) -> None:
+        self.type = _ReceivedItemsStore
+        super().setUp()
+
+
+@unittest.skipIf(ReceivedItemsStore is _ReceivedItemsStore and not ci, "_speedups not available")
+class TestSpeedupsReceivedItemsStore(Base.TestReceivedItemsStore):
+    """Run base method tests for cython implementation."""
+    def setUp(self) -> None:
+        self.assertFalse(ReceivedItemsStore is _ReceivedItemsStore, "Failed to load _speedups")
+        self.type = ReceivedItemsStore
+        super().setUp()
@@ -1,5 +1,13 @@
+import asyncio
+import typing
 import unittest
-from MultiServer import Context, ServerCommandProcessor
+from unittest import mock
+
+import websockets
+
+from MultiServer import Client, Context, EventLoopLag, ServerCommandProcessor, ServerMetrics, \
+    format_prometheus_metrics, process_client_cmd, update_aliases
+from NetUtils import LocationStore
 
 
 class TestResolvePlayerName(unittest.TestCase):
@@ -38,3 +46,258 @@ class TestResolvePlayerName(unittest.TestCase):
         assert p.resolve_player("ABC") == (1, 2, "abc"), "case insensitive resolves when 1 match"
         assert p.resolve_player("abcd") == (1, 3, "abCD"), "case insensitive resolves when 1 match"
         assert not p.resolve_player("aB"), "partial name shouldn't resolve to player"
+
+
+class TestDataPackageMsg(unittest.TestCase):
+    def test_matches_encoded_package(self) -> None:
+        """Test that the spliced DataPackage message is exactly what encoding the whole package would produce."""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx._init_game_data()
+        some_games = list(ctx.gamespackage)[:3]
+        for games in ([], some_games, list(ctx.gamespackage)):
+            expected = ctx.dumper([{"cmd": "DataPackage",
+                                    "data": {"games": {game: ctx.gamespackage[game] for game in games}}}])
+            self.assertEqual(ctx.get_data_package_msg(games), expected)
+        self.assertIs(ctx.get_data_package_msg(some_games), ctx.get_data_package_msg(tuple(some_games)))
+
+
+class TestConnectedParts(unittest.TestCase):
+    def test_alias_invalidates_players(self) -> None:
+        """Test that the pre-encoded players of Connected follow alias changes."""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.player_names = {(0, 1): "Player1", (0, 2): "Player2"}
+        ctx.clients = {0: {1: [], 2: []}}
+        self.assertEqual(ctx.get_encoded_connected_part("players"), ctx.dumper(ctx.get_players_package()))
+        ctx.name_aliases[0, 2] = "Alias"
+        update_aliases(ctx, 0)
+        self.assertIn("Alias (Player2)", ctx.get_encoded_connected_part("players"))
+        self.assertEqual(ctx.get_encoded_connected_part("players"), ctx.dumper(ctx.get_players_package()))
+
+
+class TestServerMetrics(unittest.TestCase):
+    def test_counting(self) -> None:
+        """Test that messages are counted per command, broadcasts per recipient and unknown commands together."""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        metrics = ServerMetrics()
+        metrics.observe_out(ctx.dumper([{"cmd": "PrintJSON", "data": [{"text": '{"cmd":"Fake"}'}]},
+                                        {"cmd": "ReceivedItems", "index": 0, "items": []}]), 3)
+        metrics.observe_handler({"cmd": "Say", "text": "hi"}, 0.5)
+        metrics.observe_handler({"cmd": "Say", "text": "hi"}, 0.25)
+        metrics.observe_handler({"cmd": "Nonsense"}, 0.125)
+        metrics.observe_handler("not a dict", 0.125)
+        self.assertEqual(metrics.messages_out, {"PrintJSON": 3, "ReceivedItems": 3})
+        self.assertEqual(metrics.messages_in, {"Say": 2, "Unknown": 2})
+        self.assertEqual(metrics.handler_seconds["Say"], 0.75)
+        self.assertEqual(metrics.handler_max_seconds["Say"], 0.5)
+        self.assertEqual(metrics.to_dict(ctx)["archipelago_messages_in_total"], {"Say": 2, "Unknown": 2})
+
+    def test_prometheus_format(self) -> None:
+        ctx = Context("", 0, "", "", 0, 0, False)
+        metrics = ServerMetrics()
+        metrics.observe_handler({"cmd": "Sync"}, 0.5)
+        text = format_prometheus_metrics(metrics.get_samples(ctx, {"room": 'a "room"'}))
+        self.assertIn("# TYPE archipelago_messages_in_total counter\n", text)
+        self.assertIn('archipelago_messages_in_total{room="a \\"room\\"",cmd="Sync"} 1\n', text)
+        self.assertIn('archipelago_clients{room="a \\"room\\""} 0\n', text)
+
+
+
+class TestEventLoopLag(unittest.IsolatedAsyncioTestCase):
+    async def test_shared_watcher(self) -> None:
+        """Test that Contexts on the same event loop share one lag watcher, which their samples leave out."""
+        first = Context("", 0, "", "", 0, 0, False)
+        second = Context("", 0, "", "", 0, 0, False)
+        first.enable_metrics()
+        second.enable_metrics()
+        self.assertIs(first.metrics.event_loop, second.metrics.event_loop)
+        self.assertIs(first.metrics.event_loop, EventLoopLag.watch())
+        self.assertNotIn("archipelago_event_loop_lag_seconds",
+                         {name for name, _, _ in first.metrics.get_samples(first)})
+        self.assertIn("archipelago_event_loop_lag_seconds", first.metrics.to_dict(first))
+
+class TestSendQueue(unittest.IsolatedAsyncioTestCase):
+    class FakeTransport:
+        buffered = 0
+
+        def get_write_buffer_size(self) -> int:
+            return self.buffered
+
+    class FakeSocket:
+        open = True
+        remote_address = ("127.0.0.1", 0)
+        closed_code = None
+
+        def __init__(self) -> None:
+            self.transport = TestSendQueue.FakeTransport()
+            self.sent = []
+
+        async def send(self, msg: str) -> None:
+            self.sent.append(msg)
+
+        async def close(self, code: int, reason: str) -> None:
+            self.closed_code = code
+
+    async def test_slow_client(self) -> None:
+        """Test that a client that falls behind gets its messages queued, low priority ones dropped,
+        and gets disconnected once too much is waiting."""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.send_queue_limit = 100
+        ctx.send_queue_hard_limit = 1000
+        socket = self.FakeSocket()
+        client = Client(socket, ctx)
+        socket.transport.buffered = 200  # client is not reading
+
+        self.assertFalse(await ctx.send_msgs(client, [{"cmd": "PrintJSON", "data": [{"text": "chat"}],
+                                                        "type": "Chat", "team": 0, "slot": 1, "message": "chat"}]))
+        self.assertEqual(client.dropped_msgs, 1)
+        self.assertTrue(await ctx.send_msgs(client, [{"cmd": "ReceivedItems", "index": 0, "items": []}]))
+        self.assertTrue(await ctx.send_msgs(client, [{"cmd": "PrintJSON", "data": [{"text": "hint"}],
+                                                       "type": "Hint"}]))
+        self.assertTrue(await ctx.send_msgs(client, [{"cmd": "PrintJSON", "data": [{"text": "!getitem"}]}]))
+        self.assertEqual(len(client.send_queue), 3)
+        await asyncio.sleep(0)  # queue writer runs
+        self.assertEqual(len(socket.sent), 4)
+        self.assertIn("ReceivedItems", socket.sent[0])
+        self.assertIn("hint", socket.sent[1])
+        self.assertIn("!getitem", socket.sent[2])
+        self.assertIn("1 messages were not sent", socket.sent[3])
+        self.assertEqual((client.send_queue_bytes, client.dropped_msgs, client.sending), (0, 0, False))
+
+        self.assertFalse(await ctx.send_encoded_msgs(client, ctx.dumper([{"cmd": "RoomUpdate", "x": "x" * 1000}])))
+        await asyncio.sleep(0)
+        self.assertEqual(socket.closed_code, 1013)
+
+    async def test_queued_bytes(self) -> None:
+        """Test that queued messages are counted in encoded bytes, like the socket buffer."""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        socket = self.FakeSocket()
+        client = Client(socket, ctx)
+        socket.transport.buffered = ctx.send_queue_limit
+        msg = ctx.dumper([{"cmd": "RoomUpdate", "players": "é" * 10}])
+        self.assertTrue(await ctx.send_encoded_msgs(client, msg))
+        self.assertEqual(client.send_queue_bytes, len(msg) + 10)
+        await asyncio.sleep(0)
+        self.assertEqual(client.send_queue_bytes, 0)
+
+    async def test_closed_client(self) -> None:
+        """Test that a client closing its connection while messages are queued is disconnected quietly,
+        and that a socket without transport is treated as having an empty buffer."""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.send_queue_limit = 100
+        socket = self.FakeSocket()
+        client = Client(socket, ctx)
+        ctx.endpoints.append(client)
+        socket.transport.buffered = 200
+
+        async def send(msg: str) -> None:
+            raise websockets.ConnectionClosed(None, None)
+
+        socket.send = send
+        with self.assertNoLogs(ctx.logger, "ERROR"):
+            self.assertTrue(await ctx.send_msgs(client, [{"cmd": "ReceivedItems", "index": 0, "items": []}]))
+            await asyncio.sleep(0)
+        self.assertEqual((client.send_queue_bytes, len(client.send_queue), client.sending), (0, 0, False))
+        self.assertNotIn(client, ctx.endpoints)
+
+        socket.transport = None
+        self.assertTrue(ctx._can_send_now(client))
+
+
+class TestBounceRouting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.ctx = Context("", 0, "", "", 0, 0, False)
+        self.ctx.games = {1: "Game A", 2: "Game B", 3: "Game A"}
+        self.ctx.clients = {0: {1: [], 2: [], 3: []}, 1: {1: []}}
+
+    def connect(self, team: int, slot: int, tags: typing.List[str]) -> Client:
+        client = Client(TestSendQueue.FakeSocket(), self.ctx)
+        client.team, client.slot, client.tags = team, slot, tags
+        self.ctx.clients[team][slot].append(client)
+        self.ctx.update_bounce_index(client, True)
+        return client
+
+    def test_recipients(self) -> None:
+        """Test that Bounce reaches clients by game, tag and slot, only within the team, and not after leaving."""
+        a1 = self.connect(0, 1, ["DeathLink"])
+        b2 = self.connect(0, 2, [])
+        a3 = self.connect(0, 3, ["Tracker"])
+        other_team = self.connect(1, 1, ["DeathLink"])
+        self.assertEqual(self.ctx.get_bounce_recipients(0, ["Game A"], [], []), {a1, a3})
+        self.assertEqual(self.ctx.get_bounce_recipients(0, [], ["DeathLink"], []), {a1})
+        self.assertEqual(self.ctx.get_bounce_recipients(1, [], ["DeathLink"], []), {other_team})
+        self.assertEqual(self.ctx.get_bounce_recipients(0, ["Game B"], ["Tracker"], [1, 5]), {a1, b2, a3})
+
+        self.ctx.update_bounce_index(a1, False)
+        a1.tags = []
+        self.ctx.update_bounce_index(a1, True)
+        self.assertEqual(self.ctx.get_bounce_recipients(0, [], ["DeathLink"], []), set())
+        self.assertEqual(self.ctx.get_bounce_recipients(0, ["Game A"], [], []), {a1, a3})
+        asyncio.run(self.ctx.disconnect(a3))
+        self.assertEqual(self.ctx.get_bounce_recipients(0, ["Game A"], [], []), {a1})
+
+    def test_rate_limit(self) -> None:
+        allowed = sum(self.ctx.allow_bounce(0, 1) for _ in range(100))
+        self.assertLessEqual(allowed, self.ctx.bounce_burst_limit + 1)
+        self.assertTrue(self.ctx.allow_bounce(0, 2), "rate limit should be per slot")
+
+
+class TestHintLookup(unittest.TestCase):
+    def setUp(self) -> None:
+        self.ctx = Context("", 0, "", "", 0, 0, False)
+        self.ctx.locations = LocationStore({
+            1: {11: (21, 2, 1), 12: (22, 1, 0), 13: (21, 3, 0)},
+            2: {21: (21, 1, 0), 22: (23, 2, 0)},
+            3: {31: (21, 2, 0)},
+        })
+
+    def test_find_item(self) -> None:
+        """Test that the cached item locations give the same results as scanning the LocationStore."""
+        for slots in ({1}, {2}, {1, 2}, {1, 2, 3}, {4}):
+            for item_id in (21, 22, 23, 24):
+                with self.subTest(slots=slots, item_id=item_id):
+                    self.assertEqual(list(self.ctx.find_item(slots, item_id)),
+                                     list(self.ctx.locations.find_item(slots, item_id)))
+
+    def test_shared_name_index(self) -> None:
+        """Test that contexts share name indexes through name_indexes, by data package checksum."""
+        self.ctx.gamespackage = {"Game A": {"item_name_to_id": {"Item": 1, "Other Item": 2}, "checksum": "a"},
+                                 "Game B": {"item_name_to_id": {"Item": 1}}}
+        index = self.ctx.get_name_index("items", "Game A")
+        self.assertIs(self.ctx.get_name_index("items", "Game A"), index)
+        self.assertEqual(index.get_intended_text("other item"), ("Other Item", True, "Perfect Match"))
+        other_ctx = Context("", 0, "", "", 0, 0, False)
+        other_ctx.gamespackage = self.ctx.gamespackage
+        other_ctx.name_indexes = self.ctx.name_indexes
+        self.assertIs(other_ctx.get_name_index("items", "Game A"), index)
+        self.assertIsNot(other_ctx.get_name_index("items", "Game B"), self.ctx.get_name_index("items", "Game B"))
+
+
+class TestConnectQueue(unittest.IsolatedAsyncioTestCase):
+    async def test_connect_storm(self) -> None:
+        """Test that Connects are processed in order, one per event loop iteration,
+        and that LocationChecks of a playing client are handled in between."""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        player = Client(None, ctx)
+        player.auth, player.team, player.slot, player.no_locations = True, 0, 1, False
+        connecting = [Client(None, ctx) for _ in range(10)]
+        handled = []
+
+        async def on_client_connect(_ctx: Context, client: Client, args: dict) -> None:
+            handled.append(connecting.index(client))
+
+        def register_location_checks(_ctx: Context, team: int, slot: int, locations: typing.List[int]) -> None:
+            handled.append("checks")
+
+        async def play() -> None:
+            while not handled:
+                await asyncio.sleep(0)
+            await process_client_cmd(ctx, player, {"cmd": "LocationChecks", "locations": [1]})
+
+        with mock.patch("MultiServer.on_client_connect", on_client_connect), \
+                mock.patch("MultiServer.register_location_checks", register_location_checks):
+            await asyncio.gather(play(), *(process_client_cmd(ctx, client, {"cmd": "Connect"})
+                                           for client in connecting))
+        self.assertLessEqual(handled.index("checks"), 2)
+        handled.remove("checks")
+        self.assertEqual(handled, list(range(10)))
+        self.assertFalse(ctx.connecting)
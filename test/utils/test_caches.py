@@ -3,7 +3,8 @@
 import unittest
 from typing import Any
 
-from Utils import cache_argsless, cache_self1
+import Utils
+from Utils import cache_argsless, cache_self1, load_cached_rom
 
 
 class TestCacheArgless(unittest.TestCase):
@@ -64,3 +65,47 @@ class TestCacheSelf1(unittest.TestCase):
                 @cache_self1  # type: ignore[arg-type]
                 def func(_1: Any, _2: Any, _3: Any) -> Any:
                     pass
+
+
+class TestLoadCachedRom(unittest.TestCase):
+    def setUp(self) -> None:
+        import tempfile
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.old_cache_path = getattr(Utils.cache_path, "cached_path", None)
+        Utils.cache_path.cached_path = self.temp_dir.name
+        self.source = Utils.cache_path("source.bin")
+        with open(self.source, "wb") as f:
+            f.write(b"source")
+
+    def tearDown(self) -> None:
+        for rom in Utils._cached_roms.values():
+            rom.close()
+        Utils._cached_roms.clear()
+        if self.old_cache_path is None:
+            del Utils.cache_path.cached_path
+        else:
+            Utils.cache_path.cached_path = self.old_cache_path
+        self.temp_dir.cleanup()
+
+    def test_cache(self) -> None:
+        calls = []
+
+        def create() -> bytes:
+            calls.append(1)
+            return b"derived"
+
+        rom = load_cached_rom("Test Game", self.source, "1", create)
+        self.assertEqual(rom[:], b"derived")
+        self.assertIs(rom, load_cached_rom("Test Game", self.source, "1", create))
+        self.assertEqual(len(calls), 1)
+        with self.assertRaises(TypeError):
+            rom[0] = 0  # read-only
+
+        # a new process would load it from disk
+        Utils._cached_roms.clear()
+        self.assertEqual(load_cached_rom("Test Game", self.source, "1", create)[:], b"derived")
+        self.assertEqual(len(calls), 1)
+
+        # a different version is a different image
+        load_cached_rom("Test Game", self.source, "2", create)
+        self.assertEqual(len(calls), 2)
@@ -0,0 +1,32 @@
+import random
+import unittest
+
+from Utils import FuzzyNameIndex, get_intended_text
+
+
+class TestFuzzyNameIndex(unittest.TestCase):
+    def test_same_as_get_intended_text(self) -> None:
+        """Test that the index resolves names exactly like get_intended_text, including ties and messages."""
+        names = ["Progressive Sword", "Progressive Shield", "Sword", "sword", "Bow", "Silver Arrows", "Arrows (10)",
+                 "Bombs (3)", "Bombs (10)", "Magic Mirror", "Moon Pearl", "Boss Heart Container", "Piece of Heart"]
+        index = FuzzyNameIndex(names)
+        world_random = random.Random(0)
+        queries = ["SWORD", "Sword", "prog sword", "bombs", "Bombs (5)", "moon", "x", "Arrows", "Heart"]
+        for _ in range(200):
+            query = list(world_random.choice(names))
+            for _ in range(world_random.randint(1, 5)):
+                position = world_random.randrange(len(query) + 1)
+                if world_random.random() < 0.5:
+                    query.insert(position, world_random.choice("abos ()1"))
+                elif position < len(query):
+                    del query[position]
+            queries.append("".join(query))
+        for query in queries:
+            with self.subTest(query=query):
+                self.assertEqual(index.get_intended_text(query), get_intended_text(query, names))
+
+    def test_single_name(self) -> None:
+        index = FuzzyNameIndex(["Triforce"])
+        for query in ("Triforce", "triforce", "Triforc", "Tri"):
+            with self.subTest(query=query):
+                self.assertEqual(index.get_intended_text(query), get_intended_text(query, ["Triforce"]))
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+from argparse import Namespace
+
+import Utils
+from Utils import load_data_package_for_checksum, persistent_get, persistent_load, persistent_store
+
+
+class TestPersistentStorage(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.old_paths = {func: getattr(func, "cached_path", None) for func in (Utils.user_path, Utils.cache_path)}
+        for func in self.old_paths:
+            func.cached_path = self.temp_dir.name
+        self.old_storage = Utils._persistent_storage
+        Utils._persistent_storage = None
+
+    def tearDown(self) -> None:
+        if Utils._persistent_storage:
+            Utils._persistent_storage.close()
+        Utils._persistent_storage = self.old_storage
+        for func, path in self.old_paths.items():
+            if path is None:
+                del func.cached_path
+            else:
+                func.cached_path = path
+        self.temp_dir.cleanup()
+
+    def test_store(self) -> None:
+        self.assertIsNone(persistent_get("client", "last_server_address"))
+        self.assertEqual(persistent_get("client", "last_server_address", ""), "")
+        persistent_store("client", "last_server_address", "localhost:38281")
+        persistent_store("adjuster", "Test Game", Namespace(music=False))
+        persistent_store("client", "last_server_address", "archipelago.gg:38281")
+        self.assertEqual(persistent_get("client", "last_server_address"), "archipelago.gg:38281")
+        self.assertEqual(persistent_get("adjuster", "Test Game"), Namespace(music=False))
+        self.assertEqual(persistent_load(), {"client": {"last_server_address": "archipelago.gg:38281"},
+                                             "adjuster": {"Test Game": Namespace(music=False)}})
+
+    def test_yaml_migration(self) -> None:
+        """Test that the old yaml store is migrated, with data packages moving to the per-checksum cache."""
+        data_package = {"item_name_to_id": {"Item": 1}, "location_name_to_id": {"Location": 1}, "checksum": "abc"}
+        with open(Utils.user_path("_persistent_storage.yaml"), "w") as f:
+            f.write(Utils.dump({"client": {"uuid": 1234}, "datapackage": {"games": {"Test Game": data_package}}},
+                               Dumper=Utils.Dumper))
+        self.assertEqual(persistent_get("client", "uuid"), 1234)
+        self.assertEqual(persistent_load(), {"client": {"uuid": 1234}})
+        self.assertEqual(load_data_package_for_checksum("Test Game", "abc"), data_package)
+        self.assertFalse(os.path.exists(Utils.user_path("_persistent_storage.yaml")))
@@ -4,11 +4,13 @@ import hashlib
 import logging
 import pathlib
 import sys
+import threading
 import time
+from contextlib import contextmanager
 from random import Random
 from dataclasses import make_dataclass
-from typing import (Any, Callable, ClassVar, Dict, FrozenSet, List, Mapping, Optional, Set, TextIO, Tuple,
-                    TYPE_CHECKING, Type, Union)
+from typing import (Any, Callable, ClassVar, ContextManager, Dict, FrozenSet, Iterator, List, Mapping, Optional,
+                    Set, TextIO, Tuple, TYPE_CHECKING, Type, Union)
 
 from Options import item_and_loc_options, OptionGroup, PerGameCommonOptions
 from BaseClasses import CollectionState
@@ -245,6 +247,41 @@ class WebWorld(metaclass=WebWorldRegister):
     """An optional map from item names (or item group names) to brief descriptions for users."""
 
 
+class OutputMemoryBudget:
+    """Memory in bytes that world outputs may reserve at once, see World.reserve_output_memory."""
+
+    def __init__(self, limit: int = 0) -> None:
+        """:param limit: bytes that reservations may add up to, 0 for no limit"""
+        self.limit = limit
+        self.used = 0
+        self.waited = 0.0
+        """seconds that reservations waited in total"""
+        self.condition = threading.Condition()
+
+    @contextmanager
+    def reserve(self, memory: int) -> Iterator[None]:
+        memory = memory if self.limit else 0
+        if memory:
+            start = time.perf_counter()
+            with self.condition:
+                # a reservation larger than the whole budget goes through once nothing else holds memory
+                while self.used and self.used + memory > self.limit:
+                    self.condition.wait()
+                self.used += memory
+                self.waited += time.perf_counter() - start
+        try:
+            yield
+        finally:
+            if memory:
+                with self.condition:
+                    self.used -= memory
+                    self.condition.notify_all()
+
+
+output_memory_budget = OutputMemoryBudget()
+"""budget of the running generation, set by the generator"""
+
+
 class World(metaclass=AutoWorldRegister):
     """A World object encompasses a game's Items, Locations, Rules and additional data or functionality required.
     A Game should have its own subclass of World in which it defines the required data structures."""
@@ -292,6 +329,17 @@ class World(metaclass=AutoWorldRegister):
     web: ClassVar[WebWorld] = WebWorld()
     """see WebWorld for options"""
 
+    output_memory: ClassVar[int] = 0
+    """
+    estimated peak memory in bytes taken by generate_output, such as a decompressed rom.
+    generate_output reserves it with reserve_output_memory, see there.
+    """
+    output_process_safe: ClassVar[bool] = False
+    """
+    set if generate_output is CPU heavy and only writes files to the output directory, so it can run in a worker
+    process. Changes it makes to the world or multiworld are not seen by the rest of generation in that case.
+    """
+
     multiworld: "MultiWorld"
     """autoset on creation. The MultiWorld object for the currently generating multiworld."""
     player: int
@@ -399,6 +447,14 @@ class World(metaclass=AutoWorldRegister):
         """
         pass
 
+    def reserve_output_memory(self) -> ContextManager[None]:
+        """
+        Waits until output_memory fits into the generator's output_memory_budget, next to the memory reserved by other
+        outputs, and holds it for the with block. Reserve it in generate_output around the code allocating the memory,
+        and never wait on other outputs, such as for an event they set, while holding it.
+        """
+        return output_memory_budget.reserve(self.output_memory)
+
     def fill_slot_data(self) -> Mapping[str, Any]:  # json of WebHostLib.models.Slot
         """
         What is returned from this function will be in the `slot_data` field
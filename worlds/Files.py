@@ -2,16 +2,22 @@ from __future__ import annotations
 
 import abc
 import json
+import struct
 import zipfile
 from enum import IntEnum
 import os
 import threading
 
-from typing import ClassVar, Dict, List, Literal, Tuple, Any, Optional, Union, BinaryIO, overload, Sequence
+from typing import Callable, ClassVar, Dict, List, Literal, Tuple, Any, Optional, Union, BinaryIO, overload, Sequence, \
+    TypeVar
 
 import bsdiff4
 
 semaphore = threading.Semaphore(os.cpu_count() or 4)
+delta_workers: int = os.cpu_count() or 4
+# bounds the delta worker processes running at once
+delta_semaphore = threading.BoundedSemaphore(delta_workers)
+delta_lock = threading.Lock()
 
 del threading
 del os
@@ -251,7 +257,7 @@ class APProcedurePatch(APAutoPatchInterface):
 
     def patch(self, target: str) -> None:
         self.read()
-        base_data = self.get_source_data_with_cache()
+        base_data: Union[bytes, bytearray] = self.get_source_data_with_cache()
         patch_extender = AutoPatchExtensionRegister.get_handler(self.game)
         assert not isinstance(self.procedure, str), f"{type(self)} must define procedures"
         for step, args in self.procedure:
@@ -260,10 +266,16 @@ class APProcedurePatch(APAutoPatchInterface):
                                   if item is not None), None)
             else:
                 extension = getattr(patch_extender, step, None)
-            if extension is not None:
-                base_data = extension(self, base_data, *args)
-            else:
+            if extension is None:
                 raise NotImplementedError(f"Unknown procedure {step} for {self.game}.")
+            # consecutive in place steps share one bytearray instead of copying the whole file each,
+            # other steps keep getting bytes
+            if getattr(extension, "in_place", False):
+                if not isinstance(base_data, bytearray):
+                    base_data = bytearray(base_data)
+            elif isinstance(base_data, bytearray):
+                base_data = bytes(base_data)
+            base_data = extension(self, base_data, *args)
         with open(target, 'wb') as f:
             f.write(base_data)
 
@@ -281,11 +293,94 @@ class APDeltaPatch(APProcedurePatch):
         self.patched_path = patched_path
 
     def write_contents(self, opened_zipfile: zipfile.ZipFile) -> None:
-        self.write_file("delta.bsdiff4",
-                        bsdiff4.diff(self.get_source_data_with_cache(), open(self.patched_path, "rb").read()))
+        self.write_file("delta.bsdiff4", create_delta(self.get_source_data_with_cache(), self.patched_path))
         super(APDeltaPatch, self).write_contents(opened_zipfile)
 
 
+_delta_workers_disabled: bool = False
+_delta_dir: Optional[str] = None
+_delta_source_paths: Dict[str, str] = {}  # source checksum -> file handed to the workers
+# a worker process only imports bsdiff4, unlike a multiprocessing worker, which would import the main module again
+_delta_worker_code = "import sys, bsdiff4; bsdiff4.file_diff(*sys.argv[1:4])"
+
+
+def _delta_workers_available() -> bool:
+    """Whether deltas can be created in worker processes here."""
+    import sys
+    # frozen builds have no python interpreter to run the workers with
+    return not _delta_workers_disabled and not getattr(sys, "frozen", False)
+
+
+def _disable_delta_workers(returncode: int, error: bytes) -> None:
+    """Stops using worker processes after one failed, later deltas are created in this process."""
+    global _delta_workers_disabled
+    import logging
+    with delta_lock:
+        if _delta_workers_disabled:
+            return
+        _delta_workers_disabled = True
+    logging.warning(f"A delta patch worker process failed with exit code {returncode}, most likely running out of "
+                    f"memory. Delta patches are created in the generator process from now on.")
+    logging.debug(error.decode(errors="replace"))
+
+
+def _remove_delta_dir() -> None:
+    global _delta_dir
+    import shutil
+    if _delta_dir:
+        shutil.rmtree(_delta_dir, ignore_errors=True)
+        _delta_dir = None
+        _delta_source_paths.clear()
+
+
+def _get_delta_source_path(source_data: bytes) -> str:
+    """Stores source data once per checksum, so all patches against the same base share a single copy."""
+    global _delta_dir
+    import atexit
+    import hashlib
+    import os
+    import tempfile
+    checksum = hashlib.sha1(source_data).hexdigest()
+    with delta_lock:
+        if checksum not in _delta_source_paths:
+            if not _delta_dir:
+                _delta_dir = tempfile.mkdtemp(prefix="ap_delta_")
+                atexit.register(_remove_delta_dir)
+            path = os.path.join(_delta_dir, f"{checksum}.base")
+            with open(path, "wb") as f:
+                f.write(source_data)
+            _delta_source_paths[checksum] = path
+        return _delta_source_paths[checksum]
+
+
+def create_delta(source_data: bytes, patched_path: str) -> bytes:
+    """
+    Creates a bsdiff4 delta from source_data to the file at patched_path.
+    This runs in a worker process where possible, as bsdiff4 holds the GIL for part of its work.
+    Workers are plain interpreters that only import bsdiff4, and read the source from a file shared by all patches
+    against it. If a worker fails, workers are no longer used and deltas are created in this process.
+    """
+    if _delta_workers_available():
+        import os
+        import subprocess
+        import sys
+        import uuid
+        source_path = _get_delta_source_path(source_data)
+        assert _delta_dir
+        delta_path = os.path.join(_delta_dir, f"{uuid.uuid4().hex}.bsdiff4")
+        with delta_semaphore:
+            process = subprocess.run([sys.executable, "-c", _delta_worker_code, source_path, patched_path, delta_path],
+                                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if process.returncode == 0:
+            with open(delta_path, "rb") as f:
+                delta = f.read()
+            os.remove(delta_path)
+            return delta
+        _disable_delta_workers(process.returncode, process.stderr)
+    with open(patched_path, "rb") as f:
+        return bsdiff4.diff(source_data, f.read())
+
+
 class APTokenTypes(IntEnum):
     WRITE = 0
     COPY = 1
@@ -295,6 +390,11 @@ class APTokenTypes(IntEnum):
     XOR_8 = 5
 
 
+_token_count = struct.Struct("<I")
+_token_header = struct.Struct("<BII")  # type, offset, size
+_token_range = struct.Struct("<II")  # length, source offset or fill value
+
+
 class APTokenMixin:
     """
     A class that defines functions for generating a token binary, for use in patches.
@@ -309,11 +409,13 @@ class APTokenMixin:
     def get_token_binary(self) -> bytes:
         """
         Returns the token binary created from stored tokens.
+        Consecutive WRITE tokens to adjacent offsets are coalesced into a single token.
         :return: A bytes object representing the token data.
         """
+        tokens = self._coalesce_tokens()
         data = bytearray()
-        data.extend(len(self._tokens).to_bytes(4, "little"))
-        for token_type, offset, args in self._tokens:
+        data.extend(len(tokens).to_bytes(4, "little"))
+        for token_type, offset, args in tokens:
             data.append(token_type)
             data.extend(offset.to_bytes(4, "little"))
             if token_type in [APTokenTypes.AND_8, APTokenTypes.OR_8, APTokenTypes.XOR_8]:
@@ -333,6 +435,34 @@ class APTokenMixin:
                 raise ValueError(f"Unknown token type {token_type}")
         return bytes(data)
 
+    def _coalesce_tokens(self) -> List[Tuple[APTokenTypes, int, Union[bytes, Tuple[int, int], int]]]:
+        """
+        Merges runs of WRITE tokens where each token starts exactly where the previous one ended.
+        Token order is preserved, so the result patches identically to the original token list.
+        """
+        tokens: List[Tuple[APTokenTypes, int, Union[bytes, Tuple[int, int], int]]] = []
+        run: Optional[bytearray] = None
+        run_offset = run_end = 0
+        for token_type, offset, args in self._tokens:
+            if token_type == APTokenTypes.WRITE and isinstance(args, bytes):
+                if run is not None and offset == run_end:
+                    run.extend(args)
+                    run_end += len(args)
+                    continue
+                if run is not None:
+                    tokens.append((APTokenTypes.WRITE, run_offset, bytes(run)))
+                run = bytearray(args)
+                run_offset = offset
+                run_end = offset + len(args)
+                continue
+            if run is not None:
+                tokens.append((APTokenTypes.WRITE, run_offset, bytes(run)))
+                run = None
+            tokens.append((token_type, offset, args))
+        if run is not None:
+            tokens.append((APTokenTypes.WRITE, run_offset, bytes(run)))
+        return tokens
+
     @overload
     def write_token(self,
                     token_type: Literal[APTokenTypes.AND_8, APTokenTypes.OR_8, APTokenTypes.XOR_8],
@@ -364,6 +494,15 @@ class APTokenMixin:
         self._tokens.append((token_type, offset, data))
 
 
+InPlaceFunction = TypeVar("InPlaceFunction", bound=Callable[..., Union[bytes, bytearray]])
+
+
+def in_place(function: InPlaceFunction) -> InPlaceFunction:
+    """Marks a patch extension function as taking a bytearray that it may patch in place, instead of bytes."""
+    function.in_place = True  # type: ignore[attr-defined]
+    return function
+
+
 class APPatchExtension(metaclass=AutoPatchExtensionRegister):
     """Class that defines patch extension functions for a given game.
     Patch extension functions must have the following two arguments in the following order:
@@ -375,6 +514,7 @@ class APPatchExtension(metaclass=AutoPatchExtensionRegister):
     Further arguments are passed in from the procedure as defined.
 
     Patch extension functions must return the changed bytes.
+    Functions decorated with `in_place` get a bytearray instead, which they may change and return.
     """
     game: str
     required_extensions: ClassVar[Tuple[str, ...]] = ()
@@ -385,44 +525,52 @@ class APPatchExtension(metaclass=AutoPatchExtensionRegister):
         return bsdiff4.patch(rom, caller.get_file(patch))
 
     @staticmethod
-    def apply_tokens(caller: APProcedurePatch, rom: bytes, token_file: str) -> bytes:
-        """Applies the given token file from the patch onto the current file."""
-        token_data = caller.get_file(token_file)
-        rom_data = bytearray(rom)
-        token_count = int.from_bytes(token_data[0:4], "little")
+    @in_place
+    def apply_tokens(caller: APProcedurePatch, rom: bytes, token_file: str) -> bytearray:
+        """Applies the given token file from the patch onto the current file.
+        If rom is a bytearray, it is patched in place and returned."""
+        token_data = memoryview(caller.get_file(token_file))
+        rom_data = rom if isinstance(rom, bytearray) else bytearray(rom)
+        token_count, = _token_count.unpack_from(token_data)
+        read_header = _token_header.unpack_from
+        read_range = _token_range.unpack_from
         bpr = 4
         for _ in range(token_count):
-            token_type = token_data[bpr:bpr + 1][0]
-            offset = int.from_bytes(token_data[bpr + 1:bpr + 5], "little")
-            size = int.from_bytes(token_data[bpr + 5:bpr + 9], "little")
-            data = token_data[bpr + 9:bpr + 9 + size]
-            if token_type in [APTokenTypes.AND_8, APTokenTypes.OR_8, APTokenTypes.XOR_8]:
-                arg = data[0]
-                if token_type == APTokenTypes.AND_8:
-                    rom_data[offset] = rom_data[offset] & arg
-                elif token_type == APTokenTypes.OR_8:
-                    rom_data[offset] = rom_data[offset] | arg
-                else:
-                    rom_data[offset] = rom_data[offset] ^ arg
-            elif token_type in [APTokenTypes.COPY, APTokenTypes.RLE]:
-                length = int.from_bytes(data[:4], "little")
-                value = int.from_bytes(data[4:], "little")
-                if token_type == APTokenTypes.COPY:
-                    rom_data[offset: offset + length] = rom_data[value: value + length]
-                else:
-                    rom_data[offset: offset + length] = bytes([value] * length)
+            token_type, offset, size = read_header(token_data, bpr)
+            bpr += 9
+            if token_type == APTokenTypes.WRITE:
+                data = token_data[bpr:bpr + size]
+                rom_data[offset:offset + len(data)] = data
+            elif token_type == APTokenTypes.AND_8:
+                rom_data[offset] &= token_data[bpr]
+            elif token_type == APTokenTypes.OR_8:
+                rom_data[offset] |= token_data[bpr]
+            elif token_type == APTokenTypes.XOR_8:
+                rom_data[offset] ^= token_data[bpr]
+            elif token_type == APTokenTypes.COPY:
+                length, source = read_range(token_data, bpr)
+                rom_data[offset:offset + length] = rom_data[source:source + length]
+            elif token_type == APTokenTypes.RLE:
+                length, value = read_range(token_data, bpr)
+                rom_data[offset:offset + length] = bytes((value,)) * length
             else:
+                # unknown token types have always been treated as writes
+                data = token_data[bpr:bpr + size]
                 rom_data[offset:offset + len(data)] = data
-            bpr += 9 + size
-        return bytes(rom_data)
+            bpr += size
+        return rom_data
 
     @staticmethod
-    def calc_snes_crc(caller: APProcedurePatch, rom: bytes) -> bytes:
-        """Calculates and applies a valid CRC for the SNES rom header."""
-        rom_data = bytearray(rom)
+    @in_place
+    def calc_snes_crc(caller: APProcedurePatch, rom: bytes) -> bytearray:
+        """Calculates and applies a valid CRC for the SNES rom header.
+        If rom is a bytearray, it is patched in place and returned."""
+        rom_data = rom if isinstance(rom, bytearray) else bytearray(rom)
         if len(rom) < 0x8000:
             raise Exception("Tried to calculate SNES CRC on file too small to be a SNES ROM.")
-        crc = (sum(rom_data[:0x7FDC] + rom_data[0x7FE0:]) + 0x01FE) & 0xFFFF
+        view = memoryview(rom_data)
+        crc = (sum(view[:0x7FDC]) + sum(view[0x7FE0:]) + 0x01FE) & 0xFFFF
+        view.release()
         inv = crc ^ 0xFFFF
         rom_data[0x7FDC:0x7FE0] = [inv & 0xFF, (inv >> 8) & 0xFF, crc & 0xFF, (crc >> 8) & 0xFF]
-        return bytes(rom_data)
+        return rom_data
@@ -7,9 +7,15 @@ import warnings
 import zipimport
 import time
 import dataclasses
-from typing import Dict, List, TypedDict
+import hashlib
+import json
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Type, TypedDict
 
-from Utils import local_path, user_path
+import Utils
+from Utils import cache_path, local_path, user_path
+
+if TYPE_CHECKING:
+    from .AutoWorld import World
 
 local_folder = os.path.dirname(__file__)
 user_folder = user_path("worlds") if user_path() != local_path() else user_path("custom_worlds")
@@ -27,6 +33,8 @@ __all__ = {
     "GamesPackage",
     "DataPackage",
     "failed_world_loads",
+    "load_world",
+    "load_all_worlds",
 }
 
 
@@ -45,6 +53,14 @@ class DataPackage(TypedDict):
     games: Dict[str, GamesPackage]
 
 
+class WorldManifestEntry(TypedDict):
+    signature: List[int]  # newest mtime_ns, total size and file count of the source
+    hash: str
+    failed: bool
+    games: Dict[str, GamesPackage]
+    components: List[Dict[str, Any]]  # launcher components as data, for tools that don't import the world
+
+
 @dataclasses.dataclass(order=True)
 class WorldSource:
     path: str  # typically relative path from this module
@@ -122,15 +138,155 @@ for folder in (folder for folder in (user_folder, local_folder) if folder):
             elif entry.is_file() and entry.name.endswith(".apworld"):
                 world_sources.append(WorldSource(file_name, is_zip=True, relative=relative))
 
-# import all submodules to trigger AutoWorldRegister
+
+def _source_files(world_source: WorldSource) -> List[str]:
+    if world_source.is_zip:
+        return [world_source.resolved_path]
+    files: List[str] = []
+    for root, dirs, names in os.walk(world_source.resolved_path):
+        dirs[:] = sorted(name for name in dirs if name != "__pycache__")
+        files.extend(os.path.join(root, name) for name in sorted(names))
+    return files
+
+
+def _source_signature(files: List[str]) -> List[int]:
+    newest = size = 0
+    for file in files:
+        stat = os.stat(file)
+        newest = max(newest, stat.st_mtime_ns)
+        size += stat.st_size
+    return [newest, size, len(files)]
+
+
+def _source_hash(world_source: WorldSource, files: List[str]) -> str:
+    sha1 = hashlib.sha1()
+    for file in files:
+        sha1.update(os.path.relpath(file, world_source.resolved_path).encode())
+        with open(file, "rb") as f:
+            sha1.update(f.read())
+    return sha1.hexdigest()
+
+
+def _load_source(world_source: WorldSource, signature: List[int], source_hash: str) -> WorldManifestEntry:
+    """Load a world source and record what it registered."""
+    from .AutoWorld import AutoWorldRegister
+    from .LauncherComponents import components
+
+    known_components = {id(component) for component in components}
+    failed = not world_source.load()
+    # games are attributed by the module of their world, as a world source may import another one
+    package = f"worlds.{os.path.basename(world_source.path).rsplit('.', 1)[0]}"
+    return {
+        "signature": signature,
+        "hash": source_hash,
+        "failed": failed,
+        "games": {name: world.get_data_package_data() for name, world in AutoWorldRegister.world_types.items()
+                  if world.__module__ == package or world.__module__.startswith(f"{package}.")},
+        "components": [{"display_name": component.display_name, "script_name": component.script_name,
+                        "frozen_name": component.frozen_name, "cli": component.cli, "icon": component.icon,
+                        "type": component.type.name}
+                       for component in components if id(component) not in known_components],
+    }
+
+
+# bumped when the content of manifest entries changes, so entries written before are not reused
+_manifest_format = 2
+
+
+def _read_manifest() -> Dict[str, WorldManifestEntry]:
+    try:
+        with open(cache_path("world_manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != Utils.__version__ \
+            or manifest.get("format") != _manifest_format:
+        return {}
+    return manifest.get("sources", {})
+
+
+def _write_manifest(sources: Dict[str, WorldManifestEntry]) -> None:
+    path = cache_path("world_manifest.json")
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": Utils.__version__, "format": _manifest_format, "sources": sources}, f,
+                      separators=(",", ":"))
+        os.replace(temp_path, path)
+    except OSError as e:
+        logging.debug(f"Could not write world manifest: {e}")
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+# world sources that were not imported yet, by game, when Utils.lazy_world_loading is set
+_deferred_sources: Dict[str, WorldSource] = {}
+
+
+def load_world(game: str) -> Type["World"]:
+    """Returns the world class for game, importing its world source first if it was deferred."""
+    from .AutoWorld import AutoWorldRegister
+
+    world_source = _deferred_sources.get(game)
+    if world_source:
+        for name, source in tuple(_deferred_sources.items()):
+            if source is world_source:
+                del _deferred_sources[name]
+        world_source.load()
+    return AutoWorldRegister.world_types[game]
+
+
+def load_all_worlds() -> None:
+    """Imports all world sources that were deferred, so AutoWorldRegister.world_types is complete."""
+    while _deferred_sources:
+        load_world(next(iter(_deferred_sources)))
+
+
+# import all submodules to trigger AutoWorldRegister.
+# The manifest records what each source registered, so that with lazy loading only changed sources get imported,
+# and the rest is imported on demand through load_world.
 world_sources.sort()
+_manifest = _read_manifest()
+_manifest_changed = _manifest.keys() != {world_source.path for world_source in world_sources}
+_lazy_data_package: Dict[str, GamesPackage] = {}
 for world_source in world_sources:
-    world_source.load()
+    _files = _source_files(world_source)
+    _signature = _source_signature(_files)
+    _hash: Optional[str] = None
+    _entry: Optional[WorldManifestEntry] = _manifest.get(world_source.path)
+    if _entry and _entry["signature"] != _signature:
+        _hash = _source_hash(world_source, _files)
+        if _entry["hash"] == _hash:
+            # touched, but not changed
+            _entry["signature"] = _signature
+            _manifest_changed = True
+        else:
+            _entry = None
+    if not _entry or _entry["failed"]:
+        _loaded_entry = _load_source(world_source, _signature, _hash or _source_hash(world_source, _files))
+        _manifest_changed |= _loaded_entry != _entry
+        _entry = _manifest[world_source.path] = _loaded_entry
+    elif Utils.lazy_world_loading:
+        for _game in _entry["games"]:
+            _deferred_sources.setdefault(_game, world_source)
+    else:
+        world_source.load()
+    for _game, _package in _entry["games"].items():
+        _lazy_data_package.setdefault(_game, _package)
+
+if _manifest_changed:
+    _write_manifest({world_source.path: _manifest[world_source.path] for world_source in world_sources})
 
 # Build the data package for each game.
 from .AutoWorld import AutoWorldRegister
 
-network_data_package: DataPackage = {
-    "games": {world_name: world.get_data_package_data() for world_name, world in AutoWorldRegister.world_types.items()},
-}
-
+if _deferred_sources:
+    network_data_package: DataPackage = {"games": _lazy_data_package}
+else:
+    network_data_package: DataPackage = {
+        "games": {world_name: world.get_data_package_data()
+                  for world_name, world in AutoWorldRegister.world_types.items()},
+    }
@@ -59,11 +59,11 @@ class LocalRom:
         self.hash = hash
         self.orig_buffer = None
 
-        with open(file, 'rb') as stream:
-            self.buffer = read_snes_rom(stream)
         if patch:
             self.patch_base_rom()
-            self.orig_buffer = self.buffer.copy()
+        else:
+            with open(file, 'rb') as stream:
+                self.buffer = read_snes_rom(stream)
         if vanillaRom:
             with open(vanillaRom, 'rb') as vanillaStream:
                 self.orig_buffer = read_snes_rom(vanillaStream)
@@ -131,23 +131,19 @@ class LocalRom:
         return expected == buffermd5.hexdigest()
 
     def patch_base_rom(self):
-        if os.path.isfile(user_path('basepatch.sfc')):
-            with open(user_path('basepatch.sfc'), 'rb') as stream:
-                buffer = bytearray(stream.read())
-
-            if self.verify(buffer):
-                self.buffer = buffer
-                return
+        # the base patched rom is cached and shared read-only by all LocalRoms as orig_buffer
+        base_rom = Utils.load_cached_rom("A Link to the Past", get_base_rom_path(), RANDOMIZERBASEHASH,
+                                         self.create_base_patched_rom)
+        self.buffer = bytearray(base_rom)
+        self.orig_buffer = base_rom
 
+    def create_base_patched_rom(self) -> bytes:
         with open(local_path("data", "basepatch.bsdiff4"), "rb") as f:
             delta = f.read()
 
         buffer = bsdiff4.patch(get_base_rom_bytes(), delta)
         if self.verify(buffer):
-            self.buffer = bytearray(buffer)
-            with open(user_path('basepatch.sfc'), 'wb') as stream:
-                stream.write(buffer)
-            return
+            return buffer
         raise RuntimeError('Base patch unverified.  Unable to continue.')
 
     def write_crc(self):
@@ -113,6 +113,8 @@ class Factorio(World):
         self.tech_tree_layout_prerequisites = {}
 
     generate_output = generate_mod
+    # only renders and writes the mod files
+    output_process_safe = True
 
     def generate_early(self) -> None:
         # if max < min, then swap max and min
@@ -1,6 +1,7 @@
 import collections
 import logging
 import typing
+import weakref
 
 from BaseClasses import LocationProgressType, MultiWorld, Location, Region, Entrance
 
@@ -14,6 +15,422 @@ else:
     ItemRule = typing.Callable[[object], bool]
 
 
+
+class Rule:
+    """
+    Composable access rule. A rule is called with a CollectionState like any other access rule, but it also knows
+    which items it reads, can be combined with `&` and `|`, and compiles itself into a single flat function.
+    Plain callables can be mixed in, they are kept as opaque leaves.
+    """
+    __slots__ = ("_function",)
+
+    def __and__(self, other: typing.Union["Rule", CollectionRule]) -> "Rule":
+        return And(self, other)
+
+    def __rand__(self, other: CollectionRule) -> "Rule":
+        return And(other, self)
+
+    def __or__(self, other: typing.Union["Rule", CollectionRule]) -> "Rule":
+        return Or(self, other)
+
+    def __ror__(self, other: CollectionRule) -> "Rule":
+        return Or(other, self)
+
+    def __call__(self, state: "BaseClasses.CollectionState") -> bool:
+        return self.function(state)
+
+    def __eq__(self, other: object) -> bool:
+        return type(self) is type(other) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash((type(self), self._key()))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(map(repr, self._key()))})"
+
+    def __reduce__(self) -> typing.Tuple[typing.Any, ...]:
+        # the generated function can't be pickled, so only the rule's arguments are
+        return type(self), self._key()
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        raise NotImplementedError
+
+    def _expression(self, compiler: "_RuleCompiler") -> str:
+        """Returns a python expression evaluating this rule, registering anything it references with the compiler."""
+        raise NotImplementedError
+
+    @property
+    def item_dependencies(self) -> typing.Optional[typing.FrozenSet[typing.Tuple[str, int]]]:
+        """(item name, player) pairs this rule reads, or None if its result may depend on anything else."""
+        raise NotImplementedError
+
+    @property
+    def function(self) -> CollectionRule:
+        """Flat function evaluating this rule, generated on first access. It links back to the rule as `.rule`."""
+        try:
+            return self._function
+        except AttributeError:
+            self._function = _RuleCompiler().compile(self)
+            return self._function
+
+
+class _RuleCompiler:
+    def __init__(self) -> None:
+        self.namespace: typing.Dict[str, typing.Any] = {}
+        self.players: typing.Set[int] = set()
+
+    def constant(self, value: typing.Any) -> str:
+        name = f"_c{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def prog_items(self, player: int) -> str:
+        self.players.add(player)
+        return f"_p{player}"
+
+    def compile(self, rule: Rule) -> CollectionRule:
+        expression = rule._expression(self)
+        lines = ["def access_rule(state):"]
+        if self.players:
+            lines.append("    prog_items = state.prog_items")
+            lines.extend(f"    _p{player} = prog_items[{player}]" for player in sorted(self.players))
+        lines.append(f"    return {expression}")
+        exec("\n".join(lines), self.namespace)
+        function = self.namespace["access_rule"]
+        function.rule = rule
+        return function
+
+
+class Constant(Rule):
+    __slots__ = ("value",)
+
+    def __init__(self, value: bool) -> None:
+        self.value = value
+
+    def _key(self) -> typing.Tuple[bool]:
+        return self.value,
+
+    def _expression(self, compiler: _RuleCompiler) -> str:
+        return repr(self.value)
+
+    @property
+    def item_dependencies(self) -> typing.FrozenSet[typing.Tuple[str, int]]:
+        return frozenset()
+
+
+true_rule = Constant(True)
+false_rule = Constant(False)
+
+
+class Callback(Rule):
+    """Wraps a plain access rule function, so it can take part in composed rules."""
+    __slots__ = ("callback",)
+
+    def __init__(self, callback: CollectionRule) -> None:
+        self.callback = callback
+
+    def _key(self) -> typing.Tuple[CollectionRule]:
+        return self.callback,
+
+    def _expression(self, compiler: _RuleCompiler) -> str:
+        return f"{compiler.constant(self.callback)}(state)"
+
+    @property
+    def item_dependencies(self) -> None:
+        return None
+
+
+class Has(Rule):
+    __slots__ = ("item", "player", "count")
+
+    def __init__(self, item: str, player: int, count: int = 1) -> None:
+        self.item = item
+        self.player = player
+        self.count = count
+
+    def _key(self) -> typing.Tuple[str, int, int]:
+        return self.item, self.player, self.count
+
+    def _expression(self, compiler: _RuleCompiler) -> str:
+        return f"{compiler.prog_items(self.player)}[{self.item!r}] >= {self.count!r}"
+
+    @property
+    def item_dependencies(self) -> typing.FrozenSet[typing.Tuple[str, int]]:
+        return frozenset(((self.item, self.player),))
+
+
+class _ItemsRule(Rule):
+    __slots__ = ("items", "player")
+    # item lists longer than this are looped over instead of being unrolled into the generated expression
+    unroll_limit = 16
+
+    def __init__(self, items: typing.Iterable[str], player: int) -> None:
+        self.items = tuple(dict.fromkeys(items))
+        self.player = player
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.items, self.player
+
+    @property
+    def item_dependencies(self) -> typing.FrozenSet[typing.Tuple[str, int]]:
+        return frozenset((item, self.player) for item in self.items)
+
+
+class HasAll(_ItemsRule):
+    __slots__ = ()
+
+    def _expression(self, compiler: _RuleCompiler) -> str:
+        prog_items = compiler.prog_items(self.player)
+        if len(self.items) > self.unroll_limit:
+            return f"all(map({prog_items}.__getitem__, {compiler.constant(self.items)}))"
+        return "(" + " and ".join(f"{prog_items}[{item!r}] > 0" for item in self.items) + ")"
+
+
+class HasAny(_ItemsRule):
+    __slots__ = ()
+
+    def _expression(self, compiler: _RuleCompiler) -> str:
+        prog_items = compiler.prog_items(self.player)
+        if len(self.items) > self.unroll_limit:
+            return f"any(map({prog_items}.__getitem__, {compiler.constant(self.items)}))"
+        return "(" + " or ".join(f"{prog_items}[{item!r}] > 0" for item in self.items) + ")"
+
+
+class Count(_ItemsRule):
+    """At least `count` items in total out of `items`, see CollectionState.has_from_list."""
+    __slots__ = ("count",)
+
+    def __init__(self, items: typing.Iterable[str], player: int, count: int) -> None:
+        super().__init__(items, player)
+        self.count = count
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.items, self.player, self.count
+
+    def _expression(self, compiler: _RuleCompiler) -> str:
+        prog_items = compiler.prog_items(self.player)
+        if len(self.items) > self.unroll_limit:
+            return f"sum(map({prog_items}.__getitem__, {compiler.constant(self.items)})) >= {self.count!r}"
+        return "(" + " + ".join(f"{prog_items}[{item!r}]" for item in self.items) + f") >= {self.count!r}"
+
+
+class CanReach(Rule):
+    __slots__ = ("spot", "player", "resolution_hint")
+
+    def __init__(self, spot: str, player: int, resolution_hint: str = "Region") -> None:
+        assert resolution_hint in ("Region", "Location", "Entrance"), f"Unknown resolution hint {resolution_hint}"
+        self.spot = spot
+        self.player = player
+        self.resolution_hint = resolution_hint
+
+    def _key(self) -> typing.Tuple[str, int, str]:
+        return self.spot, self.player, self.resolution_hint
+
+    def _expression(self, compiler: _RuleCompiler) -> str:
+        return f"state.can_reach_{self.resolution_hint.lower()}({self.spot!r}, {self.player!r})"
+
+    @property
+    def item_dependencies(self) -> None:
+        return None
+
+
+class _AggregateRule(Rule):
+    __slots__ = ("rules",)
+    rules: typing.Tuple[Rule, ...]
+    # value that is dropped from the operands, and value that short-circuits the whole rule
+    identity: bool
+    operator: str
+
+    def __new__(cls, *rules: typing.Union[Rule, CollectionRule]) -> Rule:
+        operands: typing.Dict[Rule, None] = {}
+        for rule in rules:
+            if not isinstance(rule, Rule):
+                rule = getattr(rule, "rule", None) or Callback(rule)
+            if type(rule) is cls:
+                operands.update(dict.fromkeys(rule.rules))
+            elif isinstance(rule, Constant):
+                if rule.value is not cls.identity:
+                    return rule
+            else:
+                operands[rule] = None
+        simplified = cls._merge(list(operands))
+        if not simplified:
+            return true_rule if cls.identity else false_rule
+        if len(simplified) == 1:
+            return simplified[0]
+        self = super().__new__(cls)
+        self.rules = tuple(simplified)
+        return self
+
+    @classmethod
+    def _merge(cls, rules: typing.List[Rule]) -> typing.List[Rule]:
+        """Combines operands that read the same player's items into one rule, keeping the first one's position."""
+        return rules
+
+    def _key(self) -> typing.Tuple[Rule, ...]:
+        return self.rules
+
+    def _expression(self, compiler: _RuleCompiler) -> str:
+        return "(" + f" {self.operator} ".join(rule._expression(compiler) for rule in self.rules) + ")"
+
+    @property
+    def item_dependencies(self) -> typing.Optional[typing.FrozenSet[typing.Tuple[str, int]]]:
+        dependencies: typing.Set[typing.Tuple[str, int]] = set()
+        for rule in self.rules:
+            rule_dependencies = rule.item_dependencies
+            if rule_dependencies is None:
+                return None
+            dependencies |= rule_dependencies
+        return frozenset(dependencies)
+
+
+class And(_AggregateRule):
+    __slots__ = ()
+    identity = True
+    operator = "and"
+
+    @classmethod
+    def _merge(cls, rules: typing.List[Rule]) -> typing.List[Rule]:
+        merged: typing.List[typing.Union[Rule, int]] = []
+        required: typing.Dict[int, typing.Dict[str, int]] = {}
+        for rule in rules:
+            if isinstance(rule, Has):
+                items = {rule.item: rule.count}
+            elif isinstance(rule, HasAll):
+                items = dict.fromkeys(rule.items, 1)
+            else:
+                merged.append(rule)
+                continue
+            if rule.player not in required:
+                merged.append(rule.player)
+                required[rule.player] = items
+            else:
+                player_required = required[rule.player]
+                for item, count in items.items():
+                    player_required[item] = max(count, player_required.get(item, 0))
+        result: typing.List[Rule] = []
+        for rule in merged:
+            if isinstance(rule, Rule):
+                result.append(rule)
+                continue
+            items = required[rule]
+            if len(items) > 1 and all(count == 1 for count in items.values()):
+                result.append(HasAll(items, rule))
+            else:
+                result.extend(Has(item, rule, count) for item, count in items.items())
+        return result
+
+
+class Or(_AggregateRule):
+    __slots__ = ()
+    identity = False
+    operator = "or"
+
+    @classmethod
+    def _merge(cls, rules: typing.List[Rule]) -> typing.List[Rule]:
+        merged: typing.List[Rule] = []
+        alternatives: typing.Dict[int, typing.List[str]] = {}
+        positions: typing.Dict[int, int] = {}
+        for rule in rules:
+            if isinstance(rule, Has) and rule.count == 1:
+                items = [rule.item]
+            elif isinstance(rule, HasAny):
+                items = list(rule.items)
+            else:
+                merged.append(rule)
+                continue
+            if rule.player not in alternatives:
+                positions[rule.player] = len(merged)
+                merged.append(rule)
+                alternatives[rule.player] = items
+            else:
+                alternatives[rule.player].extend(items)
+        for player, items in alternatives.items():
+            items = list(dict.fromkeys(items))
+            merged[positions[player]] = Has(items[0], player) if len(items) == 1 else HasAny(items, player)
+        return merged
+
+
+class ItemFilter:
+    """
+    Item rule made of item names denied per player, which are checked with a single set lookup, and opaque item
+    rules that have to pass as well. Filters are immutable, denying more returns a new filter, so locations can share
+    one. Equal filters are the same object and share their function, which links back to the filter as `.item_filter`.
+    """
+    __slots__ = ("denied", "rules", "_function", "__weakref__")
+    denied: typing.Dict[int, typing.FrozenSet[str]]
+    rules: typing.Tuple[ItemRule, ...]
+
+    def __new__(cls, denied: typing.Mapping[int, typing.Iterable[str]] = {},
+                rules: typing.Iterable[ItemRule] = ()) -> "ItemFilter":
+        denied = {player: frozenset(names) for player, names in denied.items() if names}
+        rules = tuple(rules)
+        # rules are keyed by id, the filter keeps them alive while the cache must not keep a world alive through them
+        key = frozenset(denied.items()), tuple(map(id, rules))
+        item_filter = _item_filters.get(key)
+        if item_filter is None:
+            item_filter = super().__new__(cls)
+            item_filter.denied = denied
+            item_filter.rules = rules
+            _item_filters[key] = item_filter
+        return item_filter
+
+    def deny(self, denied: typing.Mapping[int, typing.Iterable[str]]) -> "ItemFilter":
+        """Returns a filter that also denies the given item names of each player."""
+        merged = dict(self.denied)
+        for player, names in denied.items():
+            merged[player] = merged[player].union(names) if player in merged else names
+        return ItemFilter(merged, self.rules)
+
+    def add(self, rule: ItemRule) -> "ItemFilter":
+        """Returns a filter that also requires rule to pass, checking it before the previous rules."""
+        return ItemFilter(self.denied, (rule, *self.rules))
+
+    def __call__(self, item: "BaseClasses.Item") -> bool:
+        return self.function(item)
+
+    def __reduce__(self) -> typing.Tuple[typing.Any, ...]:
+        # unpickled filters are interned again
+        return ItemFilter, (self.denied, self.rules)
+
+    def __repr__(self) -> str:
+        return f"ItemFilter({self.denied!r}, {self.rules!r})"
+
+    @property
+    def function(self) -> ItemRule:
+        """Function evaluating this filter, created on first access."""
+        try:
+            return self._function
+        except AttributeError:
+            # filters are built once per forbidden item, so their function is a cheap closure instead of being
+            # generated like Rule functions
+            denied = self.denied.get
+            rules = self.rules
+            if not rules:
+                def item_rule(item: "BaseClasses.Item") -> bool:
+                    return item.name not in denied(item.player, ())
+            elif len(rules) == 1:
+                rule = rules[0]
+
+                def item_rule(item: "BaseClasses.Item") -> bool:
+                    return item.name not in denied(item.player, ()) and rule(item)
+            else:
+                def item_rule(item: "BaseClasses.Item") -> bool:
+                    if item.name in denied(item.player, ()):
+                        return False
+                    for rule in rules:
+                        if not rule(item):
+                            return False
+                    return True
+            item_rule.item_filter = self
+            self._function = item_rule
+            return item_rule
+
+
+# equal filters are the same object, they are dropped once no location uses them anymore
+_item_filters: "weakref.WeakValueDictionary[typing.Any, ItemFilter]" = weakref.WeakValueDictionary()
+
+
 def locality_needed(multiworld: MultiWorld) -> bool:
     for player in multiworld.player_ids:
         if multiworld.worlds[player].options.local_items.value:
@@ -63,23 +480,13 @@ def locality_rules(multiworld: MultiWorld):
                     if sending_player in receiving_group["players"]:
                         forbid(sending_player, receiving_group_id, receiving_group["non_local_items"])
 
-        # create fewer lambda's to save memory and cache misses
+        # create fewer filters to save memory and cache misses
         func_cache = {}
         for location in multiworld.get_locations():
-            if (location.player, location.item_rule) in func_cache:
-                location.item_rule = func_cache[location.player, location.item_rule]
-            # empty rule that just returns True, overwrite
-            elif location.item_rule is location.__class__.item_rule:
-                func_cache[location.player, location.item_rule] = location.item_rule = \
-                    lambda i, sending_blockers = forbid_data[location.player], \
-                                            old_rule = location.item_rule: \
-                    i.name not in sending_blockers[i.player]
-            # special rule, needs to also be fulfilled.
-            else:
-                func_cache[location.player, location.item_rule] = location.item_rule = \
-                    lambda i, sending_blockers = forbid_data[location.player], \
-                                            old_rule = location.item_rule: \
-                    i.name not in sending_blockers[i.player] and old_rule(i)
+            if (location.player, location.item_rule) not in func_cache:
+                func_cache[location.player, location.item_rule] = \
+                    _get_item_filter(location).deny(forbid_data[location.player]).function
+            location.item_rule = func_cache[location.player, location.item_rule]
 
 
 def exclusion_rules(multiworld: MultiWorld, player: int, exclude_locations: typing.Set[str]) -> None:
@@ -97,14 +504,22 @@ def exclusion_rules(multiworld: MultiWorld, player: int, exclude_locations: typi
 
 
 def set_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"], rule: CollectionRule):
-    spot.access_rule = rule
+    spot.access_rule = rule.function if isinstance(rule, Rule) else rule
+
+
+def get_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"]) -> typing.Optional[Rule]:
+    """Returns the Rule object behind spot's access rule, or None if it is a plain function."""
+    return getattr(spot.access_rule, "rule", None)
 
 
 def add_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"], rule: CollectionRule, combine="and"):
     old_rule = spot.access_rule
     # empty rule, replace instead of add
     if old_rule is spot.__class__.access_rule:
-        spot.access_rule = rule if combine == "and" else old_rule
+        set_rule(spot, rule if combine == "and" else old_rule)
+    elif isinstance(rule, Rule) or hasattr(old_rule, "rule"):
+        # composed rules are merged and recompiled instead of nesting closures
+        spot.access_rule = (And(rule, old_rule) if combine == "and" else Or(rule, old_rule)).function
     else:
         if combine == "and":
             spot.access_rule = lambda state: rule(state) and old_rule(state)
@@ -112,24 +527,29 @@ def add_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"],
             spot.access_rule = lambda state: rule(state) or old_rule(state)
 
 
+def get_item_filter(location: "BaseClasses.Location") -> typing.Optional[ItemFilter]:
+    """Returns the ItemFilter behind location's item rule, or None if it is a plain function."""
+    return getattr(location.item_rule, "item_filter", None)
+
+
+def _get_item_filter(location: "BaseClasses.Location") -> ItemFilter:
+    """Returns the ItemFilter behind location's item rule, wrapping the rule into one if it is a plain function."""
+    if location.item_rule is location.__class__.item_rule:
+        return ItemFilter()
+    return get_item_filter(location) or ItemFilter(rules=(location.item_rule,))
+
+
 def forbid_item(location: "BaseClasses.Location", item: str, player: int):
-    old_rule = location.item_rule
-    # empty rule
-    if old_rule is location.__class__.item_rule:
-        location.item_rule = lambda i: i.name != item or i.player != player
-    else:
-        location.item_rule = lambda i: (i.name != item or i.player != player) and old_rule(i)
+    location.item_rule = _get_item_filter(location).deny({player: (item,)}).function
 
 
 def forbid_items_for_player(location: "BaseClasses.Location", items: typing.Set[str], player: int):
-    old_rule = location.item_rule
-    location.item_rule = lambda i: (i.player != player or i.name not in items) and old_rule(i)
+    location.item_rule = _get_item_filter(location).deny({player: items}).function
 
 
 def forbid_items(location: "BaseClasses.Location", items: typing.Set[str]):
     """unused, but kept as a debugging tool."""
-    old_rule = location.item_rule
-    location.item_rule = lambda i: i.name not in items and old_rule(i)
+    location.item_rule = _get_item_filter(location).add(lambda i: i.name not in items).function
 
 
 def add_item_rule(location: "BaseClasses.Location", rule: ItemRule, combine: str = "and"):
@@ -139,7 +559,7 @@ def add_item_rule(location: "BaseClasses.Location", rule: ItemRule, combine: str
         location.item_rule = rule if combine == "and" else old_rule
     else:
         if combine == "and":
-            location.item_rule = lambda item: rule(item) and old_rule(item)
+            location.item_rule = _get_item_filter(location).add(rule).function
         else:
             location.item_rule = lambda item: rule(item) or old_rule(item)
 
@@ -42,6 +42,8 @@ class KH2World(World):
     """
     game = "Kingdom Hearts 2"
     web = KingdomHearts2Web()
+    # the attributes patch_kh2 sets are only used for the patch itself
+    output_process_safe = True
 
     required_client_version = (0, 4, 4)
     options_dataclass = KingdomHearts2Options
@@ -6,6 +6,10 @@ class OOTEntrance(Entrance):
     def __init__(self, player, world, name='', parent=None): 
         super(OOTEntrance, self).__init__(player, name, parent)
         self.multiworld = world
+        # position in the per-age blocked connections flags
+        entrances_by_index = world.worlds[player].entrances_by_index
+        self.index = len(entrances_by_index)
+        entrances_by_index.append(self)
         self.access_rules = []
         self.reverse = None
         self.replaces = None
@@ -857,29 +857,29 @@ def validate_world(ootworld, entrance_placed, locations_to_ensure_reachable, all
         if not any(region for region in valid_starting_regions if none_state.can_reach(region, 'Region', player)):
             raise EntranceShuffleError('Invalid starting area')
 
-        if not (any(region for region in time_travel_state.child_reachable_regions[player] if region.time_passes) and
-                any(region for region in time_travel_state.adult_reachable_regions[player] if region.time_passes)):
+        if not (any(region for region in time_travel_state._oot_reachable_regions_as_age(player, 'child') if region.time_passes) and
+                any(region for region in time_travel_state._oot_reachable_regions_as_age(player, 'adult') if region.time_passes)):
             raise EntranceShuffleError('Time passing is not guaranteed as both ages')
 
-        if ootworld.starting_age == 'child' and (world.get_region('Temple of Time', player) not in time_travel_state.adult_reachable_regions[player]):
+        if ootworld.starting_age == 'child' and not time_travel_state._oot_reached_as_age(world.get_region('Temple of Time', player), 'adult'):
             raise EntranceShuffleError('Path to ToT as adult not guaranteed')
-        if ootworld.starting_age == 'adult' and (world.get_region('Temple of Time', player) not in time_travel_state.child_reachable_regions[player]):
+        if ootworld.starting_age == 'adult' and not time_travel_state._oot_reached_as_age(world.get_region('Temple of Time', player), 'child'):
             raise EntranceShuffleError('Path to ToT as child not guaranteed')
 
     if (ootworld.shuffle_interior_entrances or ootworld.shuffle_overworld_entrances) and \
         (entrance_placed == None or entrance_placed.type in ['Interior', 'SpecialInterior', 'Overworld', 'Spawn', 'WarpSong', 'OwlDrop']):
         # Ensure big poe shop is always reachable as adult
-        if world.get_region('Market Guard House', player) not in time_travel_state.adult_reachable_regions[player]:
+        if not time_travel_state._oot_reached_as_age(world.get_region('Market Guard House', player), 'adult'):
             raise EntranceShuffleError('Big Poe Shop access not guaranteed as adult')
         if ootworld.shopsanity == 'off':
             # Ensure that Goron and Zora shops are accessible as adult
-            if world.get_region('GC Shop', player) not in all_state.adult_reachable_regions[player]:
+            if not all_state._oot_reached_as_age(world.get_region('GC Shop', player), 'adult'):
                 raise EntranceShuffleError('Goron City Shop not accessible as adult')
-            if world.get_region('ZD Shop', player) not in all_state.adult_reachable_regions[player]:
+            if not all_state._oot_reached_as_age(world.get_region('ZD Shop', player), 'adult'):
                 raise EntranceShuffleError('Zora\'s Domain Shop not accessible as adult')
         if ootworld.open_forest == 'closed':
             # Ensure that Kokiri Shop is reachable as child with no items
-            if world.get_region('KF Kokiri Shop', player) not in none_state.child_reachable_regions[player]:
+            if not none_state._oot_reached_as_age(world.get_region('KF Kokiri Shop', player), 'child'):
                 raise EntranceShuffleError('Kokiri Forest Shop not accessible as child in closed forest')
 
 
@@ -29,11 +29,23 @@ class TimeOfDay(object):
 
 
 
+def indexed_objects(flags, objects):
+    # yields the regions or entrances set in a reachability bytearray, in index order
+    index = flags.find(1)
+    while index != -1:
+        yield objects[index]
+        index = flags.find(1, index + 1)
+
+
 class OOTRegion(Region):
     game: str = "Ocarina of Time"
 
     def __init__(self, name: str, player: int, multiworld: MultiWorld):
         super(OOTRegion, self).__init__(name, player, multiworld)
+        # position in the per-age reachable regions flags
+        regions_by_index = multiworld.worlds[player].regions_by_index
+        self.index = len(regions_by_index)
+        regions_by_index.append(self)
         self._oot_hint = None
         self.alt_hint = None
         self.price = None
@@ -69,11 +81,12 @@ class OOTRegion(Region):
             state._oot_update_age_reachable_regions(self.player)
             state.age[self.player] = stored_age
         if state.age[self.player] == 'child': 
-            return self in state.child_reachable_regions[self.player]
+            return state.child_reachable_regions[self.player][self.index] == 1
         elif state.age[self.player] == 'adult': 
-            return self in state.adult_reachable_regions[self.player]
+            return state.adult_reachable_regions[self.player][self.index] == 1
         else: # we don't care about age
-            return self in state.child_reachable_regions[self.player] or self in state.adult_reachable_regions[self.player]
+            return state.child_reachable_regions[self.player][self.index] == 1 or \
+                state.adult_reachable_regions[self.player][self.index] == 1
 
     def set_hint_data(self, hint):
         if self.dungeon:
@@ -6,7 +6,7 @@ import subprocess
 import copy
 import threading
 from .Utils import subprocess_args, data_path, get_version_bytes, __version__
-from Utils import user_path
+from Utils import load_cached_rom, user_path
 from .ntype import BigStream
 from .crc import calculate_crc
 
@@ -41,24 +41,21 @@ class Rom(BigStream):
             if file == '':
                 # if not specified, try to read from the previously decompressed rom
                 file = decomp_file
-                try:
-                    self.read_rom(file)
-                except FileNotFoundError:
+                if not os.path.exists(file):
                     # could not find the decompressed rom either
                     raise FileNotFoundError('Must specify path to base ROM')
-            else:
-                self.read_rom(file)
-        else:
-            self.read_rom(file)
-
-        # decompress rom, or check if it's already decompressed
-        self.decompress_rom_file(file, decomp_file, force_use)
+        if not os.path.exists(file):
+            raise FileNotFoundError('Invalid path to Base ROM: "' + file + '"')
 
-        # Add file to maximum size
-        self.buffer.extend(bytearray([0x00] * (0x4000000 - len(self.buffer))))
+        # the decompressed, full size rom is cached and shared read-only by every Rom made from the same file
+        base_rom = load_cached_rom("Ocarina of Time", file, "decompressed",
+                                   lambda: self.decompress_rom(file, decomp_file, force_use))
+        self.buffer = bytearray(base_rom)
         with double_cache_prevention:
             if not self.original:
-                Rom.original = self.copy()
+                original = Rom()
+                original.buffer = base_rom
+                Rom.original = original
 
         # Add version number to header.
         self.write_bytes(0x35, get_version_bytes(__version__))
@@ -66,12 +63,20 @@ class Rom(BigStream):
 
     def copy(self):
         new_rom = Rom()
-        new_rom.buffer = copy.copy(self.buffer)
+        new_rom.buffer = bytearray(self.buffer)
         new_rom.changed_address = copy.copy(self.changed_address)
         new_rom.changed_dma = copy.copy(self.changed_dma)
         new_rom.force_patch = copy.copy(self.force_patch)
         return new_rom
 
+    def decompress_rom(self, file, decomp_file, skip_crc_check):
+        self.read_rom(file)
+        # decompress rom, or check if it's already decompressed
+        self.decompress_rom_file(file, decomp_file, skip_crc_check)
+        # Add file to maximum size
+        self.buffer.extend(bytes(0x4000000 - len(self.buffer)))
+        return self.buffer
+
     def decompress_rom_file(self, file, decomp_file, skip_crc_check):
         validCRC = [
             [0xEC, 0x70, 0x11, 0xB7, 0x76, 0x16, 0xD7, 0x2B],  # Compressed
@@ -124,7 +129,7 @@ class Rom(BigStream):
         self.changed_address.update(zip(range(address, address + len(values)), values))
 
     def restore(self):
-        self.buffer = copy.copy(self.original.buffer)
+        self.buffer = bytearray(self.original.buffer)
         self.changed_address = {}
         self.changed_dma = {}
         self.force_patch = []
@@ -1,8 +1,16 @@
 import ast
 from collections import defaultdict
+from importlib.util import MAGIC_NUMBER
 from inspect import signature, _ParameterKind
+import hashlib
+import json
 import logging
+import marshal
+import os
+import pkgutil
 import re
+import threading
+import types
 
 from .Items import item_table
 from .Location import OOTLocation
@@ -10,6 +18,7 @@ from .Regions import TimeOfDay, OOTRegion
 from BaseClasses import CollectionState as State
 from .Utils import data_path, read_json
 
+from Utils import cache_path
 from worlds.generic.Rules import set_rule
 
 
@@ -33,8 +42,21 @@ allowed_globals = {'TimeOfDay': TimeOfDay}
 rule_aliases = {}
 nonaliases = set()
 
+# Parsed rules, shared by all players and persisted between generations.
+# rule string -> [(dependencies, rule ast dump, events, code)]
+# A parse only depends on the rule string, the world settings and current spot it looked at (its dependencies)
+# and static data, so it can be reused whenever those dependencies match again.
+# The generated code never embeds a player, it is read from the rule's keyword defaults instead.
+parsed_rules = {}
+# rule ast dump -> code of the rule lambda
+compiled_rules = {}
+rule_cache_file = None
+rule_cache_dirty = False
+rule_cache_lock = threading.Lock()
+
 def load_aliases():
     j = read_json(data_path('LogicHelpers.json'))
+    load_rule_cache(j)
     for s, repl in j.items():
         if '(' in s:
             rule, args = s[:-1].split('(', 1)
@@ -46,6 +68,50 @@ def load_aliases():
     nonaliases = escaped_items.keys() - rule_aliases.keys()
 
 
+def get_rule_cache_file(aliases):
+    # anything that changes how a rule string is parsed has to change the cache file
+    key = hashlib.sha1(MAGIC_NUMBER)
+    key.update(json.dumps(aliases, sort_keys=True).encode())
+    key.update(pkgutil.get_data(__name__, 'RuleParser.py'))
+    key.update(pkgutil.get_data(__name__, 'Items.py'))
+    key.update(' '.join(sorted(State.__dict__)).encode())
+    return cache_path('oot', f'rules_{key.hexdigest()}.marshal')
+
+
+def load_rule_cache(aliases):
+    global rule_cache_file
+    rule_cache_file = get_rule_cache_file(aliases)
+    try:
+        with open(rule_cache_file, 'rb') as f:
+            cached_rules = marshal.load(f)
+    except FileNotFoundError:
+        return
+    except Exception as e:
+        logging.getLogger('').warning('Could not load OoT rule cache %s: %s', rule_cache_file, e)
+        return
+    for rule_string, entries in cached_rules.items():
+        parsed_rules.setdefault(rule_string, []).extend(entries)
+        for _, rule_str, _, code in entries:
+            compiled_rules[rule_str] = code
+
+
+def save_rule_cache():
+    global rule_cache_dirty
+    with rule_cache_lock:
+        if not rule_cache_dirty or not rule_cache_file:
+            return
+        os.makedirs(os.path.dirname(rule_cache_file), exist_ok=True)
+        temp_file = f'{rule_cache_file}.{os.getpid()}.tmp'
+        try:
+            with open(temp_file, 'wb') as f:
+                marshal.dump(parsed_rules, f)
+            os.replace(temp_file, rule_cache_file)
+        except OSError as e:
+            logging.getLogger('').warning('Could not save OoT rule cache %s: %s', rule_cache_file, e)
+        else:
+            rule_cache_dirty = False
+
+
 def isliteral(expr):
     return isinstance(expr, (ast.Num, ast.Str, ast.Bytes, ast.NameConstant))
 
@@ -67,6 +133,61 @@ class Rule_AST_Transformer(ast.NodeTransformer):
         self.rule_cache = {}
         self.kwarg_defaults = kwarg_defaults.copy()  # otherwise this gets contaminated between players
         self.kwarg_defaults['player'] = self.player
+        # what the current parse looked at, None if the current parse can't be reused
+        self.dependencies = None
+        self.new_events = set()
+
+
+    # Dependency tracking for parsed_rules. Everything a parse reads from the world or the current spot
+    # has to go through these, so the result is only reused when they would give the same answers.
+    def has_setting(self, name):
+        present = name in self.multiworld.__dict__
+        if self.dependencies is not None:
+            self.dependencies.append(('has', name, present))
+        return present
+
+    def get_setting(self, name):
+        value = getattr(self.multiworld, name)
+        if self.dependencies is not None:
+            self.dependencies.append(('repr', name, repr(value)))
+        return value
+
+    def current_region_name(self):
+        r = self.current_spot if type(self.current_spot) == OOTRegion else self.current_spot.parent_region
+        if self.dependencies is not None:
+            self.dependencies.append(('region', '', r.name))
+        return r.name
+
+    def current_spot_type(self):
+        spot_type = self.current_spot.type
+        if self.dependencies is not None:
+            self.dependencies.append(('type', '', spot_type))
+        return spot_type
+
+    def dependencies_match(self, dependencies):
+        settings = self.multiworld.__dict__
+        for kind, name, expected in dependencies:
+            if kind == 'has':
+                if (name in settings) != expected:
+                    return False
+            elif kind == 'repr':
+                if not hasattr(self.multiworld, name) or repr(getattr(self.multiworld, name)) != expected:
+                    return False
+            elif kind == 'region':
+                spot = self.current_spot
+                if spot is None:
+                    return False
+                r = spot if type(spot) == OOTRegion else spot.parent_region
+                if r.name != expected:
+                    return False
+            elif kind == 'type':
+                if self.current_spot is None or self.current_spot.type != expected:
+                    return False
+        return True
+
+    def add_event(self, event):
+        self.events.add(event)
+        self.new_events.add(event)
 
 
     def visit_Name(self, node):
@@ -84,23 +205,23 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                     value=ast.Name(id='state', ctx=ast.Load()),
                     attr='has',
                     ctx=ast.Load()),
-                args=[ast.Str(escaped_items[node.id]), ast.Constant(self.player)],
+                args=[ast.Str(escaped_items[node.id]), ast.Name(id='player', ctx=ast.Load())],
                 keywords=[])
-        elif node.id in self.multiworld.__dict__:
+        elif self.has_setting(node.id):
             # Settings are constant
-            return ast.parse('%r' % self.multiworld.__dict__[node.id], mode='eval').body
+            return ast.parse('%r' % self.get_setting(node.id), mode='eval').body
         elif node.id in State.__dict__:
             return self.make_call(node, node.id, [], [])
         elif node.id in self.kwarg_defaults or node.id in allowed_globals:
             return node
         elif event_name.match(node.id):
-            self.events.add(node.id.replace('_', ' '))
+            self.add_event(node.id.replace('_', ' '))
             return ast.Call(
                 func=ast.Attribute(
                     value=ast.Name(id='state', ctx=ast.Load()),
                     attr='has',
                     ctx=ast.Load()),
-                args=[ast.Str(node.id.replace('_', ' ')), ast.Constant(self.player)],
+                args=[ast.Str(node.id.replace('_', ' ')), ast.Name(id='player', ctx=ast.Load())],
                 keywords=[])
         else:
             raise Exception('Parse Error: invalid node name %s' % node.id, self.current_spot.name, ast.dump(node, False))
@@ -111,7 +232,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                 value=ast.Name(id='state', ctx=ast.Load()),
                 attr='has',
                 ctx=ast.Load()),
-            args=[ast.Str(node.s), ast.Constant(self.player)],
+            args=[ast.Str(node.s), ast.Name(id='player', ctx=ast.Load())],
             keywords=[])
 
     # python 3.8 compatibility: ast walking now uses visit_Constant for Constant subclasses
@@ -137,20 +258,20 @@ class Rule_AST_Transformer(ast.NodeTransformer):
 
         if isinstance(count, ast.Name):
             # Must be a settings constant
-            count = ast.parse('%r' % self.multiworld.__dict__[count.id], mode='eval').body
+            count = ast.parse('%r' % self.get_setting(count.id), mode='eval').body
 
         if iname in escaped_items:
             iname = escaped_items[iname]
 
         if iname not in item_table:
-            self.events.add(iname)
+            self.add_event(iname)
 
         return ast.Call(
             func=ast.Attribute(
                 value=ast.Name(id='state', ctx=ast.Load()),
                 attr='has',
                 ctx=ast.Load()),
-            args=[ast.Str(iname), ast.Constant(self.player), count],
+            args=[ast.Str(iname), ast.Name(id='player', ctx=ast.Load()), count],
             keywords=[])
 
 
@@ -182,7 +303,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
         new_args = []
         for child in node.args:
             if isinstance(child, ast.Name):
-                if child.id in self.multiworld.__dict__:
+                if self.has_setting(child.id):
                     # child = ast.Attribute(
                     #     value=ast.Attribute(
                     #         value=ast.Name(id='state', ctx=ast.Load()),
@@ -190,7 +311,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                     #         ctx=ast.Load()),
                     #     attr=child.id,
                     #     ctx=ast.Load())
-                    child = ast.Constant(getattr(self.multiworld, child.id))
+                    child = ast.Constant(self.get_setting(child.id))
                 elif child.id in rule_aliases:
                     child = self.visit(child)
                 elif child.id in escaped_items:
@@ -221,7 +342,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                                 ctx=ast.Load()),
                             attr='worlds',
                             ctx=ast.Load()),
-                        slice=ast.Index(value=ast.Constant(self.player)),
+                        slice=ast.Index(value=ast.Name(id='player', ctx=ast.Load())),
                         ctx=ast.Load()),
                     attr=node.value.id,
                     ctx=ast.Load()),
@@ -242,7 +363,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
         # Fast check for json can_use
         if (len(node.ops) == 1 and isinstance(node.ops[0], ast.Eq)
                 and isinstance(node.left, ast.Name) and isinstance(node.comparators[0], ast.Name)
-                and node.left.id not in self.multiworld.__dict__ and node.comparators[0].id not in self.multiworld.__dict__):
+                and not self.has_setting(node.left.id) and not self.has_setting(node.comparators[0].id)):
             return ast.NameConstant(node.left.id == node.comparators[0].id)
 
         node.left = escape_or_string(node.left)
@@ -325,7 +446,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                     value=ast.Name(id='state', ctx=ast.Load()),
                     attr='has_any' if early_return else 'has_all',
                     ctx=ast.Load()),
-                args=[ast.Tuple(elts=[ast.Str(i) for i in items], ctx=ast.Load()), ast.Constant(self.player)],
+                args=[ast.Tuple(elts=[ast.Str(i) for i in items], ctx=ast.Load()), ast.Name(id='player', ctx=ast.Load())],
                 keywords=[])] + new_values
         else:
             node.values = new_values
@@ -341,8 +462,8 @@ class Rule_AST_Transformer(ast.NodeTransformer):
         if not hasattr(State, name):
             raise Exception('Parse Error: No such function State.%s' % name, self.current_spot.name, ast.dump(node, False))
 
-        for (k, v) in self.kwarg_defaults.items():
-            keywords.append(ast.keyword(arg=f'{k}', value=ast.Constant(v)))
+        for k in self.kwarg_defaults.keys():
+            keywords.append(ast.keyword(arg=f'{k}', value=ast.Name(id=k, ctx=ast.Load())))
 
         return ast.Call(
             func=ast.Attribute(
@@ -354,6 +475,8 @@ class Rule_AST_Transformer(ast.NodeTransformer):
 
 
     def replace_subrule(self, target, node):
+        # subrules create per-player events, so this parse can't be reused
+        self.dependencies = None
         rule = ast.dump(node, False)
         if rule in self.replaced_rules[target]:
             return self.replaced_rules[target][rule]
@@ -367,7 +490,7 @@ class Rule_AST_Transformer(ast.NodeTransformer):
                 value=ast.Name(id='state', ctx=ast.Load()),
                 attr='has',
                 ctx=ast.Load()),
-            args=[ast.Str(subrule_name), ast.Constant(self.player)],
+            args=[ast.Str(subrule_name), ast.Name(id='player', ctx=ast.Load())],
             keywords=[])
         # Cache the subrule for any others in this region
         # (and reserve the item name in the process)
@@ -403,28 +526,38 @@ class Rule_AST_Transformer(ast.NodeTransformer):
     def make_access_rule(self, body):
         rule_str = ast.dump(body, False)
         if rule_str not in self.rule_cache:
-            # requires consistent iteration on dicts
-            kwargs = [ast.arg(arg=k) for k in self.kwarg_defaults.keys()]
-            kwd = list(map(ast.Constant, self.kwarg_defaults.values()))
-            try:
-                self.rule_cache[rule_str] = eval(compile(
-                    ast.fix_missing_locations(
-                        ast.Expression(ast.Lambda(
-                            args=ast.arguments(
-                                posonlyargs=[],
-                                args=[ast.arg(arg='state')],
-                                defaults=[],
-                                kwonlyargs=kwargs,
-                                kw_defaults=kwd),
-                            body=body))),
-                    '<string>', 'eval'),
-                    # globals/locals. if undefined, everything in the namespace *now* would be allowed
-                    allowed_globals)
-            except TypeError as e:
-                raise Exception('Parse Error: %s' % e, self.current_spot.name, ast.dump(body, False))
+            code = compiled_rules.get(rule_str)
+            if code is None:
+                # requires consistent iteration on dicts
+                kwargs = [ast.arg(arg=k) for k in self.kwarg_defaults.keys()]
+                try:
+                    expression = eval(compile(
+                        ast.fix_missing_locations(
+                            ast.Expression(ast.Lambda(
+                                args=ast.arguments(
+                                    posonlyargs=[],
+                                    args=[ast.arg(arg='state')],
+                                    defaults=[],
+                                    kwonlyargs=kwargs,
+                                    kw_defaults=[None] * len(kwargs)),
+                                body=body))),
+                        '<string>', 'eval'),
+                        # globals/locals. if undefined, everything in the namespace *now* would be allowed
+                        allowed_globals)
+                except TypeError as e:
+                    raise Exception('Parse Error: %s' % e, self.current_spot.name, ast.dump(body, False))
+                code = compiled_rules[rule_str] = expression.__code__
+            self.rule_cache[rule_str] = self.make_rule_function(code)
         return self.rule_cache[rule_str]
 
 
+    def make_rule_function(self, code):
+        # the same code is shared by all players, only the keyword defaults (player etc.) differ
+        rule = types.FunctionType(code, allowed_globals)
+        rule.__kwdefaults__ = self.kwarg_defaults.copy()
+        return rule
+
+
     ## Handlers for specific internal functions used in the json logic.
 
     # at(region_name, rule)
@@ -448,38 +581,56 @@ class Rule_AST_Transformer(ast.NodeTransformer):
     ## Handlers for compile-time optimizations (former State functions)
 
     def at_day(self, node):
-        if self.multiworld.ensure_tod_access:
+        if self.get_setting('ensure_tod_access'):
             # tod has DAY or (tod == NONE and (ss or find a path from a provider))
             # parsing is better than constructing this expression by hand
-            r = self.current_spot if type(self.current_spot) == OOTRegion else self.current_spot.parent_region
-            return ast.parse(f"(state.has('Ocarina', player) and state.has('Suns Song', player)) or state._oot_reach_at_time('{r.name}', TimeOfDay.DAY, [], player)", mode='eval').body
+            return ast.parse(f"(state.has('Ocarina', player) and state.has('Suns Song', player)) or state._oot_reach_at_time('{self.current_region_name()}', TimeOfDay.DAY, [], player)", mode='eval').body
         return ast.NameConstant(True)
 
     def at_dampe_time(self, node):
-        if self.multiworld.ensure_tod_access:
+        if self.get_setting('ensure_tod_access'):
             # tod has DAMPE or (tod == NONE and (find a path from a provider))
             # parsing is better than constructing this expression by hand
-            r = self.current_spot if type(self.current_spot) == OOTRegion else self.current_spot.parent_region
-            return ast.parse(f"state._oot_reach_at_time('{r.name}', TimeOfDay.DAMPE, [], player)", mode='eval').body
+            return ast.parse(f"state._oot_reach_at_time('{self.current_region_name()}', TimeOfDay.DAMPE, [], player)", mode='eval').body
         return ast.NameConstant(True)
 
     def at_night(self, node):
-        if self.current_spot.type == 'GS Token' and self.multiworld.logic_no_night_tokens_without_suns_song:
+        if self.current_spot_type() == 'GS Token' and self.get_setting('logic_no_night_tokens_without_suns_song'):
             # Using visit here to resolve 'can_play' rule
             return self.visit(ast.parse('can_play(Suns_Song)', mode='eval').body)
-        if self.multiworld.ensure_tod_access:
+        if self.get_setting('ensure_tod_access'):
             # tod has DAMPE or (tod == NONE and (ss or find a path from a provider))
             # parsing is better than constructing this expression by hand
-            r = self.current_spot if type(self.current_spot) == OOTRegion else self.current_spot.parent_region
-            return ast.parse(f"(state.has('Ocarina', player) and state.has('Suns Song', player)) or state._oot_reach_at_time('{r.name}', TimeOfDay.DAMPE, [], player)", mode='eval').body
+            return ast.parse(f"(state.has('Ocarina', player) and state.has('Suns Song', player)) or state._oot_reach_at_time('{self.current_region_name()}', TimeOfDay.DAMPE, [], player)", mode='eval').body
         return ast.NameConstant(True)
 
 
     # Parse entry point
     # If spot is None, here() rules won't work.
     def parse_rule(self, rule_string, spot=None):
+        global rule_cache_dirty
         self.current_spot = spot
-        return self.make_access_rule(self.visit(ast.parse(rule_string, mode='eval').body))
+        for dependencies, rule_str, events, code in parsed_rules.get(rule_string, ()):
+            if self.dependencies_match(dependencies):
+                self.events.update(events)
+                if rule_str not in self.rule_cache:
+                    self.rule_cache[rule_str] = self.make_rule_function(code)
+                return self.rule_cache[rule_str]
+
+        self.dependencies = []
+        self.new_events = set()
+        try:
+            body = self.visit(ast.parse(rule_string, mode='eval').body)
+            access_rule = self.make_access_rule(body)
+            if self.dependencies is not None:
+                rule_str = ast.dump(body, False)
+                with rule_cache_lock:
+                    parsed_rules.setdefault(rule_string, []).append(
+                        (tuple(dict.fromkeys(self.dependencies)), rule_str, frozenset(self.new_events), compiled_rules[rule_str]))
+                    rule_cache_dirty = True
+        finally:
+            self.dependencies = None
+        return access_rule
 
     def parse_spot_rule(self, spot):
         rule = spot.rule_string.split('#', 1)[0].strip()
@@ -493,21 +644,19 @@ class Rule_AST_Transformer(ast.NodeTransformer):
 
     # Hijacking functions
     def current_spot_child_access(self, node): 
-        r = self.current_spot if type(self.current_spot) == OOTRegion else self.current_spot.parent_region
-        return ast.parse(f"state._oot_reach_as_age('{r.name}', 'child', {self.player})", mode='eval').body
+        return ast.parse(f"state._oot_reach_as_age('{self.current_region_name()}', 'child', player)", mode='eval').body
 
     def current_spot_adult_access(self, node): 
-        r = self.current_spot if type(self.current_spot) == OOTRegion else self.current_spot.parent_region
-        return ast.parse(f"state._oot_reach_as_age('{r.name}', 'adult', {self.player})", mode='eval').body
+        return ast.parse(f"state._oot_reach_as_age('{self.current_region_name()}', 'adult', player)", mode='eval').body
 
     def current_spot_starting_age_access(self, node): 
-        return self.current_spot_child_access(node) if self.multiworld.starting_age == 'child' else self.current_spot_adult_access(node)
+        return self.current_spot_child_access(node) if self.get_setting('starting_age') == 'child' else self.current_spot_adult_access(node)
 
     def has_bottle(self, node): 
-        return ast.parse(f"state._oot_has_bottle({self.player})", mode='eval').body
+        return ast.parse(f"state._oot_has_bottle(player)", mode='eval').body
 
     def can_live_dmg(self, node):
-        return ast.parse(f"state._oot_can_live_dmg({self.player}, {node.args[0].value})", mode='eval').body
+        return ast.parse(f"state._oot_can_live_dmg(player, {node.args[0].value})", mode='eval').body
 
     def region_has_shortcuts(self, node):
-        return ast.parse(f"state._oot_region_has_shortcuts({self.player}, '{node.args[0].value}')", mode='eval').body
+        return ast.parse(f"state._oot_region_has_shortcuts(player, '{node.args[0].value}')", mode='eval').body
@@ -2,7 +2,7 @@ from collections import deque
 import logging
 import typing
 
-from .Regions import TimeOfDay
+from .Regions import TimeOfDay, indexed_objects
 from .DungeonList import dungeon_table
 from .Hints import HintArea
 from .Items import oot_is_item_of_type
@@ -91,20 +91,35 @@ class OOTLogic(LogicMixin):
                 return True
         return False
 
+    # Reachable regions and blocked connections are bytearrays of flags, indexed by OOTRegion.index and OOTEntrance.index.
+    def _oot_reached_as_age(self, region, age):
+        return getattr(self, f'{age}_reachable_regions')[region.player][region.index] == 1
+
+    def _oot_reachable_regions_as_age(self, player, age):
+        return indexed_objects(getattr(self, f'{age}_reachable_regions')[player],
+                               self.multiworld.worlds[player].regions_by_index)
+
     # Store the age before calling this!
     def _oot_update_age_reachable_regions(self, player): 
         self.stale[player] = False
+        ootworld = self.multiworld.worlds[player]
         for age in ['child', 'adult']: 
             self.age[player] = age
             rrp = getattr(self, f'{age}_reachable_regions')[player]
             bc = getattr(self, f'{age}_blocked_connections')[player]
-            queue = deque(getattr(self, f'{age}_blocked_connections')[player])
+            # regions and entrances may have been created since the last update
+            if len(rrp) < len(ootworld.regions_by_index):
+                rrp.extend(bytes(len(ootworld.regions_by_index) - len(rrp)))
+            if len(bc) < len(ootworld.entrances_by_index):
+                bc.extend(bytes(len(ootworld.entrances_by_index) - len(bc)))
+            queue = deque(indexed_objects(bc, ootworld.entrances_by_index))
             start = self.multiworld.get_region('Menu', player)
 
             # init on first call - this can't be done on construction since the regions don't exist yet
-            if not start in rrp:
-                rrp.add(start)
-                bc.update(start.exits)
+            if not rrp[start.index]:
+                rrp[start.index] = 1
+                for exit in start.exits:
+                    bc[exit.index] = 1
                 queue.extend(start.exits)
 
             # run BFS on all connections, and keep track of those blocked by missing items
@@ -113,12 +128,13 @@ class OOTLogic(LogicMixin):
                 new_region = connection.connected_region
                 if new_region is None: 
                     continue
-                if new_region in rrp:
-                    bc.remove(connection)
+                if rrp[new_region.index]:
+                    bc[connection.index] = 0
                 elif connection.can_reach(self):
-                    rrp.add(new_region)
-                    bc.remove(connection)
-                    bc.update(new_region.exits)
+                    rrp[new_region.index] = 1
+                    bc[connection.index] = 0
+                    for exit in new_region.exits:
+                        bc[exit.index] = 1
                     queue.extend(new_region.exits)
                     self.path[new_region] = (new_region.name, self.path.get(connection, None))
 
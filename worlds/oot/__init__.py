@@ -1,6 +1,5 @@
 import logging
 import threading
-import copy
 import functools
 import settings
 import typing
@@ -19,7 +18,7 @@ from .Items import OOTItem, item_table, oot_data_to_ap_id, oot_is_item_of_type
 from .ItemPool import generate_itempool, get_junk_item, get_junk_pool
 from .Regions import OOTRegion, TimeOfDay
 from .Rules import set_rules, set_shop_rules, set_entrances_based_rules
-from .RuleParser import Rule_AST_Transformer
+from .RuleParser import Rule_AST_Transformer, save_rule_cache
 from .Options import oot_options
 from .Utils import data_path, read_json
 from .LocationList import business_scrubs, set_drop_location_names, dungeon_song_locations
@@ -37,34 +36,29 @@ from Fill import fill_restrictive, fast_fill, FillError
 from worlds.generic.Rules import exclusion_rules, add_item_rule
 from ..AutoWorld import World, AutoLogicRegister, WebWorld
 
-# OoT's generate_output doesn't benefit from more than 2 threads, instead it uses a lot of memory.
-i_o_limiter = threading.Semaphore(2)
-
 
 class OOTCollectionState(metaclass=AutoLogicRegister):
     def init_mixin(self, parent: MultiWorld):
         oot_ids = parent.get_game_players(OOTWorld.game) + parent.get_game_groups(OOTWorld.game)
-        self.child_reachable_regions = {player: set() for player in oot_ids}
-        self.adult_reachable_regions = {player: set() for player in oot_ids}
-        self.child_blocked_connections = {player: set() for player in oot_ids}
-        self.adult_blocked_connections = {player: set() for player in oot_ids}
+        # a flag per region or entrance, see OOTRegion.index and OOTEntrance.index
+        self.child_reachable_regions = {player: bytearray() for player in oot_ids}
+        self.adult_reachable_regions = {player: bytearray() for player in oot_ids}
+        self.child_blocked_connections = {player: bytearray() for player in oot_ids}
+        self.adult_blocked_connections = {player: bytearray() for player in oot_ids}
         self.day_reachable_regions = {player: set() for player in oot_ids}
         self.dampe_reachable_regions = {player: set() for player in oot_ids}
         self.age = {player: None for player in oot_ids}
 
     def copy_mixin(self, ret) -> CollectionState:
-        ret.child_reachable_regions = {player: copy.copy(self.child_reachable_regions[player]) for player in
-                                       self.child_reachable_regions}
-        ret.adult_reachable_regions = {player: copy.copy(self.adult_reachable_regions[player]) for player in
-                                       self.adult_reachable_regions}
-        ret.child_blocked_connections = {player: copy.copy(self.child_blocked_connections[player]) for player in
-                                         self.child_blocked_connections}
-        ret.adult_blocked_connections = {player: copy.copy(self.adult_blocked_connections[player]) for player in
-                                         self.adult_blocked_connections}
-        ret.day_reachable_regions = {player: copy.copy(self.adult_reachable_regions[player]) for player in
-                                     self.day_reachable_regions}
-        ret.dampe_reachable_regions = {player: copy.copy(self.adult_reachable_regions[player]) for player in
-                                       self.dampe_reachable_regions}
+        ret.child_reachable_regions = {player: flags.copy() for player, flags in self.child_reachable_regions.items()}
+        ret.adult_reachable_regions = {player: flags.copy() for player, flags in self.adult_reachable_regions.items()}
+        ret.child_blocked_connections = {player: flags.copy() for player, flags in
+                                         self.child_blocked_connections.items()}
+        ret.adult_blocked_connections = {player: flags.copy() for player, flags in
+                                         self.adult_blocked_connections.items()}
+        # time of day reachability is recomputed for each copy
+        ret.day_reachable_regions = {player: set() for player in self.day_reachable_regions}
+        ret.dampe_reachable_regions = {player: set() for player in self.dampe_reachable_regions}
         return ret
 
 
@@ -149,6 +143,9 @@ class OOTWorld(World):
                        }}  # These are items which aren't used, but have get-item values
     location_name_to_id = location_name_to_id
     web = OOTWeb()
+    # generate_output holds the decompressed rom and patch data once hints are available,
+    # the default output_memory_budget runs 2 at once
+    output_memory = 384 * 1024 * 1024
 
     required_client_version = (0, 4, 0)
 
@@ -217,6 +214,9 @@ class OOTWorld(World):
             setattr(self, option_name, option_value)
 
         self.regions = []  # internal caches of regions for this world, used later
+        # all regions and entrances created for this world, by their index in the reachability flags
+        self.regions_by_index = []
+        self.entrances_by_index = []
         self._regions_cache = {}
 
         self.shop_prices = {}
@@ -833,6 +833,12 @@ class OOTWorld(World):
         set_entrances_based_rules(self)
 
 
+    # All OoT logic has been parsed by now, persist new parse results for future generations.
+    @classmethod
+    def stage_set_rules(cls, multiworld: MultiWorld):
+        save_rule_cache()
+
+
     def generate_basic(self):  # mostly killing locations that shouldn't exist by settings
 
         # Gather items for ice trap appearances
@@ -1069,7 +1075,7 @@ class OOTWorld(World):
         if self.hints != 'none':
             self.hint_data_available.wait()
 
-        with i_o_limiter:
+        with self.reserve_output_memory():
             # Make traps appear as other random items
             trap_location_ids = [loc.address for loc in self.get_locations() if loc.item.trap]
             self.trap_appearances = {}
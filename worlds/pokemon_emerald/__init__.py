@@ -2,7 +2,6 @@
 Archipelago World definition for Pokemon Emerald Version
 """
 from collections import Counter
-import copy
 import logging
 import os
 import pkgutil
@@ -15,7 +14,8 @@ import settings
 from worlds.AutoWorld import WebWorld, World
 
 from .client import PokemonEmeraldClient  # Unused, but required to register with BizHawkClient
-from .data import LEGENDARY_POKEMON, MapData, SpeciesData, TrainerData, data as emerald_data
+from .data import (LEGENDARY_POKEMON, CopyOnWriteDict, MapData, SpeciesData, TrainerData, copy_trainer,
+                   data as emerald_data)
 from .items import (ITEM_GROUPS, PokemonEmeraldItem, create_item_label_to_code_map, get_item_classification,
                     offset_item_value)
 from .locations import (LOCATION_GROUPS, PokemonEmeraldLocation, create_location_label_to_id_map,
@@ -108,12 +108,12 @@ class PokemonEmeraldWorld(World):
     hm_requirements: Dict[str, Union[int, List[str]]]
     auth: bytes
 
-    modified_species: Dict[int, SpeciesData]
-    modified_maps: Dict[str, MapData]
+    modified_species: CopyOnWriteDict[int, SpeciesData]
+    modified_maps: CopyOnWriteDict[str, MapData]
     modified_tmhm_moves: List[int]
     modified_legendary_encounters: List[int]
     modified_starters: Tuple[int, int, int]
-    modified_trainers: List[TrainerData]
+    modified_trainers: CopyOnWriteDict[int, TrainerData]
 
     def __init__(self, multiworld, player):
         super(PokemonEmeraldWorld, self).__init__(multiworld, player)
@@ -124,11 +124,11 @@ class PokemonEmeraldWorld(World):
         self.blacklisted_wilds = set()
         self.blacklisted_starters = set()
         self.blacklisted_opponent_pokemon = set()
-        self.modified_maps = copy.deepcopy(emerald_data.maps)
-        self.modified_species = copy.deepcopy(emerald_data.species)
+        self.modified_maps = CopyOnWriteDict(emerald_data.maps)
+        self.modified_species = CopyOnWriteDict(emerald_data.species)
         self.modified_tmhm_moves = []
         self.modified_starters = emerald_data.starters
-        self.modified_trainers = []
+        self.modified_trainers = CopyOnWriteDict({})
         self.modified_legendary_encounters = []
 
     @classmethod
@@ -569,16 +569,17 @@ class PokemonEmeraldWorld(World):
                     continue
 
     def generate_output(self, output_directory: str) -> None:
-        self.modified_trainers = copy.deepcopy(emerald_data.trainers)
-        self.modified_tmhm_moves = copy.deepcopy(emerald_data.tmhm_moves)
-        self.modified_legendary_encounters = copy.deepcopy(emerald_data.legendary_encounters)
-        self.modified_misc_pokemon = copy.deepcopy(emerald_data.misc_pokemon)
-        self.modified_starters = copy.deepcopy(emerald_data.starters)
+        self.modified_trainers = CopyOnWriteDict(dict(enumerate(emerald_data.trainers)), copy_trainer)
+        self.modified_tmhm_moves = list(emerald_data.tmhm_moves)
+        self.modified_legendary_encounters = list(emerald_data.legendary_encounters)
+        self.modified_misc_pokemon = list(emerald_data.misc_pokemon)
+        self.modified_starters = emerald_data.starters
 
         # Modify catch rate
         min_catch_rate = min(self.options.min_catch_rate.value, 255)
         for species in self.modified_species.values():
-            species.catch_rate = max(species.catch_rate, min_catch_rate)
+            if species.catch_rate < min_catch_rate:
+                self.modified_species.writable(species.species_id).catch_rate = min_catch_rate
 
         # Modify TM moves
         if self.options.tm_tutor_moves:
@@ -4,10 +4,11 @@ This also includes marrying automatically extracted data with manually
 defined data (like location labels or usable pokemon species), some cleanup
 and sorting, and Warp methods.
 """
-from dataclasses import dataclass
+import copy
+from dataclasses import dataclass, replace
 from enum import IntEnum
 import orjson
-from typing import Dict, List, NamedTuple, Optional, Set, FrozenSet, Tuple, Any, Union
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, FrozenSet, Tuple, Any, TypeVar, Union
 import pkgutil
 import pkg_resources
 
@@ -299,6 +300,41 @@ class TrainerData:
     battle_type: int
 
 
+def copy_trainer(trainer: TrainerData) -> TrainerData:
+    """Copies a trainer and its party so that the party's pokemon can be replaced without affecting the original"""
+    return replace(trainer, party=replace(trainer.party, pokemon=list(trainer.party.pokemon)))
+
+
+_K = TypeVar("_K")
+_V = TypeVar("_V")
+
+
+class CopyOnWriteDict(Dict[_K, _V]):
+    """
+    A per-player view of one of the shared tables in `data`.
+
+    Entries are the shared objects themselves until `writable` is called for their key, which replaces the entry with
+    a copy that belongs to this dict. Anything that modifies an entry has to get it through `writable` first, so the
+    shared tables stay untouched and a player only holds copies of the entries they actually changed.
+    """
+    copy_entry: Callable[[_V], _V]
+    copied_keys: Set[_K]
+
+    def __init__(self, table: Dict[_K, _V], copy_entry: Callable[[_V], _V] = copy.copy) -> None:
+        super().__init__(table)
+        self.copy_entry = copy_entry
+        self.copied_keys = set()
+
+    def writable(self, key: _K) -> _V:
+        if key in self.copied_keys:
+            return self[key]
+
+        entry = self.copy_entry(self[key])
+        self[key] = entry
+        self.copied_keys.add(key)
+        return entry
+
+
 class PokemonEmeraldData:
     starters: Tuple[int, int, int]
     constants: Dict[str, int]
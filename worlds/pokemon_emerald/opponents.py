@@ -26,7 +26,7 @@ def randomize_opponent_parties(world: "PokemonEmeraldWorld") -> None:
 
     per_species_tmhm_moves: Dict[int, List[int]] = {}
 
-    for trainer in world.modified_trainers:
+    for trainer_id, trainer in world.modified_trainers.items():
         new_party = []
         for pokemon in trainer.party.pokemon:
             original_species = data.species[pokemon.species_id]
@@ -113,4 +113,4 @@ def randomize_opponent_parties(world: "PokemonEmeraldWorld") -> None:
 
             new_party.append(TrainerPokemonData(new_species.species_id, pokemon.level, new_moves))
 
-        trainer.party.pokemon = new_party
+        world.modified_trainers.writable(trainer_id).party.pokemon = new_party
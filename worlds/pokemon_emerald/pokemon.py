@@ -1,6 +1,7 @@
 """
 Functions related to pokemon species and moves
 """
+from dataclasses import replace
 import functools
 from typing import TYPE_CHECKING, Dict, List, Set, Optional, Tuple
 
@@ -182,7 +183,8 @@ def randomize_types(world: "PokemonEmeraldWorld") -> None:
         type_map[mystery_type_index], type_map[9] = type_map[9], type_map[mystery_type_index]
 
         for species in world.modified_species.values():
-            species.types = (type_map[species.types[0]], type_map[species.types[1]])
+            world.modified_species.writable(species.species_id).types = \
+                (type_map[species.types[0]], type_map[species.types[1]])
     elif world.options.types == RandomizeTypes.option_completely_random:
         for species in world.modified_species.values():
             new_type_1 = get_random_type(world.random)
@@ -191,7 +193,7 @@ def randomize_types(world: "PokemonEmeraldWorld") -> None:
                 while new_type_1 == new_type_2:
                     new_type_2 = get_random_type(world.random)
 
-            species.types = (new_type_1, new_type_2)
+            world.modified_species.writable(species.species_id).types = (new_type_1, new_type_2)
     elif world.options.types == RandomizeTypes.option_follow_evolutions:
         already_modified: Set[int] = set()
 
@@ -221,7 +223,7 @@ def randomize_types(world: "PokemonEmeraldWorld") -> None:
 
             evolutions = [species]
             while len(evolutions) > 0:
-                evolution = evolutions.pop()
+                evolution = world.modified_species.writable(evolutions.pop().species_id)
                 evolution.types = (type_map[evolution.types[0]], type_map[evolution.types[1]])
                 already_modified.add(evolution.species_id)
                 evolutions += [world.modified_species[evo.species_id] for evo in evolution.evolutions]
@@ -252,7 +254,7 @@ def randomize_wild_encounters(world: "PokemonEmeraldWorld") -> None:
     world.random.shuffle(map_names)
     for map_name in map_names:
         placed_priority_species = False
-        map_data = world.modified_maps[map_name]
+        map_data = world.modified_maps.writable(map_name)
 
         new_encounters: List[Optional[EncounterTableData]] = [None, None, None]
         old_encounters = [map_data.land_encounters, map_data.water_encounters, map_data.fishing_encounters]
@@ -417,7 +419,7 @@ def randomize_abilities(world: "PokemonEmeraldWorld") -> None:
                 while len(evolutions) > 0:
                     evolution = evolutions.pop()
                     if evolution.abilities == old_abilities:
-                        evolution.abilities = new_abilities
+                        world.modified_species.writable(evolution.species_id).abilities = new_abilities
                         already_modified.add(evolution.species_id)
                         evolutions += [
                             world.modified_species[evolution.species_id]
@@ -436,7 +438,7 @@ def randomize_abilities(world: "PokemonEmeraldWorld") -> None:
                 0 if old_abilities[1] == 0 else world.random.choice(ability_whitelist)
             )
 
-            species.abilities = new_abilities
+            world.modified_species.writable(species.species_id).abilities = new_abilities
 
 
 def randomize_learnsets(world: "PokemonEmeraldWorld") -> None:
@@ -476,7 +478,7 @@ def randomize_learnsets(world: "PokemonEmeraldWorld") -> None:
             new_learnset.append(LearnsetMove(old_learnset[cursor].level, new_move))
             cursor += 1
 
-        species.learnset = new_learnset
+        world.modified_species.writable(species.species_id).learnset = new_learnset
 
         
 def randomize_starters(world: "PokemonEmeraldWorld") -> None:
@@ -581,8 +583,11 @@ def randomize_starters(world: "PokemonEmeraldWorld") -> None:
             picked_evolution = world.random.choice(potential_evolutions)
 
         for trainer_name, starter_position, is_evolved in rival_teams[i]:
-            trainer_data = world.modified_trainers[data.constants[trainer_name]]
-            trainer_data.party.pokemon[starter_position].species_id = picked_evolution if is_evolved else starter.species_id
+            trainer_data = world.modified_trainers.writable(data.constants[trainer_name])
+            trainer_data.party.pokemon[starter_position] = replace(
+                trainer_data.party.pokemon[starter_position],
+                species_id=picked_evolution if is_evolved else starter.species_id
+            )
 
 
 def randomize_legendary_encounters(world: "PokemonEmeraldWorld") -> None:
@@ -693,4 +698,5 @@ def randomize_tm_hm_compatibility(world: "PokemonEmeraldWorld") -> None:
             for i in range(50, 58):
                 combatibility_array[i] = world.random.random() < world.options.hm_compatibility / 100
 
-        species.tm_hm_compatibility = bool_array_to_int(combatibility_array)
+        world.modified_species.writable(species.species_id).tm_hm_compatibility = \
+            bool_array_to_int(combatibility_array)
@@ -708,7 +708,7 @@ def _set_species_info(world: "PokemonEmeraldWorld", patch: PokemonEmeraldProcedu
 
 
 def _set_opponents(world: "PokemonEmeraldWorld", patch: PokemonEmeraldProcedurePatch, easter_egg: Tuple[int, int]) -> None:
-    for trainer in world.modified_trainers:
+    for trainer in world.modified_trainers.values():
         party_address = trainer.party.address
 
         pokemon_data_size: int
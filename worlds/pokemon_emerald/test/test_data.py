@@ -0,0 +1,32 @@
+import copy
+
+from . import PokemonEmeraldTestBase
+from ..data import data
+from ..options import LevelUpMoves, RandomizeAbilities, RandomizeTypes, RandomizeWildPokemon
+from ..pokemon import randomize_abilities, randomize_learnsets, randomize_tm_hm_compatibility
+
+
+class TestSharedDataUnmodified(PokemonEmeraldTestBase):
+    options = {
+        "wild_pokemon": RandomizeWildPokemon.option_completely_random,
+        "types": RandomizeTypes.option_follow_evolutions,
+        "abilities": RandomizeAbilities.option_follow_evolutions,
+        "level_up_moves": LevelUpMoves.option_randomized,
+        "tm_tutor_compatibility": 50,
+    }
+
+    def test_randomizing_copies_on_write(self) -> None:
+        """Tests that randomizing species and maps modifies only the player's copies of them"""
+        species = copy.deepcopy(data.species)
+        maps = copy.deepcopy(data.maps)
+
+        randomize_abilities(self.world)
+        randomize_learnsets(self.world)
+        randomize_tm_hm_compatibility(self.world)
+
+        self.assertEqual(data.species, species)
+        self.assertEqual(data.maps, maps)
+        self.assertNotEqual(self.world.modified_species, data.species)
+        self.assertNotEqual(self.world.modified_maps, data.maps)
+        for species_id in self.world.modified_species.copied_keys:
+            self.assertIsNot(self.world.modified_species[species_id], data.species[species_id])
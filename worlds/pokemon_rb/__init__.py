@@ -3,7 +3,6 @@ import settings
 import typing
 import threading
 import base64
-from copy import deepcopy
 from typing import TextIO
 
 from Utils import __version__
@@ -161,7 +160,8 @@ class PokemonRedBlueWorld(World):
         process_pokemon_data(self)
 
         if self.multiworld.randomize_type_chart[self.player] == "vanilla":
-            chart = deepcopy(poke_data.type_chart)
+            # the matchups are only read from here on, and sorting below builds a new list of them
+            chart = poke_data.type_chart
         elif self.multiworld.randomize_type_chart[self.player] == "randomize":
             types = poke_data.type_names.values()
             matchups = []
@@ -94,7 +94,7 @@ def move_power(move_data):
 
 
 def process_move_data(self):
-    self.local_move_data = deepcopy(poke_data.moves)
+    self.local_move_data = {move: move_data.copy() for move, move_data in poke_data.moves.items()}
 
     if self.multiworld.randomize_move_types[self.player]:
         for move, data in self.local_move_data.items():
@@ -132,7 +132,8 @@ def process_move_data(self):
 def process_pokemon_data(self):
 
     local_poke_data = deepcopy(poke_data.pokemon_data)
-    learnsets = deepcopy(poke_data.learnsets)
+    # learnsets are replaced rather than modified, so the vanilla ones can be shared
+    learnsets = poke_data.learnsets.copy()
     tms_hms = self.local_tms + poke_data.hm_moves
 
     compat_hms = set()
@@ -29,6 +29,7 @@ from .variaRandomizer.rando.RandoServices import ComebackCheckType
 from .variaRandomizer.utils.parameters import *
 from .variaRandomizer.utils.utils import openFile
 from .variaRandomizer.logic.logic import Logic
+from .variaRandomizer.logic.cache import Cache
 from .variaRandomizer.randomizer import VariaRandomizer
 from .variaRandomizer.utils.doorsmanager import DoorsManager
 from .variaRandomizer.rom.rom_patches import RomPatches
@@ -62,7 +63,7 @@ class SMCollectionState(metaclass=AutoLogicRegister):
             self.smbm = {}
 
     def copy_mixin(self, ret) -> CollectionState:
-        ret.smbm = {player: copy.deepcopy(self.smbm[player]) for player in self.smbm}
+        ret.smbm = {player: self.smbm[player].copy() for player in self.smbm}
         return ret
 
     def get_game_players(self, multiword: MultiWorld, game_name: str):
@@ -131,6 +132,8 @@ class SMWorld(World):
         dummy_rom_file = Utils.user_path(SMSettings.RomFile.copy_to)  # actual rom set in generate_output
         self.variaRando = VariaRandomizer(self.multiworld, dummy_rom_file, self.player)
         self.multiworld.state.smbm[self.player] = SMBoolManager(self.player, self.variaRando.maxDifficulty)
+        # helpers results computed for a previous generation or while setting up the randomizer are stale
+        Cache.reset()
 
         # keeps Nothing items local so no player will ever pickup Nothing
         # doing so reduces contribution of this world to the Multiworld the more Nothing there is though
@@ -0,0 +1,7 @@
+from test.bases import WorldTestBase
+from .. import SMWorld
+
+
+class SMTestBase(WorldTestBase):
+    game = "Super Metroid"
+    world: SMWorld
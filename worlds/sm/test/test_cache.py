@@ -0,0 +1,46 @@
+from typing import Dict, List
+
+from BaseClasses import CollectionState
+from ..variaRandomizer.logic.cache import Cache
+from . import SMTestBase
+
+
+class TestHelpersCache(SMTestBase):
+    def evaluate_rules(self, state: CollectionState) -> Dict[str, bool]:
+        return {location.name: bool(location.access_rule(state))
+                for location in self.multiworld.get_locations(self.player)}
+
+    def test_cached_results(self) -> None:
+        """Test that helpers results cached while collecting, removing and copying match freshly computed ones."""
+        items = [item for item in self.multiworld.itempool if item.advancement]
+        states: List[CollectionState] = []
+        state = CollectionState(self.multiworld)
+        for item in items:
+            state.collect(item, True)
+            states.append(state.copy())
+        for item in items[::3]:
+            state.remove(item)
+            states.append(state.copy())
+        # states created afterwards share the cache filled by the previous ones
+        state = CollectionState(self.multiworld)
+        for item in items[::2]:
+            state.collect(item, True)
+        states.append(state)
+
+        cached_results = [self.evaluate_rules(state) for state in states]
+        self.assertGreater(len(Cache.masterCache), 1)
+        for state, results in zip(states, cached_results):
+            Cache.reset()
+            self.assertEqual(self.evaluate_rules(state), results)
+
+    def test_reset(self) -> None:
+        """Test that a reset also drops the slots list held by managers which was evicted from the cache."""
+        state = CollectionState(self.multiworld)
+        smbm = state.smbm[self.player]
+        self.evaluate_rules(state)
+        Cache.masterCache.clear()
+        evicted = smbm.cache
+        Cache.reset()
+        self.assertIsNot(smbm.cache, evicted)
+        self.assertIn(smbm.cache, Cache.masterCache.values())
+        self.assertTrue(all(result is None for result in smbm.cache))
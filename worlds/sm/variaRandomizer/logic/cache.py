@@ -1,31 +1,60 @@
-# the caching decorator for helpers functions
+import weakref
+
+# the caching decorator for helpers functions.
+# results are stored per items combination: each SMBoolManager holds the slots list
+# matching its current cache key, and refreshes it when its items change.
+# the cache is kept between managers and states, it is only reset for a new generation or when knows change.
 class VersionedCache(object):
-    __slots__ = ( 'cache', 'masterCache', 'nextSlot', 'size')
+    __slots__ = ( 'masterCache', 'nextSlot', 'size', 'maxKeys', 'managers')
 
-    def __init__(self):
-        self.cache = []
+    def __init__(self, maxKeys=4096):
         self.masterCache = {}
         self.nextSlot = 0
         self.size = 0
+        # number of items combinations kept, oldest ones are evicted first
+        self.maxKeys = maxKeys
+        # managers holding a slots list, they can hold one that was evicted from masterCache
+        self.managers = weakref.WeakSet()
+
+    def register(self, manager):
+        self.managers.add(manager)
 
     def reset(self):
-        # reinit the whole cache
+        # reinit the whole cache, managers drop the slots list they hold, even if it was evicted before
         self.masterCache = {}
-        self.update(0)
+        for manager in list(self.managers):
+            manager.updateCache()
 
-    def update(self, newKey):
-        cache = self.masterCache.get(newKey, None)
+    def get(self, key):
+        cache = self.masterCache.get(key, None)
         if cache is None:
+            if len(self.masterCache) >= self.maxKeys:
+                del self.masterCache[next(iter(self.masterCache))]
             cache = [ None ] * self.size
-            self.masterCache[newKey] = cache
-        self.cache = cache
+            self.masterCache[key] = cache
+        return cache
 
+    # for helpers methods, called with the helpers object
     def decorator(self, func):
-        return self._decorate(func.__name__, self._new_slot(), func)
+        slot = self._new_slot()
+        def _decorator(helpers):
+            cache = helpers.smbm.cache
+            ret = cache[slot]
+            if ret is None:
+                ret = cache[slot] = func(helpers)
+            return ret
+        return _decorator
 
-    # for lambdas
+    # for lambdas, called with the SMBoolManager
     def ldeco(self, func):
-        return self._decorate(func.__code__, self._new_slot(), func)
+        slot = self._new_slot()
+        def _decorator(sm):
+            cache = sm.cache
+            ret = cache[slot]
+            if ret is None:
+                ret = cache[slot] = func(sm)
+            return ret
+        return _decorator
 
     def _new_slot(self):
         slot = self.nextSlot
@@ -33,17 +62,6 @@ class VersionedCache(object):
         self.size += 1
         return slot
 
-    def _decorate(self, name, slot, func):
-        def _decorator(arg):
-            #ret = self.cache[slot]
-            #if ret is not None:
-            #    return ret
-            #else:
-                ret = func(arg)
-            #    self.cache[slot] = ret
-                return ret
-        return _decorator
-
 Cache = VersionedCache()
 
 class RequestCache(object):
@@ -15,18 +15,24 @@ class SMBoolManager(object):
     countItems = ['Missile', 'Super', 'PowerBomb', 'ETank', 'Reserve']
 
     percentItems = ['Bomb', 'Charge', 'Ice', 'HiJump', 'SpeedBooster', 'Wave', 'Spazer', 'SpringBall', 'Varia', 'Plasma', 'Grapple', 'Morph', 'Gravity', 'XRayScope', 'SpaceJump', 'ScrewAttack']
+    # helpers class -> names of its functions exposed on the manager
+    facadeNames = {}
+    # item -> (position, bit mask) in the cache key, computed once
+    itemsPositions = None
+
     def __init__(self, player=0, maxDiff=sys.maxsize, onlyBossLeft = False):
         self._items = { }
         self._counts = { }
 
         self.player = player
         self.maxDiff = maxDiff
-        self.onlyBossLeft = onlyBossLeft
+        self._onlyBossLeft = onlyBossLeft
 
         # cache related
-        #self.cacheKey = 0
-        #self.computeItemsPositions()
-        Cache.reset()
+        self.cacheKey = 0
+        if SMBoolManager.itemsPositions is None:
+            SMBoolManager.computeItemsPositions()
+        Cache.register(self)
         Logic.factory('vanilla')
         self.helpers = Logic.HelpersGraph(self)
         self.doorsManager = DoorsManager()
@@ -35,31 +41,48 @@ class SMBoolManager(object):
         self.createKnowsFunctions(player)
         self.resetItems()
 
-    def computeItemsPositions(self):
+    @classmethod
+    def computeItemsPositions(cls):
         # compute index in cache key for each items
-        self.itemsPositions = {}
-        maxBitsForCountItem = 7 # 128 values with 7 bits
-        for (i, item) in enumerate(self.countItems):
+        itemsPositions = {}
+        maxBitsForCountItem = 16 # archipelago item pools can hold a lot of count items
+        for (i, item) in enumerate(cls.countItems):
             pos = i*maxBitsForCountItem
             bitMask = (2<<(maxBitsForCountItem-1))-1
             bitMask = bitMask << pos
-            self.itemsPositions[item] = (pos, bitMask)
-        for (i, item) in enumerate(self.items, (i+1)*maxBitsForCountItem+1):
-            if item in self.countItems:
+            itemsPositions[item] = (pos, bitMask)
+        for (i, item) in enumerate(cls.items, (i+1)*maxBitsForCountItem+1):
+            if item in cls.countItems or item in ['Nothing', 'NoEnergy']:
                 continue
-            self.itemsPositions[item] = (i, 1<<i)
+            itemsPositions[item] = (i, 1<<i)
+        cls.itemsPositions = itemsPositions
 
     def computeNewCacheKey(self, item, value):
         # generate an unique integer for each items combinations which is use as key in the cache.
-        if item in ['Nothing', 'NoEnergy']:
+        # items not used by the logic (Nothing, NoEnergy, ArchipelagoItem) are not part of the key.
+        position = self.itemsPositions.get(item)
+        if position is None:
             return
-        (pos, bitMask) = self.itemsPositions[item]
+        (pos, bitMask) = position
 #        print("--------------------- {} {} ----------------------------".format(item, value))
 #        print("old:  "+format(self.cacheKey, '#067b'))
-        self.cacheKey = (self.cacheKey & (~bitMask)) | (value<<pos)
+        self.cacheKey = (self.cacheKey & (~bitMask)) | ((value<<pos) & bitMask)
 #        print("new:  "+format(self.cacheKey, '#067b'))
 #        self.printItemsInKey(self.cacheKey)
 
+    def updateCache(self):
+        # helpers results also depend on the player settings and the boss only logic
+        self.cache = Cache.get((self.player, self._onlyBossLeft, self.cacheKey))
+
+    @property
+    def onlyBossLeft(self):
+        return self._onlyBossLeft
+
+    @onlyBossLeft.setter
+    def onlyBossLeft(self, onlyBossLeft):
+        self._onlyBossLeft = onlyBossLeft
+        self.updateCache()
+
     def printItemsInKey(self, key):
         # for debug purpose
         print("key:  "+format(key, '#067b'))
@@ -97,12 +120,27 @@ class SMBoolManager(object):
             self.removeItem(item)
         return ret
 
+    def copy(self):
+        # cheap alternative to deepcopy, used for each Archipelago CollectionState copy.
+        # only collected items are state, the knows functions, doors manager and objectives are shared,
+        # and the helpers are recreated for the copy, as they reference their manager.
+        # the copy has the same items so it shares the cache slots.
+        ret = object.__new__(type(self))
+        ret.__dict__.update(self.__dict__)
+        ret._items = self._items.copy()
+        ret._counts = self._counts.copy()
+        ret.helpers = object.__new__(type(self.helpers))
+        ret.helpers.smbm = ret
+        ret.createFacadeFunctions()
+        Cache.register(ret)
+        return ret
+
     def resetItems(self):
         self._items = { item : smboolFalse for item in self.items }
         self._counts = { item : 0 for item in self.countItems }
 
-        #self.cacheKey = 0
-        #Cache.update(self.cacheKey)
+        self.cacheKey = 0
+        self.updateCache()
 
     def addItem(self, item):
         # a new item is available
@@ -110,11 +148,11 @@ class SMBoolManager(object):
         if self.isCountItem(item):
             count = self._counts[item] + 1
             self._counts[item] = count
-            #self.computeNewCacheKey(item, count)
-        #else:
-            #self.computeNewCacheKey(item, 1)
+            self.computeNewCacheKey(item, count)
+        else:
+            self.computeNewCacheKey(item, 1)
 
-        #Cache.update(self.cacheKey)
+        self.updateCache()
 
     def addItems(self, items):
         if len(items) == 0:
@@ -124,11 +162,11 @@ class SMBoolManager(object):
             if self.isCountItem(item):
                 count = self._counts[item] + 1
                 self._counts[item] = count
-                #self.computeNewCacheKey(item, count)
-            #else:
-                #self.computeNewCacheKey(item, 1)
+                self.computeNewCacheKey(item, count)
+            else:
+                self.computeNewCacheKey(item, 1)
 
-        #Cache.update(self.cacheKey)
+        self.updateCache()
 
     def removeItem(self, item):
         # randomizer removed an item (or the item was added to test a post available)
@@ -137,17 +175,20 @@ class SMBoolManager(object):
             self._counts[item] = count
             if count == 0:
                 self._items[item] = smboolFalse
-            #self.computeNewCacheKey(item, count)
+            self.computeNewCacheKey(item, count)
         else:
             self._items[item] = smboolFalse
-            #self.computeNewCacheKey(item, 0)
+            self.computeNewCacheKey(item, 0)
 
-        #Cache.update(self.cacheKey)
+        self.updateCache()
 
     def createFacadeFunctions(self):
-        for fun in dir(self.helpers):
-            if fun != 'smbm' and fun[0:2] != '__':
-                setattr(self, fun, getattr(self.helpers, fun))
+        names = self.facadeNames.get(type(self.helpers))
+        if names is None:
+            names = [fun for fun in dir(self.helpers) if fun != 'smbm' and fun[0:2] != '__']
+            self.facadeNames[type(self.helpers)] = names
+        for fun in names:
+            setattr(self, fun, getattr(self.helpers, fun))
 
     def traverse(self, doorName):
         return self.doorsManager.traverse(self, doorName)
@@ -185,14 +226,14 @@ class SMBoolManager(object):
     def changeKnows(self, knows, newVal):
         if isKnows(knows):
             self._setKnowsFunction(knows, newVal)
-            #Cache.reset()
+            Cache.reset()
         else:
             raise ValueError("Invalid knows "+str(knows))
 
     def restoreKnows(self, knows):
         if isKnows(knows):
-            self._createKnowsFunction(knows)
-            #Cache.reset()
+            self._createKnowsFunction(knows, self.player)
+            Cache.reset()
         else:
             raise ValueError("Invalid knows "+str(knows))
         
@@ -257,11 +298,11 @@ class SMBoolManagerPlando(SMBoolManager):
         if isCount:
             count = self._counts[item] + 1
             self._counts[item] = count
-            #self.computeNewCacheKey(item, count)
-        #else:
-            #self.computeNewCacheKey(item, 1)
+            self.computeNewCacheKey(item, count)
+        else:
+            self.computeNewCacheKey(item, 1)
 
-        #Cache.update(self.cacheKey)
+        self.updateCache()
 
     def removeItem(self, item):
         # randomizer removed an item (or the item was added to test a post available)
@@ -270,14 +311,14 @@ class SMBoolManagerPlando(SMBoolManager):
             self._counts[item] = count
             if count == 0:
                 self._items[item] = smboolFalse
-            #self.computeNewCacheKey(item, count)
+            self.computeNewCacheKey(item, count)
         else:
             dup = 'dup_'+item
             if self._items.get(dup, None) is None:
                 self._items[item] = smboolFalse
-                #self.computeNewCacheKey(item, 0)
+                self.computeNewCacheKey(item, 0)
             else:
                 del self._items[dup]
-                #self.computeNewCacheKey(item, 1)
+                self.computeNewCacheKey(item, 1)
 
-        #Cache.update(self.cacheKey)
+        self.updateCache()
@@ -622,6 +622,8 @@ class Progression:
         ItemType.Missile,
         ItemType.Super,
     ]
+    # set lookup for Add and Remove, which run on each collect and remove of a CollectionState
+    itemMappingSet = frozenset(itemMapping)
 
     def __init__(self, items):
         for item in Progression.itemMapping:
@@ -646,7 +648,7 @@ class Progression:
 
     def Add(self, items:List[Item]):
         for item in items:
-            found = item.Type in Progression.itemMapping
+            found = item.Type in Progression.itemMappingSet
             if found:
                 setattr(self, item.Type.name, True)
                 continue
@@ -683,7 +685,7 @@ class Progression:
 
     def Remove(self, items:List[Item]):
         for item in items:
-            found = item.Type in Progression.itemMapping
+            found = item.Type in Progression.itemMappingSet
             if found:
                 setattr(self, item.Type.name, False)
                 continue
@@ -718,6 +720,12 @@ class Progression:
                 self.PowerBomb = self.TwoPowerBombs
                 self.TwoPowerBombs = False           
 
+    def copy(self):
+        # all progression attributes are bools and ints, a flat copy replaces deepcopy for each CollectionState copy
+        ret = object.__new__(Progression)
+        ret.__dict__.update(self.__dict__)
+        return ret
+
     def CanLiftLight(self): return self.Glove
 
     def CanLiftHeavy(self): return self.Mitt
@@ -147,7 +147,7 @@ class World:
         return region.CanEnter(items)
 
     def CanAcquire(self, items: Item.Progression, reward: Region.RewardType):
-        return next(iter([region for region in self.Regions if isinstance(region, Region.IReward) and region.Reward == reward])).CanComplete(items)
+        return self.rewardRegionLookup[reward].CanComplete(items)
 
     def CanAcquireAll(self, items: Item.Progression, rewardsMask: Region.RewardType):
         return all(region.CanComplete(items) for region in self.rewardLookup[rewardsMask.value])
@@ -173,5 +173,9 @@ class World:
     def SetRewardLookup(self):
         #/* Generate a lookup of all possible regions for any given reward combination for faster lookup later */
         self.rewardLookup: Dict[int, Region.IReward] = {}
+        self.rewardRegionLookup: Dict[Region.RewardType, Region.IReward] = {}
+        for region in self.Regions:
+            if isinstance(region, Region.IReward):
+                self.rewardRegionLookup.setdefault(region.Reward, region)
         for i in range(0, 512):
             self.rewardLookup[i] = [region for region in self.Regions if isinstance(region, Region.IReward) and (region.Reward.value & i) != 0]
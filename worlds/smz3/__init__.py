@@ -1,5 +1,4 @@
 import logging
-import copy
 import os
 import random
 import threading
@@ -47,7 +46,7 @@ class SMZ3CollectionState(metaclass=AutoLogicRegister):
             self.smz3state = {}
 
     def copy_mixin(self, ret) -> CollectionState:
-        ret.smz3state = {player: copy.deepcopy(self.smz3state[player]) for player in self.smz3state}
+        ret.smz3state = {player: self.smz3state[player].copy() for player in self.smz3state}
         return ret
 
 class SMZ3Web(WebWorld):
@@ -4,7 +4,7 @@ from typing import Dict, Any, Iterable, Optional, Union, List, TextIO
 
 from BaseClasses import Region, Entrance, Location, Item, Tutorial, ItemClassification, MultiWorld, CollectionState
 from Options import PerGameCommonOptions
-from worlds.AutoWorld import World, WebWorld
+from worlds.AutoWorld import World, WebWorld, AutoLogicRegister
 from . import rules
 from .bundles.bundle_room import BundleRoom
 from .bundles.bundles import get_all_bundles
@@ -44,6 +44,34 @@ class StardewItem(Item):
     game: str = STARDEW_VALLEY
 
 
+class StardewValleyCollectionState(metaclass=AutoLogicRegister):
+    """Keeps the running total of each player's progression items, so HasProgressionPercent doesn't sum them all."""
+    stardew_progression_totals: Dict[int, List[Any]]
+
+    def init_mixin(self, parent: MultiWorld):
+        # player -> [the prog_items counter the total was computed for, total]
+        self.stardew_progression_totals = {}
+
+    def copy_mixin(self, ret: CollectionState) -> CollectionState:
+        ret.stardew_progression_totals = {player: [ret.prog_items[player], total]
+                                          for player, (player_items, total) in self.stardew_progression_totals.items()
+                                          if player_items is self.prog_items[player]}
+        return ret
+
+    def _stardew_progression_total(self, player: int) -> int:
+        player_items = self.prog_items[player]
+        totals = self.stardew_progression_totals.get(player)
+        # prog_items can be replaced as a whole, which makes the total start over
+        if totals is None or totals[0] is not player_items:
+            totals = self.stardew_progression_totals[player] = [player_items, sum(player_items.values())]
+        return totals[1]
+
+    def _stardew_update_progression_total(self, player: int, amount: int) -> None:
+        totals = self.stardew_progression_totals.get(player)
+        if totals is not None:
+            totals[1] += amount
+
+
 class StardewWebWorld(WebWorld):
     theme = "dirt"
     bug_report_page = "https://github.com/agilbert1412/StardewArchipelago/issues/new?labels=bug&title=%5BBug%5D%3A+Brief+Description+of+bug+here"
@@ -442,13 +470,17 @@ class StardewValleyWorld(World):
     def collect(self, state: CollectionState, item: StardewItem) -> bool:
         change = super().collect(state, item)
         if change:
-            state.prog_items[self.player][Event.received_walnuts] += self.get_walnut_amount(item.name)
+            walnuts = self.get_walnut_amount(item.name)
+            state.prog_items[self.player][Event.received_walnuts] += walnuts
+            state._stardew_update_progression_total(self.player, 1 + walnuts)
         return change
 
     def remove(self, state: CollectionState, item: StardewItem) -> bool:
         change = super().remove(state, item)
         if change:
-            state.prog_items[self.player][Event.received_walnuts] -= self.get_walnut_amount(item.name)
+            walnuts = self.get_walnut_amount(item.name)
+            state.prog_items[self.player][Event.received_walnuts] -= walnuts
+            state._stardew_update_progression_total(self.player, -1 - walnuts)
         return change
 
     @staticmethod
@@ -24,9 +24,10 @@ class TotalReceived(BaseStardewRule):
         self.count = count
 
     def __call__(self, state: CollectionState) -> bool:
+        player_state = state.prog_items[self.player]
         c = 0
         for item in self.items:
-            c += state.count(item, self.player)
+            c += player_state[item]
             if c >= self.count:
                 return True
         return False
@@ -110,13 +111,7 @@ class HasProgressionPercent(CombinableStardewRule):
         if needed_count <= len(player_state):
             return True
 
-        total_count = 0
-        for item, item_count in player_state.items():
-            total_count += item_count
-            if total_count >= needed_count:
-                return True
-
-        return False
+        return state._stardew_progression_total(self.player) >= needed_count
 
     def evaluate_while_simplifying(self, state: CollectionState) -> Tuple[StardewRule, bool]:
         return self, self(state)
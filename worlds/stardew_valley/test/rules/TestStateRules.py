@@ -1,6 +1,6 @@
 import unittest
 
-from BaseClasses import ItemClassification
+from BaseClasses import ItemClassification, CollectionState
 from ...test import solo_multiworld
 
 
@@ -10,3 +10,22 @@ class TestHasProgressionPercent(unittest.TestCase):
         with solo_multiworld(world_caching=False) as (multiworld, world):
             progression_item_count = sum(1 for i in multiworld.get_items() if ItemClassification.progression in i.classification)
             self.assertEqual(world.total_progression_items, progression_item_count - 1)  # -1 to skip Victory
+
+    def test_progression_total_follows_collect_and_remove(self):
+        with solo_multiworld() as (multiworld, world):
+            state = CollectionState(multiworld)
+            items = [item for item in multiworld.get_items() if item.advancement][:20]
+            walnuts = world.create_item("5 Golden Walnuts")
+            for item in items + [walnuts]:
+                state.collect(item, prevent_sweep=True)
+            self.assertEqual(state._stardew_progression_total(1), sum(state.prog_items[1].values()))
+
+            copy = state.copy()
+            copy.remove(walnuts)
+            copy.remove(items[0])
+            self.assertEqual(copy._stardew_progression_total(1), sum(copy.prog_items[1].values()))
+            self.assertEqual(state._stardew_progression_total(1), sum(state.prog_items[1].values()))
+
+            state.prog_items[1] = state.prog_items[1].copy()
+            state.prog_items[1]["Stardrop"] += 1
+            self.assertEqual(state._stardew_progression_total(1), sum(state.prog_items[1].values()))